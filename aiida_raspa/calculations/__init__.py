@@ -10,7 +10,33 @@ from aiida.engine import CalcJob
 from aiida.orm import Dict, FolderData, List, RemoteData, SinglefileData
 from aiida.plugins import DataFactory
 
-from aiida_raspa.utils import RaspaInput
+from aiida_raspa.utils import (
+    GRID_CACHE_EXTRA,
+    LAUNCHER_SCRIPT,
+    RETRIEVAL_POLICY_LOG,
+    STAGE_LOG,
+    STAGE_SCRIPT,
+    RaspaInput,
+    check_charge_method,
+    check_unit_cells,
+    get_grid_folder,
+    get_grid_key,
+    get_launcher_command,
+    get_launcher_script,
+    get_raspa_dir_script,
+    get_restart_filename,
+    get_retrieval_policy,
+    get_retrieval_policy_script,
+    get_stage_command,
+    get_stage_names,
+    get_stage_parameters,
+    get_stage_script,
+    is_make_grid,
+    validate_keywords,
+)
+
+from .caching import RaspaCalcJobNode
+from .farm import RaspaFarmCalculation
 
 # data objects
 CifData = DataFactory("core.cif")  # pylint: disable=invalid-name
@@ -19,21 +45,40 @@ CifData = DataFactory("core.cif")  # pylint: disable=invalid-name
 class RaspaCalculation(CalcJob):
     """This is a RaspaCalculation, subclass of CalcJob, to prepare input for RASPA code.
     For information on RASPA, refer to: https://github.com/iraspa/raspa2.
+
+    The `UnitCells` of the frameworks default to the minimal number compatible with the cutoff, instead of the single
+    unit cell that RASPA uses by default.
+
+    The `stages` and `replicas` settings run RASPA from a script that is added to the `append_text` of the job. AiiDA
+    writes the `append_text` option before it, so with these settings the commands of that option run *before* the
+    simulations, not after them.
     """
 
     # Defaults
     INPUT_FILE = "simulation.input"
     OUTPUT_FOLDER = "Output"
     RESTART_FOLDER = "Restart"
+    REPLICA_FOLDER_PREFIX = "Replica_"
+    STAGE_FOLDER_PREFIX = "Stage_"
     PROJECT_NAME = "aiida"
     DEFAULT_PARSER = "raspa"
 
+    _node_class = RaspaCalcJobNode
+
     @classmethod
     def define(cls, spec):
         super().define(spec)
 
         # Input parameters
-        spec.input("parameters", valid_type=Dict, required=True, help="Input parameters")
+        spec.input(
+            "parameters",
+            valid_type=Dict,
+            required=True,
+            help="Input parameters. The frameworks without `UnitCells` get the smallest number of unit cells that "
+            "satisfies the minimum image convention for the cutoff. Given `UnitCells` are kept as they are, even if "
+            "they are too few, and only trigger a warning in the log of the calculation.",
+            validator=cls.validate_parameters,
+        )
         spec.input_namespace("framework", valid_type=CifData, required=False, dynamic=True, help="Input framework(s)")
         spec.input_namespace(
             "block_pocket", valid_type=SinglefileData, required=False, dynamic=True, help="Zeo++ block pocket file"
@@ -41,6 +86,14 @@ class RaspaCalculation(CalcJob):
         spec.input_namespace(
             "file", valid_type=SinglefileData, required=False, dynamic=True, help="Additional input file(s)"
         )
+        spec.input_namespace(
+            "grids",
+            valid_type=RemoteData,
+            required=False,
+            dynamic=True,
+            help="Remote folder(s) of MakeGrid calculations that contain the energy grids of the framework(s), keyed "
+            "by framework name.",
+        )
         spec.input("settings", valid_type=Dict, required=False, help="Additional input parameters")
         spec.input(
             "parent_folder",
@@ -66,6 +119,21 @@ class RaspaCalculation(CalcJob):
         # Output parameters
         spec.output("output_parameters", valid_type=Dict, required=True, help="The results of a calculation")
         spec.output("warnings", valid_type=List, required=False, help="Warnings that appeared during the calculation")
+        spec.output_namespace(
+            "output_excerpt",
+            valid_type=SinglefileData,
+            required=False,
+            dynamic=True,
+            help="Compressed output file(s) without the echoed input header, stored when the raw output is only "
+            "retrieved temporarily.",
+        )
+        spec.output_namespace(
+            "stage_output_parameters",
+            valid_type=Dict,
+            required=False,
+            dynamic=True,
+            help="The results of each stage, when several stages are run one after another.",
+        )
 
         # Exit codes
         spec.exit_code(
@@ -80,20 +148,32 @@ class RaspaCalculation(CalcJob):
         # Default output node
         spec.default_output_node = "output_parameters"
 
+    @staticmethod
+    def validate_parameters(value, _):
+        """Validate the keywords of the `parameters` input."""
+        return validate_keywords(value.get_dict())
+
     @staticmethod
     def validate_retrieved_parent_folder(value, _):
         """Validate the `retrieved_parent_folder` input."""
 
         repository = value.base.repository
 
-        if "Restart" not in repository.list_object_names():
+        # the restart folder is either at the top level or in the folder of each replica
+        restart_paths = [
+            Path(dirpath, "Restart")
+            for dirpath, dirnames, _ in repository.walk()
+            if "Restart" in dirnames and len(dirpath.parts) <= 1
+        ]
+        if not restart_paths:
             return "Restart was requested but the restart folder was not found in the previous calculation."
-        for system_path in repository.list_object_names("Restart"):
-            if len(repository.list_object_names(Path("Restart") / system_path)) != 1:
-                return "There was more than one file in a system directory of the `Restart` directory."
+        for restart_path in restart_paths:
+            for system_path in repository.list_object_names(restart_path):
+                if len(repository.list_object_names(restart_path / system_path)) != 1:
+                    return "There was more than one file in a system directory of the `Restart` directory."
 
     # --------------------------------------------------------------------------
-    # pylint: disable = too-many-locals
+    # pylint: disable = too-many-locals, too-many-branches, too-many-statements
     def prepare_for_submission(self, folder):
         """
         This is the routine to be called when you want to create
@@ -107,67 +187,163 @@ class RaspaCalculation(CalcJob):
         calcinfo.remote_copy_list = []
         calcinfo.local_copy_list = []
 
+        # get settings
+        if "settings" in self.inputs:
+            settings = self.inputs.settings.get_dict()
+        else:
+            settings = {}
+
+        # independent replicas of the simulation, each one is run in its own folder
+        nreplicas = settings.pop("replicas", 1)
+        if not isinstance(nreplicas, int) or isinstance(nreplicas, bool) or nreplicas < 1:
+            raise InputValidationError("The `replicas` key of the settings should be a positive integer.")
+        replica_dirs = self.get_replica_folders(nreplicas)
+
+        # stages that are run one after another, each one starting from the restart of the previous one
+        stages = settings.pop("stages", None)
+        if stages is not None and nreplicas > 1:
+            raise InputValidationError("The `stages` settings can not be used together with `replicas`.")
+
         # initialize input parameters
         inp = RaspaInput(self.inputs.parameters.get_dict())
 
         # keep order of systems in the extras
-        self.node.set_extra("system_order", inp.system_order)
+        self.node.base.extras.set("system_order", inp.system_order)
+
+        # use the minimal number of unit cells compatible with the cutoff, unless specified
+        for warning in check_unit_cells(inp.params, self.inputs.get("framework", {})):
+            self.logger.warning(warning)
+
+        # skip the Ewald summation if none of the atoms is charged
+        for warning in check_charge_method(inp.params, self.inputs.get("framework", {}), self.inputs.get("file", {})):
+            self.logger.warning(warning)
+
+        # energy grids are generated in, or linked into, a private RASPA directory
+        if is_make_grid(inp.params) or "grids" in self.inputs:
+            calcinfo.prepend_text = get_raspa_dir_script()
+        if is_make_grid(inp.params):
+            self.node.base.extras.set(GRID_CACHE_EXTRA, self._get_grid_keys(inp.params))
+        if "grids" in self.inputs:
+            calcinfo.remote_symlink_list = self._handle_grids(inp.params)
+
+        # the replicas differ only by the seed of the random number generator
+        if nreplicas > 1:
+            base_seed = inp.params["GeneralSettings"].get("RandomSeed", int(self.uuid.replace("-", "")[:7], 16))
 
         # handle framework(s) and/or box(es)
-        if "System" in inp.params:
-            self._handle_system_section(inp.params["System"], folder)
-
-        # handle restart
-        if "retrieved_parent_folder" in self.inputs:
-            calcinfo.local_copy_list.extend(self._handle_retrieved_parent_folder(inp))
-            inp.params["GeneralSettings"]["RestartFile"] = True
-
-        # handle binary restart
-        if "parent_folder" in self.inputs:
-            inp.params["GeneralSettings"]["ContinueAfterCrash"] = True
-            calcinfo.remote_copy_list.append(
-                (
-                    self.inputs.parent_folder.computer.uuid,
-                    os.path.join(self.inputs.parent_folder.get_remote_path(), "CrashRestart"),
-                    "CrashRestart",
-                )
-            )
+        frameworks = self._handle_system_section(inp.params["System"])
 
-        # get settings
-        if "settings" in self.inputs:
-            settings = self.inputs.settings.get_dict()
-        else:
-            settings = {}
+        for replica_id, replica_dir in enumerate(replica_dirs):
+            replica_folder = folder.get_subfolder(replica_dir, create=True)
+            calcinfo.local_copy_list.extend(
+                (uuid, filename, os.path.join(replica_dir, target)) for uuid, filename, target in frameworks
+            )
 
-        # write raspa input file
-        with open(folder.get_abs_path(self.INPUT_FILE), "w", encoding="utf-8") as fobj:
-            fobj.write(inp.render())
+            # handle restart
+            if "retrieved_parent_folder" in self.inputs:
+                calcinfo.local_copy_list.extend(self._handle_retrieved_parent_folder(inp, replica_dir))
+                inp.params["GeneralSettings"]["RestartFile"] = True
+
+            # handle binary restart
+            if "parent_folder" in self.inputs:
+                inp.params["GeneralSettings"]["ContinueAfterCrash"] = True
+                calcinfo.remote_copy_list.append(
+                    (
+                        self.inputs.parent_folder.computer.uuid,
+                        os.path.join(self.inputs.parent_folder.get_remote_path(), replica_dir, "CrashRestart"),
+                        os.path.join(replica_dir, "CrashRestart"),
+                    )
+                )
 
-        # create code info
-        codeinfo = CodeInfo()
-        codeinfo.cmdline_params = settings.pop("cmdline", []) + [self.INPUT_FILE]
-        codeinfo.code_uuid = self.inputs.code.uuid
+            if nreplicas > 1:
+                inp.params["GeneralSettings"]["RandomSeed"] = base_seed + replica_id
+
+            # write raspa input file(s)
+            if stages is None:
+                with open(replica_folder.get_abs_path(self.INPUT_FILE), "w", encoding="utf-8") as fobj:
+                    fobj.write(inp.render())
+            else:
+                self._write_stages(folder, inp.params, stages)
+
+            # file lists
+            if "file" in self.inputs:
+                for fobj in self.inputs.file.values():
+                    calcinfo.local_copy_list.append(
+                        (fobj.uuid, fobj.filename, os.path.join(replica_dir, fobj.filename))
+                    )
+
+            # block pockets
+            if "block_pocket" in self.inputs:
+                for name, fobj in self.inputs.block_pocket.items():
+                    calcinfo.local_copy_list.append(
+                        (fobj.uuid, fobj.filename, os.path.join(replica_dir, name + ".block"))
+                    )
 
-        calcinfo.stdin_name = self.INPUT_FILE
         calcinfo.uuid = self.uuid
-        calcinfo.cmdline_params = codeinfo.cmdline_params
-        calcinfo.stdin_name = self.INPUT_FILE
-        # calcinfo.stdout_name = self.OUTPUT_FILE
-        calcinfo.codes_info = [codeinfo]
-
-        # file lists
-        if "file" in self.inputs:
-            for fobj in self.inputs.file.values():
-                calcinfo.local_copy_list.append((fobj.uuid, fobj.filename, fobj.filename))
-
-        # block pockets
-        if "block_pocket" in self.inputs:
-            for name, fobj in self.inputs.block_pocket.items():
-                calcinfo.local_copy_list.append((fobj.uuid, fobj.filename, name + ".block"))
-
-        calcinfo.retrieve_list = [self.OUTPUT_FOLDER, self.RESTART_FOLDER]
+        append_text = []
+
+        if stages is not None:
+            # the stages are run by the stage script, the code is only used to locate the RASPA executable
+            if "cmdline" in settings:
+                raise InputValidationError("The `cmdline` settings can not be used together with `stages`.")
+            calcinfo.codes_info = []
+            append_text.append(get_stage_command(self.inputs.code))
+        elif nreplicas == 1:
+            # create code info
+            codeinfo = CodeInfo()
+            codeinfo.cmdline_params = settings.pop("cmdline", []) + [self.INPUT_FILE]
+            codeinfo.code_uuid = self.inputs.code.uuid
+
+            calcinfo.stdin_name = self.INPUT_FILE
+            calcinfo.cmdline_params = codeinfo.cmdline_params
+            calcinfo.stdin_name = self.INPUT_FILE
+            # calcinfo.stdout_name = self.OUTPUT_FILE
+            calcinfo.codes_info = [codeinfo]
+        else:
+            # the replicas are run by the launcher script, the code is only used to locate the RASPA executable
+            if "cmdline" in settings:
+                raise InputValidationError("The `cmdline` settings can not be used together with `replicas`.")
+            resources = self.node.get_option("resources")
+            if resources.get("num_machines", 1) != 1:
+                raise InputValidationError("The replicas of a RaspaCalculation can only run on a single machine.")
+            with open(folder.get_abs_path(LAUNCHER_SCRIPT), "w", encoding="utf-8") as fobj:
+                fobj.write(get_launcher_script(replica_dirs, self.INPUT_FILE))
+            calcinfo.codes_info = []
+            append_text.append(get_launcher_command(self.inputs.code, resources.get("num_mpiprocs_per_machine", 1)))
+
+        # retrieve the output either permanently or only for the parsing
+        retrieve_temporary = settings.pop("retrieve_temporary_output", False)
+        retrieve_restart = settings.pop("retrieve_restart", not retrieve_temporary)
+        settings.pop("store_output_excerpt", None)  # used by the parser
+
+        output_list = [self._get_retrieve_item(self.OUTPUT_FOLDER, nreplicas)]
+        if stages is not None:
+            output_list.append((f"{self.STAGE_FOLDER_PREFIX}*/{self.OUTPUT_FOLDER}", ".", 2))
+        if retrieve_temporary:
+            calcinfo.retrieve_list = []
+            calcinfo.retrieve_temporary_list = output_list
+        else:
+            calcinfo.retrieve_list = output_list
+        if retrieve_restart:
+            calcinfo.retrieve_list.append(self._get_retrieve_item(self.RESTART_FOLDER, nreplicas))
+            if stages is not None:
+                calcinfo.retrieve_list.append((f"{self.STAGE_FOLDER_PREFIX}*/{self.RESTART_FOLDER}", ".", 2))
+        if stages is not None:
+            calcinfo.retrieve_list.append(STAGE_LOG)
         calcinfo.retrieve_list += settings.pop("additional_retrieve_list", [])
 
+        # retrieval policy
+        if "retrieval_policy" in settings:
+            append_text.append(self._handle_retrieval_policy(settings.pop("retrieval_policy"), calcinfo))
+
+        if append_text:
+            calcinfo.append_text = "\n".join(append_text)
+        if not calcinfo.codes_info and self.node.get_option("append_text"):
+            self.logger.warning(
+                "The `append_text` option runs before the simulations: AiiDA writes it before the script that runs "
+                "the stages or the replicas."
+            )
+
         # check for left over settings
         if settings:
             raise InputValidationError(
@@ -179,25 +355,144 @@ class RaspaCalculation(CalcJob):
 
         return calcinfo
 
-    def _handle_system_section(self, system_dict, folder):
-        """Handle framework(s) and/or box(es)."""
+    @classmethod
+    def get_replica_folders(cls, nreplicas):
+        """Return the folders in which the replicas are run, the simulation is run in the working directory if
+        there is a single replica."""
+        if nreplicas == 1:
+            return [""]
+        return [f"{cls.REPLICA_FOLDER_PREFIX}{replica_id}" for replica_id in range(nreplicas)]
+
+    @classmethod
+    def get_stage_folders(cls, nstages):
+        """Return the folders that hold the input, and afterwards the `Output` and `Restart`, of the stages."""
+        return [f"{cls.STAGE_FOLDER_PREFIX}{stage_id}" for stage_id in range(nstages)]
+
+    @classmethod
+    def _get_retrieve_item(cls, name, nreplicas):
+        """Return the retrieve list item of the `name` folder of all the replicas."""
+        if nreplicas == 1:
+            return name
+        return (f"{cls.REPLICA_FOLDER_PREFIX}*/{name}", ".", 2)
+
+    def _handle_retrieval_policy(self, policy, calcinfo):
+        """Add the files included by the retrieval policy and return the script that enforces it."""
+        try:
+            policy = get_retrieval_policy(policy)
+        except ValueError as err:
+            raise InputValidationError(str(err)) from err
+
+        calcinfo.retrieve_list += [(pattern, ".", pattern.count("/") + 1) for pattern in policy["include"]]
+        retrieved_paths = [item if isinstance(item, str) else item[0] for item in calcinfo.retrieve_list]
+        calcinfo.retrieve_list.append(RETRIEVAL_POLICY_LOG)
+
+        # the output files are needed by the parser and the restart files to continue the simulation from the
+        # retrieved folder, they are never withheld
+        protected_paths = []
+        for name in (self.OUTPUT_FOLDER, self.RESTART_FOLDER):
+            protected_paths += [
+                f"{name}/System_*/*",
+                f"{self.REPLICA_FOLDER_PREFIX}*/{name}/System_*/*",
+                f"{self.STAGE_FOLDER_PREFIX}*/{name}/System_*/*",
+            ]
+        return get_retrieval_policy_script(policy, retrieved_paths, protected_paths=protected_paths)
+
+    def _write_stages(self, folder, params, stages):
+        """Write the input of every stage and the script that runs the stages one after another."""
+        try:
+            stage_parameters = get_stage_parameters(params, stages)
+        except ValueError as err:
+            raise InputValidationError(str(err)) from err
+
+        names = get_stage_names(stages)
+        stage_dirs = self.get_stage_folders(len(stages))
+        restart_filenames = []
+        for stage_id, (name, stage_dir, stage_params) in enumerate(zip(names, stage_dirs, stage_parameters)):
+            # only the first stage continues from the binary restart of the parent calculation
+            if stage_id > 0:
+                stage_params["GeneralSettings"].pop("ContinueAfterCrash", None)
+            error = validate_keywords(stage_params)
+            if error:
+                raise InputValidationError(f"Stage '{name}': {error}")
+
+            stage_inp = RaspaInput(stage_params)
+            stage_folder = folder.get_subfolder(stage_dir, create=True)
+            with open(stage_folder.get_abs_path(self.INPUT_FILE), "w", encoding="utf-8") as fobj:
+                fobj.write(stage_inp.render())
+            restart_filenames.append(
+                [get_restart_filename(system, stage_params["System"][system]) for system in stage_inp.system_order]
+            )
+
+        with open(folder.get_abs_path(STAGE_SCRIPT), "w", encoding="utf-8") as fobj:
+            fobj.write(get_stage_script(stage_dirs, names, restart_filenames, self.INPUT_FILE))
+
+    def _get_grid_keys(self, params):
+        """Return the cache keys of the grids generated for the framework(s)."""
+        files = self.inputs.file if "file" in self.inputs else {}
+        return {
+            name: get_grid_key(params, name, self.inputs.framework[name], files)
+            for name, system in params["System"].items()
+            if system["type"] == "Framework" and name in self.inputs.get("framework", {})
+        }
+
+    def _handle_grids(self, params):
+        """Construct the remote symlink list of the energy grids and switch on their use."""
+        if "Forcefield" not in params["GeneralSettings"]:
+            raise InputValidationError("The `Forcefield` parameter is required to use precomputed energy grids.")
+
+        remote_symlink_list = []
+        for name, remote_folder in self.inputs.grids.items():
+            if params["System"].get(name, {}).get("type") != "Framework":
+                raise InputValidationError(f"Energy grids were provided for '{name}', which is not a framework.")
+            grid_folder = get_grid_folder(params["GeneralSettings"]["Forcefield"], name)
+            remote_symlink_list.append(
+                (remote_folder.computer.uuid, os.path.join(remote_folder.get_remote_path(), grid_folder), grid_folder)
+            )
+
+        params["GeneralSettings"]["UseTabularGrid"] = True
+        return remote_symlink_list
+
+    def _handle_system_section(self, system_dict):
+        """Construct the local copy list of the framework(s), the CIF files are copied from the repository by the
+        engine rather than written out here."""
+        local_copy_list = []
         for name, sparams in system_dict.items():
             if sparams["type"] == "Framework":
                 try:
-                    self.inputs.framework[name].export(folder.get_abs_path(name + ".cif"), fileformat="cif")
+                    framework = self.inputs.framework[name]
                 except KeyError as err:
                     raise InputValidationError(
                         f"You specified '{name}' framework in the input dictionary, but did not provide the input "
                         "framework with the same name"
                     ) from err
+                local_copy_list.append((framework.uuid, framework.filename, name + ".cif"))
+        return local_copy_list
+
+    def _handle_retrieved_parent_folder(self, inp, replica_dir=""):
+        """Construct the local copy list from a the `retrieved_parent_folder` input.
 
-    def _handle_retrieved_parent_folder(self, inp):
-        """Construct the local copy list from a the `retrieved_parent_folder` input."""
+        A replica continues from the restart of the same replica of the parent calculation, if present, and from the
+        `Restart` folder of the parent calculation otherwise. If the parent calculation ran stages and was interrupted
+        before writing its `Restart` folder, the restart of its last finished stage is used.
+        """
         local_copy_list = []
 
         parent_folder = self.inputs.retrieved_parent_folder
-        base_src_path = Path("Restart")
-        base_dest_path = Path("RestartInitial")
+        repository = parent_folder.base.repository
+        names = repository.list_object_names()
+        if replica_dir in names and "Restart" in repository.list_object_names(replica_dir):
+            base_src_path = Path(replica_dir, "Restart")
+        elif "Restart" in names:
+            base_src_path = Path("Restart")
+        else:
+            stage_dirs = [
+                name
+                for name in names
+                if name.startswith(self.STAGE_FOLDER_PREFIX) and "Restart" in repository.list_object_names(name)
+            ]
+            stage_dir = max(stage_dirs, key=lambda name: int(name[len(self.STAGE_FOLDER_PREFIX) :]))
+            base_src_path = Path(stage_dir, "Restart")
+        base_dest_path = Path(replica_dir, "RestartInitial")
 
         for i_system, system_name in enumerate(inp.system_order):
             system = inp.params["System"][system_name]
@@ -205,24 +500,9 @@ class RaspaCalculation(CalcJob):
 
             old_fname = parent_folder.base.repository.list_object_names(base_src_path / system_dir).pop()
 
-            if system["type"] == "Box":
-                system_or_box = "Box"
-                (n_x, n_y, n_z) = (1, 1, 1)
-                if "ExternalPressure" not in system:
-                    system["ExternalPressure"] = 0
-            elif system["type"] == "Framework":
-                system_or_box = system_name
-                try:
-                    (n_x, n_y, n_z) = tuple(map(int, system["UnitCells"].split()))
-                except KeyError:
-                    (n_x, n_y, n_z) = 1, 1, 1
-
-            external_pressure = system["ExternalPressure"] if "ExternalPressure" in system else 0
-
-            new_fname = (
-                f"restart_{system_or_box:s}_{n_x:}.{n_y:d}.{n_z:d}_{system['ExternalTemperature']:f}"
-                f"_{external_pressure:g}"
-            )
+            if system["type"] == "Box" and "ExternalPressure" not in system:
+                system["ExternalPressure"] = 0
+            new_fname = get_restart_filename(system_name, system)
 
             local_copy_list.append(
                 (
@@ -0,0 +1,35 @@
+"""Caching of the RASPA calculations."""
+from aiida.common.hashing import make_hash
+from aiida.common.links import LinkType
+from aiida.orm.nodes.process.calculation.calcjob import CalcJobNode, CalcJobNodeCaching
+
+from aiida_raspa.utils import normalize_parameters, normalize_settings
+
+
+class RaspaCalcJobNodeCaching(CalcJobNodeCaching):
+    """Hash RASPA calculations by their normalized parameters and settings.
+
+    Calculations that differ only in the spelling of the parameters, in the output frequency or in settings that do
+    not change the simulation get the same hash, so that they can be reused from the cache.
+    """
+
+    def get_objects_to_hash(self):
+        """Return a list of objects which should be included in the hash."""
+        objects = super().get_objects_to_hash()
+        for entry in self._node.base.links.get_incoming(link_type=LinkType.INPUT_CALC):
+            label = entry.link_label
+            if label == "parameters" or label.startswith("parameters__"):
+                objects["inputs"][label] = make_hash(normalize_parameters(entry.node.get_dict()))
+            elif label == "settings":
+                settings = normalize_settings(entry.node.get_dict())
+                if settings:
+                    objects["inputs"][label] = make_hash(settings)
+                else:
+                    objects["inputs"].pop(label)
+        return objects
+
+
+class RaspaCalcJobNode(CalcJobNode):
+    """Node of the RASPA calculations, hashed by their normalized parameters and settings."""
+
+    _CLS_NODE_CACHING = RaspaCalcJobNodeCaching
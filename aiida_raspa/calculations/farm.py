@@ -0,0 +1,183 @@
+"""Raspa task-farm input plugin."""
+from aiida.common import CalcInfo, InputValidationError
+from aiida.engine import CalcJob
+from aiida.orm import Dict, List, SinglefileData
+from aiida.plugins import DataFactory
+
+from aiida_raspa.utils import (
+    LAUNCHER_SCRIPT,
+    RaspaInput,
+    check_charge_method,
+    check_unit_cells,
+    get_launcher_command,
+    get_launcher_script,
+    validate_keywords,
+)
+
+from .caching import RaspaCalcJobNode
+
+# data objects
+CifData = DataFactory("core.cif")  # pylint: disable=invalid-name
+
+
+class RaspaFarmCalculation(CalcJob):
+    """Run many independent RASPA simulations (tasks) within one scheduler job.
+
+    Every task gets its own subdirectory with a RASPA input generated from the corresponding entry of the
+    `parameters` namespace. The tasks are executed by a launcher script, at most `num_mpiprocs_per_machine`
+    of them at the same time.
+    """
+
+    # Defaults
+    INPUT_FILE = "simulation.input"
+    OUTPUT_FOLDER = "Output"
+    TASK_FOLDER_PREFIX = "task_"
+    DEFAULT_PARSER = "raspa.farm"
+
+    _node_class = RaspaCalcJobNode
+
+    @classmethod
+    def define(cls, spec):
+        super().define(spec)
+
+        # Input parameters
+        spec.input_namespace(
+            "parameters",
+            valid_type=Dict,
+            required=True,
+            dynamic=True,
+            help="Input parameters of each task. The frameworks without `UnitCells` get the smallest number of unit "
+            "cells that satisfies the minimum image convention for the cutoff.",
+            validator=cls.validate_parameters,
+        )
+        spec.input_namespace(
+            "framework",
+            valid_type=CifData,
+            required=False,
+            dynamic=True,
+            help="Input framework(s), shared by all the tasks",
+        )
+        spec.input_namespace(
+            "block_pocket",
+            valid_type=SinglefileData,
+            required=False,
+            dynamic=True,
+            help="Zeo++ block pocket file(s), shared by all the tasks",
+        )
+        spec.input_namespace(
+            "file",
+            valid_type=SinglefileData,
+            required=False,
+            dynamic=True,
+            help="Additional input file(s), shared by all the tasks",
+        )
+        spec.inputs["metadata"]["options"]["parser_name"].default = cls.DEFAULT_PARSER
+        spec.inputs["metadata"]["options"]["resources"].default = {
+            "num_machines": 1,
+            "num_mpiprocs_per_machine": 1,
+            "num_cores_per_mpiproc": 1,
+        }
+        spec.inputs["metadata"]["options"]["withmpi"].default = False
+
+        # Output parameters
+        spec.output_namespace(
+            "output_parameters", valid_type=Dict, required=True, dynamic=True, help="The results of each task"
+        )
+        spec.output("warnings", valid_type=List, required=False, help="Warnings that appeared during the tasks")
+
+        # Exit codes
+        spec.exit_code(
+            100, "ERROR_NO_RETRIEVED_FOLDER", message="The retrieved folder data node could not be accessed."
+        )
+        spec.exit_code(101, "ERROR_NO_OUTPUT_FILE", message="The retrieved folder does not contain an output file.")
+        spec.exit_code(
+            102, "ERROR_SIMULATION_DID_NOT_START", message='The output does not contain "Starting simulation".'
+        )
+        spec.exit_code(110, "ERROR_TASKS_FAILED", message="The following tasks did not finish: {tasks}.")
+
+    @staticmethod
+    def validate_parameters(value, _):
+        """Validate the keywords of the `parameters` of every task."""
+        errors = []
+        for task, parameters in sorted(value.items()):
+            error = validate_keywords(parameters.get_dict())
+            if error:
+                errors += [f"Task '{task}': {line}" for line in error.splitlines()]
+        return "\n".join(errors) if errors else None
+
+    @classmethod
+    def get_task_folder(cls, task):
+        """Return the folder in which `task` is run."""
+        return cls.TASK_FOLDER_PREFIX + task
+
+    # --------------------------------------------------------------------------
+    def prepare_for_submission(self, folder):
+        """Create the input files of all the tasks and the launcher script that runs them.
+
+        :param folder: a aiida.common.folders.Folder subclass where
+                           the plugin should put all its files.
+        """
+        resources = self.node.get_option("resources")
+        if resources.get("num_machines", 1) != 1:
+            raise InputValidationError("The tasks of a RaspaFarmCalculation can only run on a single machine.")
+        if self.node.get_option("append_text"):
+            self.logger.warning(
+                "The `append_text` option runs before the tasks: AiiDA writes it before the launcher command."
+            )
+
+        calcinfo = CalcInfo()
+        calcinfo.uuid = self.uuid
+        calcinfo.remote_copy_list = []
+        calcinfo.local_copy_list = []
+        calcinfo.retrieve_list = []
+
+        # the CIF files are copied from the repository by the engine
+        frameworks = self.inputs.get("framework", {})
+        for task, parameters in sorted(self.inputs.parameters.items()):
+            task_dir = self.get_task_folder(task)
+            calcinfo.local_copy_list.extend(
+                self._write_task_input(folder.get_subfolder(task_dir, create=True), task, parameters, frameworks)
+            )
+            calcinfo.retrieve_list.append((f"{task_dir}/{self.OUTPUT_FOLDER}", ".", 2))
+
+        # the tasks are run by the launcher script, the code is only used to locate the RASPA executable
+        task_dirs = [self.get_task_folder(task) for task in sorted(self.inputs.parameters)]
+        with open(folder.get_abs_path(LAUNCHER_SCRIPT), "w", encoding="utf-8") as fobj:
+            fobj.write(get_launcher_script(task_dirs, self.INPUT_FILE))
+        calcinfo.codes_info = []
+        calcinfo.append_text = get_launcher_command(self.inputs.code, resources.get("num_mpiprocs_per_machine", 1))
+
+        return calcinfo
+
+    def _write_task_input(self, task_folder, task, parameters, frameworks):
+        """Write the RASPA input of `task` and return the local copy list of its files.
+
+        :param task_folder: the folder of the task in the sandbox folder
+        :param frameworks: the CIF files of the frameworks, keyed by name
+        """
+        task_dir = self.get_task_folder(task)
+        inp = RaspaInput(parameters.get_dict())
+        for warning in check_unit_cells(inp.params, self.inputs.get("framework", {})):
+            self.logger.warning("Task '%s': %s", task, warning)
+        for warning in check_charge_method(inp.params, self.inputs.get("framework", {}), self.inputs.get("file", {})):
+            self.logger.warning("Task '%s': %s", task, warning)
+
+        local_copy_list = []
+        for name, sparams in inp.params["System"].items():
+            if sparams["type"] == "Framework":
+                if name not in frameworks:
+                    raise InputValidationError(
+                        f"Task '{task}' uses the '{name}' framework, but no input framework with the same "
+                        "name was provided."
+                    )
+                local_copy_list.append((frameworks[name].uuid, frameworks[name].filename, f"{task_dir}/{name}.cif"))
+
+        with open(task_folder.get_abs_path(self.INPUT_FILE), "w", encoding="utf-8") as fobj:
+            fobj.write(inp.render())
+
+        # file lists
+        for fobj in self.inputs.get("file", {}).values():
+            local_copy_list.append((fobj.uuid, fobj.filename, f"{task_dir}/{fobj.filename}"))
+        for name, fobj in self.inputs.get("block_pocket", {}).items():
+            local_copy_list.append((fobj.uuid, fobj.filename, f"{task_dir}/{name}.block"))
+        return local_copy_list
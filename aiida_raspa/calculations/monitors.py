@@ -0,0 +1,90 @@
+"""Monitors of running RASPA calculations."""
+import os
+
+from aiida.common.escaping import escape_for_bash
+from aiida.engine.processes.calcjobs.monitors import (
+    CalcJobMonitorAction,
+    CalcJobMonitorResult,
+)
+
+from aiida_raspa.utils import (
+    MONITOR_EXTRA,
+    block_average,
+    get_complete_output,
+    parse_running_loadings,
+)
+
+
+def monitor_convergence(node, transport, relative_error=0.1, min_samples=25):
+    """Stop the simulation once the loadings of all the components reached the target `relative_error`.
+
+    Only the part of the output files written since the previous call is read, the loadings read so far and the
+    offsets in the output files are kept in the `MONITOR_EXTRA` extra of the calculation. The errors are estimated as
+    RASPA does, from 5 block averages of the loadings printed every `PrintEvery` cycles: these should be printed often
+    enough for the error estimate to be meaningful.
+
+    :param relative_error: target relative error of the loadings
+    :param min_samples: minimum number of printed loadings of every component before the simulation can be stopped
+    """
+    settings = node.inputs.settings.get_dict() if "settings" in node.inputs else {}
+    if settings.get("replicas", 1) > 1 or "stages" in settings:
+        return CalcJobMonitorResult(
+            action=CalcJobMonitorAction.DISABLE_SELF, message="Runs with replicas or stages are not monitored."
+        )
+
+    state = node.base.extras.get(MONITOR_EXTRA, {"offsets": {}, "loadings": {}})
+    output_folder = os.path.join(node.get_remote_workdir(), node.process_class.OUTPUT_FOLDER)
+    for system_id in range(len(node.inputs.parameters["System"])):
+        offset = state["offsets"].get(str(system_id), 0)
+        complete_output = _read_new_output(transport, os.path.join(output_folder, f"System_{system_id}"), offset)
+        if complete_output is None:
+            return None
+        state["offsets"][str(system_id)] = offset + len(complete_output.encode("utf-8"))
+        _, loadings = parse_running_loadings(complete_output)
+        for name, values in loadings.items():
+            state["loadings"].setdefault(f"{system_id}_{name}", []).extend(values)
+    node.base.extras.set(MONITOR_EXTRA, state)
+
+    error = _get_max_relative_error(state["loadings"], min_samples)
+    if error is None or error > relative_error:
+        return None
+
+    state["converged"] = True
+    node.base.extras.set(MONITOR_EXTRA, state)
+    return CalcJobMonitorResult(
+        action=CalcJobMonitorAction.KILL,
+        message=f"The loadings reached a relative error of {error:.3g}, stopping the simulation.",
+        retrieve=True,
+        parse=True,
+        override_exit_code=False,
+    )
+
+
+def _read_new_output(transport, output_dir, offset):
+    """Return the complete blocks of the output file in `output_dir` from `offset` on, None if it can not be read."""
+    if not transport.path_exists(output_dir) or not transport.listdir(output_dir):
+        return None
+    output_file = os.path.join(output_dir, transport.listdir(output_dir)[0])
+
+    # read from the beginning of the last block, which was incomplete at the previous call
+    retval, stdout, _ = transport.exec_command_wait(f"tail -c +{offset + 1} {escape_for_bash(output_file)}")
+    if retval != 0:
+        return None
+    return get_complete_output(stdout)
+
+
+def _get_max_relative_error(loadings, min_samples):
+    """Return the largest relative error of the loadings, None if it can not be estimated yet.
+
+    :param loadings: dictionary with the lists of the printed loadings
+    :param min_samples: minimum number of printed loadings of every component
+    """
+    errors = []
+    for values in loadings.values():
+        if len(values) < min_samples:
+            return None
+        average, dev = block_average(values)
+        if not average:
+            return None
+        errors.append(abs(dev / average))
+    return max(errors, default=None)
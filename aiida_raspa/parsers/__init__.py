@@ -1,13 +1,27 @@
 """Raspa output parser."""
+import gzip
+import io
 import os
 from pathlib import Path
 
 from aiida.common import NotExistent, OutputParsingError
 from aiida.engine import ExitCode
-from aiida.orm import Dict, List
+from aiida.orm import Dict, List, SinglefileData
 from aiida.parsers.parser import Parser
 
-from aiida_raspa.utils import parse_base_output
+from aiida_raspa.utils import (
+    GRID_CACHE_EXTRA,
+    MONITOR_EXTRA,
+    RETRIEVAL_POLICY_LOG,
+    get_running_results,
+    get_stage_names,
+    is_make_grid,
+    merge_output_parameters,
+    parse_base_output,
+    parse_retrieval_policy_log,
+)
+
+from .farm import RaspaFarmParser
 
 # parser
 # --------------------------------------------------------------------------------------------
@@ -17,7 +31,7 @@ class RaspaParser(Parser):
     """Parse RASPA output"""
 
     # --------------------------------------------------------------------------
-    def parse(self, **kwargs):  # pylint: disable=too-many-locals
+    def parse(self, **kwargs):  # pylint: disable=too-many-locals, too-many-branches, too-many-return-statements
         """Receives in input a dictionary of retrieved nodes. Does all the logic here."""
         try:
             out_folder = self.retrieved
@@ -25,30 +39,162 @@ class RaspaParser(Parser):
             return self.exit_codes.ERROR_NO_RETRIEVED_FOLDER
         output_folder_name = self.node.process_class.OUTPUT_FOLDER
 
-        if output_folder_name not in out_folder.base.repository.list_object_names():  # pylint: disable=protected-access
+        settings = self.node.inputs.settings.get_dict() if "settings" in self.node.inputs else {}
+
+        replica_dirs = [Path(name) for name in self.node.process_class.get_replica_folders(settings.get("replicas", 1))]
+        read_output = self._get_output_reader(settings, replica_dirs, kwargs.get("retrieved_temporary_folder", None))
+        if read_output is None:
             return self.exit_codes.ERROR_NO_OUTPUT_FILE
 
         output_parameters = {}
         warnings = []
-        ncomponents = len(self.node.inputs.parameters.get_dict()["Component"])
-        for system_id, system_name in enumerate(self.node.get_extra("system_order")):
-            # specify the name for the system
-            output_dir = Path(output_folder_name) / f"System_{system_id}"
-            output_filename = out_folder.base.repository.list_object_names(output_dir).pop()
-            output_contents = out_folder.base.repository.get_object_content(output_dir / output_filename)
-
-            # Check for possible errors
-            if "Starting simulation" not in output_contents:
-                return self.exit_codes.ERROR_SIMULATION_DID_NOT_START
-            if "Simulation finished" not in output_contents:
-                return self.exit_codes.TIMEOUT
-
-            # parse output parameters and warnings
-            parsed_parameters, parsed_warnings = parse_base_output(output_contents, system_name, ncomponents)
-            output_parameters[system_name] = parsed_parameters
-            warnings += parsed_warnings
+        parameters = self.node.inputs.parameters.get_dict()
+        ncomponents = len(parameters["Component"])
+        grid_keys = self.node.base.extras.get(GRID_CACHE_EXTRA, {})
+        stopped_early = self.node.base.extras.get(MONITOR_EXTRA, {}).get("converged", False)
+        # the systems are ordered in the same way as in `RaspaInput`
+        for system_id, system_name in enumerate(sorted(parameters["System"])):
+            system_results = []
+            for replica_id, replica_dir in enumerate(replica_dirs):
+                # specify the name for the system
+                output_contents = read_output(replica_dir / output_folder_name / f"System_{system_id}")
+
+                # Check for possible errors
+                if "Starting simulation" not in output_contents:
+                    return self.exit_codes.ERROR_SIMULATION_DID_NOT_START
+                if "Simulation finished" not in output_contents:
+                    if not stopped_early:
+                        return self.exit_codes.TIMEOUT
+                    # the convergence monitor killed the simulation, the averages are estimated from the periodic output
+                    system_results.append(get_running_results(output_contents))
+                    continue
+
+                # a MakeGrid calculation has no averages, report under which key its grids are cached
+                if is_make_grid(parameters):
+                    system_results.append({"general": {"grid_cache_key": grid_keys.get(system_name)}, "components": {}})
+                    continue
+
+                # parse output parameters and warnings
+                parsed_parameters, parsed_warnings = parse_base_output(output_contents, system_name, ncomponents)
+                system_results.append(parsed_parameters)
+                if replica_id == 0:
+                    warnings += parsed_warnings
+                else:
+                    # the replicas of a system repeat the warnings of the first one, which are reported once
+                    warnings += [warning for warning in parsed_warnings if warning not in warnings]
+
+                if settings.get("store_output_excerpt", False):
+                    excerpt_name = system_name if len(replica_dirs) == 1 else f"{system_name}_replica_{replica_id}"
+                    self.out(f"output_excerpt.{excerpt_name}", self._get_output_excerpt(output_contents, excerpt_name))
+
+            # the replicas are independent estimates of the same averages
+            if len(system_results) == 1:
+                output_parameters[system_name] = system_results[0]
+            else:
+                output_parameters[system_name] = merge_output_parameters(system_results)
+                output_parameters[system_name]["general"]["number_of_replicas"] = len(system_results)
+
+        if "stages" in settings:
+            exit_code = self._parse_stages(settings["stages"], read_output, output_parameters, warnings)
+            if exit_code is not None:
+                return exit_code
+
+        # report the files held back by the retrieval policy, the log is missing if the job was killed
+        if "retrieval_policy" in settings and RETRIEVAL_POLICY_LOG in out_folder.base.repository.list_object_names():
+            warnings += self._get_retrieval_policy_warnings()
+
+        if stopped_early:
+            warnings.append(("monitor", "The simulation was stopped early by the convergence monitor"))
 
         self.out("output_parameters", Dict(dict=output_parameters))
         self.out("warnings", List(list=warnings))
 
         return ExitCode(0)
+
+    def _get_output_reader(self, settings, replica_dirs, temporary_folder):
+        """Return the function that reads the output file of a system, or None if the output was not retrieved.
+
+        The output can be retrieved into a temporary folder that is removed after parsing.
+        """
+        output_folder_name = self.node.process_class.OUTPUT_FOLDER
+        if settings.get("retrieve_temporary_output", False):
+            if temporary_folder is None or not all(
+                (Path(temporary_folder) / replica_dir / output_folder_name).is_dir() for replica_dir in replica_dirs
+            ):
+                return None
+            return self._read_temporary_output(Path(temporary_folder))
+        if not all(self._is_retrieved(replica_dir / output_folder_name) for replica_dir in replica_dirs):
+            return None
+        return self._read_retrieved_output
+
+    def _is_retrieved(self, path):
+        """Check whether `path` is in the `retrieved` folder."""
+        try:
+            return path.name in self.retrieved.base.repository.list_object_names(path.parent)
+        except FileNotFoundError:
+            return False
+
+    def _parse_stages(self, stages, read_output, output_parameters, warnings):
+        """Parse the results of the stages and add them to the `stage_output_parameters` outputs.
+
+        The earlier stages were moved into their own folders, the last stage is the one in the output folder, whose
+        results are `output_parameters`. The warnings of the earlier stages are added to `warnings`.
+
+        :returns: an exit code if one of the stages did not finish, None otherwise
+        """
+        parameters = self.node.inputs.parameters.get_dict()
+        stage_names = get_stage_names(stages)
+        for stage_name, stage_dir in zip(stage_names[:-1], self.node.process_class.get_stage_folders(len(stage_names))):
+            stage_parameters = {}
+            for system_id, system_name in enumerate(sorted(parameters["System"])):
+                output_dir = Path(stage_dir, self.node.process_class.OUTPUT_FOLDER, f"System_{system_id}")
+                try:
+                    output_contents = read_output(output_dir)
+                except FileNotFoundError:
+                    return self.exit_codes.ERROR_NO_OUTPUT_FILE
+                if "Starting simulation" not in output_contents:
+                    return self.exit_codes.ERROR_SIMULATION_DID_NOT_START
+                if "Simulation finished" not in output_contents:
+                    return self.exit_codes.TIMEOUT
+                stage_parameters[system_name], parsed_warnings = parse_base_output(
+                    output_contents, system_name, len(parameters["Component"])
+                )
+                warnings += [warning for warning in parsed_warnings if warning not in warnings]
+            self.out(f"stage_output_parameters.{stage_name}", Dict(dict=stage_parameters))
+        self.out(f"stage_output_parameters.{stage_names[-1]}", Dict(dict=output_parameters))
+        return None
+
+    def _get_retrieval_policy_warnings(self):
+        """Return a warning for every file that the retrieval policy held back."""
+        withheld = parse_retrieval_policy_log(self.retrieved.base.repository.get_object_content(RETRIEVAL_POLICY_LOG))
+        return [
+            ("retrieval_policy", f"{path} was {action} by the retrieval policy")
+            for action, paths in withheld.items()
+            for path in paths
+        ]
+
+    def _read_retrieved_output(self, output_dir):
+        """Read the output file of a system from the `retrieved` folder."""
+        repository = self.retrieved.base.repository
+        output_filename = repository.list_object_names(output_dir).pop()
+        return repository.get_object_content(output_dir / output_filename)
+
+    @staticmethod
+    def _read_temporary_output(temporary_folder):
+        """Return a function that reads the output file of a system from the temporary retrieved folder."""
+
+        def read_output(output_dir):
+            output_filename = os.listdir(temporary_folder / output_dir).pop()
+            return (temporary_folder / output_dir / output_filename).read_text(encoding="utf-8")
+
+        return read_output
+
+    @staticmethod
+    def _get_output_excerpt(output_contents, system_name):
+        """Compress the output, skipping the header where RASPA echoes the input."""
+        start = output_contents.find("Starting simulation")
+        if start < 0:
+            raise OutputParsingError("Could not find the beginning of the simulation in the output file.")
+        start = output_contents.rfind("\n", 0, start) + 1
+        excerpt = gzip.compress(output_contents[start:].encode("utf-8"), mtime=0)
+        return SinglefileData(io.BytesIO(excerpt), filename=f"output_{system_name}.txt.gz")
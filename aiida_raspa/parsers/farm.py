@@ -0,0 +1,70 @@
+"""Raspa task-farm output parser."""
+from pathlib import Path
+
+from aiida.common import NotExistent
+from aiida.engine import ExitCode
+from aiida.orm import Dict, List
+from aiida.parsers.parser import Parser
+
+from aiida_raspa.utils import parse_base_output
+
+
+class RaspaFarmParser(Parser):
+    """Parse the RASPA outputs of all the tasks of a `RaspaFarmCalculation`."""
+
+    def parse(self, **kwargs):
+        """Parse the output of each task into the `output_parameters` namespace, keyed by task."""
+        try:
+            self.retrieved  # pylint: disable=pointless-statement
+        except NotExistent:
+            return self.exit_codes.ERROR_NO_RETRIEVED_FOLDER
+
+        warnings = []
+        failed_tasks = []
+        started_tasks = 0
+        for task, parameters in sorted(self.node.inputs.parameters.items()):
+            output_contents = self._read_task_outputs(task, parameters.get_dict())
+
+            if any("Starting simulation" in contents for contents in output_contents.values()):
+                started_tasks += 1
+            if not output_contents or any(
+                "Simulation finished" not in contents for contents in output_contents.values()
+            ):
+                failed_tasks.append(task)
+                continue
+
+            ncomponents = len(parameters["Component"])
+            output_parameters = {}
+            for system_name, contents in output_contents.items():
+                parsed_parameters, parsed_warnings = parse_base_output(contents, system_name, ncomponents)
+                output_parameters[system_name] = parsed_parameters
+                warnings += [(task, *warning) for warning in parsed_warnings]
+            self.out(f"output_parameters.{task}", Dict(output_parameters))
+
+        self.out("warnings", List(warnings))
+
+        if not started_tasks:
+            return self.exit_codes.ERROR_SIMULATION_DID_NOT_START
+        if failed_tasks:
+            return self.exit_codes.ERROR_TASKS_FAILED.format(tasks=", ".join(failed_tasks))
+
+        return ExitCode(0)
+
+    def _read_task_outputs(self, task, params):
+        """Return the contents of the output files of `task`, keyed by system name.
+
+        The dictionary is empty if the output folder of the task was not retrieved.
+        """
+        repository = self.retrieved.base.repository
+        output_folder = Path(self.node.process_class.get_task_folder(task)) / self.node.process_class.OUTPUT_FOLDER
+
+        output_contents = {}
+        # the systems are ordered in the same way as in `RaspaInput`
+        for system_id, system_name in enumerate(sorted(params["System"])):
+            output_dir = output_folder / f"System_{system_id}"
+            try:
+                output_filename = repository.list_object_names(output_dir).pop()
+            except (FileNotFoundError, IndexError):
+                return {}
+            output_contents[system_name] = repository.get_object_content(output_dir / output_filename)
+        return output_contents
@@ -1,8 +1,102 @@
 """Raspa utils."""
 from .base_input_generator import RaspaInput
 from .base_parser import parse_base_output
+from .batch_tools import get_batch_builders, get_batch_key
+from .block_pocket_tools import (
+    BLOCK_POCKET_EXTRA,
+    find_block_pocket,
+    get_block_pocket_key,
+    get_block_pockets,
+    register_block_pocket,
+)
+from .caching_tools import (
+    HASH_IGNORED_PARAMETERS,
+    HASH_IGNORED_SETTINGS,
+    normalize_parameters,
+    normalize_settings,
+)
+from .charge_tools import check_charge_method, has_charges
+from .cif_tools import (
+    NORMALIZED_CIF_EXTRA,
+    find_normalized_cif,
+    get_normalized_cif,
+    normalize_cif,
+)
+from .equilibration_tools import detect_equilibration, mser_truncation
+from .grid_tools import (
+    GRID_CACHE_EXTRA,
+    find_cached_grids,
+    get_grid_folder,
+    get_grid_key,
+    get_raspa_dir_script,
+    is_make_grid,
+)
+from .import_tools import (
+    IMPORTED_RUN_EXTRA,
+    find_raspa_runs,
+    import_raspa_runs,
+    parse_input_file,
+    read_raspa_run,
+)
 from .inspection_tools import (
+    add_block_pocket_file_names,
     add_write_binary_restart,
     increase_box_lenght,
+    merge_production_results,
     modify_number_of_cycles,
+    switch_to_cbcf_swap_moves,
+    tune_move_probabilities,
+)
+from .keyword_schema import validate_keywords
+from .launcher_tools import LAUNCHER_SCRIPT, get_launcher_command, get_launcher_script
+from .monitor_tools import (
+    MONITOR_EXTRA,
+    block_average,
+    get_complete_output,
+    get_running_results,
+    parse_production_blocks,
+    parse_running_loadings,
+)
+from .move_tools import (
+    MOVES,
+    get_collapsed_swaps,
+    get_tuned_probabilities,
+    parse_move_statistics,
+    tune_parameters,
+    use_cbcf_swap_moves,
+)
+from .retrieval_tools import (
+    RETRIEVAL_POLICY_LOG,
+    get_retrieval_policy,
+    get_retrieval_policy_script,
+    parse_retrieval_policy_log,
+)
+from .screening_tools import get_screening_builders, get_screening_parameters
+from .stage_tools import (
+    STAGE_LOG,
+    STAGE_SCRIPT,
+    get_remaining_stages,
+    get_restart_filename,
+    get_stage_command,
+    get_stage_names,
+    get_stage_parameters,
+    get_stage_script,
+    parse_stage_log,
+)
+from .statistics_tools import (
+    combine_averages,
+    estimate_required_cycles,
+    merge_output_parameters,
+    merge_production_segments,
+)
+from .structure_tools import (
+    check_unit_cells,
+    compute_unit_cells,
+    get_perpendicular_widths,
+    get_unit_cells,
+)
+from .walltime_tools import (
+    WalltimeEstimator,
+    estimate_remaining_walltime,
+    parse_cycle_progress,
 )
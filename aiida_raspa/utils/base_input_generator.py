@@ -1,18 +1,71 @@
 """Basic raspa input generator."""
-from copy import deepcopy
 
 ORDERED_ITEMS_COMPONENT_SECTION = [
     "NumberOfIdentityChanges",
     "IdentityChangesList",
 ]
 
+# keywords whose value changes the rendering of other keywords, they can not vary in a compiled template
+TEMPLATE_FIXED_KEYWORDS = ("type", "BlockPocketsFileName")
 
-class RaspaInput:  # pylint: disable=too-few-public-methods
+# separates the static text of a compiled template from the slots of the varying keywords
+_SLOT_MARK = "\0"
+
+
+def _copy_containers(value):
+    """Copy the dictionaries and lists of a JSON-like structure, the other values are immutable and are shared."""
+    if isinstance(value, dict):
+        return {key: _copy_containers(val) for key, val in value.items()}
+    if isinstance(value, list):
+        return [_copy_containers(val) for val in value]
+    return value
+
+
+class _Slot:  # pylint: disable=too-few-public-methods
+    """Placeholder of a varying keyword, rendered as a mark that the template is split at."""
+
+    def __init__(self, index):
+        self.index = index
+
+    def __str__(self):
+        return f"{_SLOT_MARK}{self.index}{_SLOT_MARK}"
+
+
+class RaspaInputTemplate:  # pylint: disable=too-few-public-methods
+    """RASPA input file rendered once, in which only the values of a few keywords are filled in for each input.
+
+    Create it with `RaspaInput.compile`.
+    """
+
+    def __init__(self, text, paths):
+        """Construct a `RaspaInputTemplate` from the `text` rendered with the slots of the varying `paths`."""
+        self.paths = paths
+        parts = text.split(_SLOT_MARK)
+        self._static = parts[::2]
+        self._slots = [int(index) for index in parts[1::2]]
+
+    def render(self, *values):
+        """Return the input file with the `values` of the varying keywords, in the order of `paths`.
+
+        The result is the same as rendering the parameters in which these keywords have the given values.
+        """
+        if len(values) != len(self.paths):
+            raise ValueError(f"Expected {len(self.paths)} values, one per varying keyword, got {len(values)}.")
+        if any(isinstance(value, dict) for value in values):
+            raise ValueError("The values of the varying keywords can not be given per system.")
+        formatted = [RaspaInput.format_value(value) for value in values]
+        output = [self._static[0]]
+        for index, static in zip(self._slots, self._static[1:]):
+            output.append(formatted[index])
+            output.append(static)
+        return "".join(output)
+
+
+class RaspaInput:
     """Convert input dictionary into input file"""
 
     def __init__(self, params):
         """Construct a `RaspaInput` instance."""
-        self.params = deepcopy(params)  # make sure the original object is not modified
         try:
             self.system_order = sorted(params["System"].keys())  # we sort the keys to keep the order in the input
         except KeyError as err:
@@ -24,22 +77,23 @@ class RaspaInput:  # pylint: disable=too-few-public-methods
         if not self.system_order:
             raise ValueError("The System subdictionary should not be empty.")
 
+        self.params = _copy_containers(params)  # make sure the original object is not modified
+
     # --------------------------------------------------------------------------
     def render(self):
         """Perform conversion"""
         output = ["!!! Generated by AiiDA !!!"]
-        params = deepcopy(self.params)  # make sure it is idempotent
+        params = self.params  # nothing below modifies it, so that rendering is idempotent
 
         # General settings can be be rendered without any problems
-        section = params.pop("GeneralSettings")
-        self._render_section(output, section)
+        self._render_section(output, params["GeneralSettings"])
 
         # System section has to make sure to keep the order persistent, this is why we use
         # self.system_order to iterate through
-        section = params.pop("System")
+        section = params["System"]
         for my_id, name in enumerate(self.system_order):
-            system = section[name]
-            s_type = system.pop("type")
+            system = {key: val for key, val in section[name].items() if key != "type"}
+            s_type = section[name]["type"]
             output.append(f"{s_type} {my_id}")
             if s_type == "Framework":
                 output.append(f"{' ' * 3}FrameworkName {name}")
@@ -48,8 +102,9 @@ class RaspaInput:  # pylint: disable=too-few-public-methods
         # Section Component may contain parameters thar are for several systems
         # like:
         # CreateNumberOfMolecules n1, n2  <--- n1 is for system 0, n2 is for system 1
-        section = params.pop("Component")
+        section = params["Component"]
         for my_id, (name, molecule) in enumerate(section.items()):
+            molecule = dict(molecule)  # the items modified below are replaced, not changed in place
             output.append(f"Component {my_id} MoleculeName {name}")
             if "BlockPocketsFileName" in molecule:
                 if isinstance(molecule["BlockPocketsFileName"], dict):
@@ -60,7 +115,8 @@ class RaspaInput:  # pylint: disable=too-few-public-methods
                             f"You did not provide BlockPocketsFileName parameter for the system '{str(err)}'"
                         ) from err
 
-                    molecule["BlockPocketsFileName"] = bps
+                    # RASPA reads one file name per system, the systems without block pockets get a placeholder
+                    molecule["BlockPocketsFileName"] = [bp or "-" for bp in bps]
                     molecule["BlockPockets"] = ["yes" if bp else "no" for bp in bps]
                 elif isinstance(molecule["BlockPocketsFileName"], str):
                     molecule["BlockPockets"] = "yes"
@@ -84,6 +140,37 @@ class RaspaInput:  # pylint: disable=too-few-public-methods
 
         return "\n".join(output) + "\n"
 
+    def compile(self, paths):
+        """Render the parameters once into a template in which only the keywords at `paths` vary.
+
+        Rendering the template is much faster than rendering the parameters, and gives the same input file. It is
+        meant for sweeps over conditions, for example an isotherm:
+
+            template = RaspaInput(params).compile([("System", "irmof_1", "ExternalPressure")])
+            inputs = [template.render(pressure) for pressure in pressures]
+
+        :param paths: the (section, keyword) or (section, name, keyword) tuples of the varying keywords, for example
+            ("GeneralSettings", "NumberOfCycles") or ("Component", "methane", "SwapProbability"). The keywords do not
+            need to be present in the parameters.
+        :returns: a `RaspaInputTemplate`
+        """
+        params = _copy_containers(self.params)
+        paths = [tuple(path) for path in paths]
+        for index, path in enumerate(paths):
+            if path[0] == "GeneralSettings" and len(path) == 2:
+                section = params.setdefault("GeneralSettings", {})
+            elif path[0] in ("System", "Component") and len(path) == 3 and path[1] in params.get(path[0], {}):
+                section = params[path[0]][path[1]]
+            else:
+                raise ValueError(f"The path {path} does not point to a keyword of the parameters.")
+            if path[-1] in TEMPLATE_FIXED_KEYWORDS or path[-1] in ORDERED_ITEMS_COMPONENT_SECTION:
+                raise ValueError(f"The keyword '{path[-1]}' can not vary in a template.")
+            if isinstance(section.get(path[-1]), dict):
+                raise ValueError(f"The keyword '{path[-1]}' is given per system, it can not vary in a template.")
+            section[path[-1]] = _Slot(index)
+
+        return RaspaInputTemplate(RaspaInput(params).render(), paths)
+
     def _dict_to_ordered_list(self, input_dict):
         """Convert dict to ordered list.
 
@@ -125,10 +212,13 @@ class RaspaInput:  # pylint: disable=too-few-public-methods
         """
         It takes one key-value item and adds to the output file
         """
+        output.append(f"{' ' * indent}{key} {RaspaInput.format_value(val)}")
+
+    @staticmethod
+    def format_value(val):
+        """Return the value of a keyword as it is written in the input file."""
         if isinstance(val, list):
-            output.append(f"{' ' * indent}{key} {' '.join(str(p) for p in val)}")
-        elif isinstance(val, bool):
-            val_str = "yes" if val else "no"
-            output.append(f"{' ' * indent}{key} {val_str}")
-        else:
-            output.append(f"{' ' * indent}{key} {val}")
+            return " ".join(str(p) for p in val)
+        if isinstance(val, bool):
+            return "yes" if val else "no"
+        return str(val)
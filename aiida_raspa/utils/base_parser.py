@@ -2,6 +2,8 @@
 import re
 from math import isinf, isnan
 
+from .move_tools import parse_move_statistics
+
 float_base = float  # pylint: disable=invalid-name
 
 
@@ -101,6 +103,37 @@ def parse_block_energy(flines, res_dict, prop):
             return
 
 
+# manage CPU timings
+# --------------------------------------------------------------------------------------------
+CPU_TIMINGS_LIST = [
+    ("initialization:", "initialization"),
+    ("equilibration:", "equilibration"),
+    ("production run:", "production"),
+    ("total time:", "total"),
+]
+
+
+def parse_cpu_timings(flines, res_dict):
+    """Parse CPU timings block.
+
+    Parse block that looks as follows::
+
+        Total CPU timings:
+        ===========================================
+        initialization:              1.092585 [s]
+        equilibration:                      0 [s]
+        production run:              2.186894 [s]
+        total time:                  3.279479 [s]
+    """
+    res_dict["cpu_time_unit"] = "s"
+    for line in flines:
+        for key, prop in CPU_TIMINGS_LIST:
+            if line.startswith(key):
+                res_dict[f"cpu_time_{prop}"] = float(line.split()[-2])
+        if line.startswith("total time:"):
+            return
+
+
 # manage lines with components
 # --------------------------------------------------------------------------------------------
 LINES_WITH_COMPONENT_LIST = [
@@ -131,6 +164,7 @@ def parse_base_output(output_contents, system_name, ncomponents):
     for i in range(ncomponents):
         res_per_component.append({})
     result_dict = {"exceeded_walltime": False}
+    move_statistics = parse_move_statistics(output_contents)
 
     output_contents = iter(output_contents.split("\n"))
 
@@ -179,6 +213,8 @@ def parse_base_output(output_contents, system_name, ncomponents):
             icomponent += 1
             if icomponent < ncomponents:
                 res_cmp = res_per_component[icomponent]
+        if "Number of framework atoms:" in line and "number_of_framework_atoms" not in result_dict:
+            result_dict["number_of_framework_atoms"] = int(line.split()[-1])
         if "Framework Density" in line:
             result_dict["framework_density"] = line.split()[2]
             result_dict["framework_density_unit"] = re.sub(r"[{}()\[\]]", "", line.split()[3])
@@ -208,6 +244,9 @@ def parse_base_output(output_contents, system_name, ncomponents):
                     if parse[1] == "ads/ads" and parse[2] == "coulomb":
                         reading = None
 
+        if "Total CPU timings:" in line:
+            parse_cpu_timings(output_contents, result_dict)
+
         if "Average properties of the system" in line:
             break
 
@@ -301,6 +340,7 @@ def parse_base_output(output_contents, system_name, ncomponents):
     return_dictionary = {"general": result_dict, "components": {}}
 
     for name, value in zip(component_names, res_per_component):
+        value["move_statistics"] = move_statistics.get(name, {})
         return_dictionary["components"][name] = value
 
     # Parsing all the warning that are printed in the output file, avoiding redoundancy
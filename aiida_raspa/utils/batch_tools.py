@@ -0,0 +1,90 @@
+"""Tools to group many small RASPA calculations into few scheduler jobs."""
+import json
+from math import ceil
+
+from aiida.plugins import CalculationFactory
+
+# inputs of a `RaspaCalculation` that are shared by all the tasks of a `RaspaFarmCalculation`
+SHARED_NAMESPACES = ("framework", "block_pocket", "file")
+
+# inputs of a `RaspaCalculation` that have no counterpart in a `RaspaFarmCalculation`
+UNSUPPORTED_INPUTS = ("settings", "grids", "parent_folder", "retrieved_parent_folder")
+
+
+def get_batch_key(builder):
+    """Return the key that identifies the `RaspaCalculation` builders that can run in the same scheduler job.
+
+    Builders are compatible if they use the same code and the same scheduler options (resources, walltime, queue...).
+
+    :raises ValueError: if the builder uses inputs that are not supported by `RaspaFarmCalculation`
+    """
+    unsupported = [name for name in UNSUPPORTED_INPUTS if builder.get(name)]
+    if unsupported:
+        raise ValueError(f"Calculations with the {', '.join(unsupported)} input(s) can not be batched.")
+    options = dict(builder.metadata.get("options", {}))
+    return builder.code.uuid, json.dumps(options, sort_keys=True, default=str)
+
+
+def get_batch_builders(builders, max_tasks=None, max_concurrent_tasks=1):
+    """Group compatible `RaspaCalculation` builders into `RaspaFarmCalculation` builders.
+
+    Every calculation becomes a task of a farm calculation, the results of the calculation `name` are returned in the
+    `output_parameters.name` output of the farm. Two calculations are only grouped if the framework, block pocket and
+    file inputs with the same name are the same nodes.
+
+    The walltime of a farm is the walltime of a single calculation times the number of tasks run one after the other.
+
+    :param builders: dictionary of `RaspaCalculation` builders, the keys are used as task names
+    :param max_tasks: maximum number of tasks in one farm calculation (default: no limit)
+    :param max_concurrent_tasks: number of tasks run at the same time, i.e. number of cores requested for each farm
+    :raises ValueError: if a builder can not be batched
+    :returns: list of `RaspaFarmCalculation` builders
+    """
+    groups = []
+    for name, builder in builders.items():
+        if not name.isidentifier():
+            raise ValueError(f"The task name '{name}' is not a valid identifier.")
+        key = get_batch_key(builder)
+        for group in groups:
+            if group["key"] == key and _is_compatible(group, builder) and len(group["tasks"]) != max_tasks:
+                break
+        else:
+            group = {"key": key, "tasks": {}, **{namespace: {} for namespace in SHARED_NAMESPACES}}
+            groups.append(group)
+
+        group["tasks"][name] = builder
+        for namespace in SHARED_NAMESPACES:
+            group[namespace].update(builder.get(namespace, {}))
+
+    return [_get_farm_builder(group, max_concurrent_tasks) for group in groups]
+
+
+def _is_compatible(group, builder):
+    """Check that the shared inputs of `builder` do not clash with the ones of the group."""
+    for namespace in SHARED_NAMESPACES:
+        for label, node in builder.get(namespace, {}).items():
+            if label in group[namespace] and group[namespace][label].uuid != node.uuid:
+                return False
+    return True
+
+
+def _get_farm_builder(group, max_concurrent_tasks):
+    """Construct the `RaspaFarmCalculation` builder that runs all the tasks of the group."""
+    RaspaFarmCalculation = CalculationFactory("raspa.farm")  # pylint: disable=invalid-name
+
+    first = next(iter(group["tasks"].values()))
+    nprocs = min(max_concurrent_tasks, len(group["tasks"]))
+    options = dict(first.metadata.get("options", {}))
+    options.pop("parser_name", None)
+    options["resources"] = {"num_machines": 1, "num_mpiprocs_per_machine": nprocs}
+    if "max_wallclock_seconds" in options:
+        options["max_wallclock_seconds"] *= ceil(len(group["tasks"]) / nprocs)
+
+    builder = RaspaFarmCalculation.get_builder()
+    builder.code = first.code
+    builder.parameters = {name: task.parameters for name, task in group["tasks"].items()}
+    for namespace in SHARED_NAMESPACES:
+        if group[namespace]:
+            builder[namespace] = group[namespace]
+    builder.metadata.options = options
+    return builder
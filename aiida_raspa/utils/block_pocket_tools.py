@@ -0,0 +1,93 @@
+"""Tools to store the Zeo++ block pocket files once and reuse them in later calculations."""
+import hashlib
+import json
+import re
+
+from aiida.orm import QueryBuilder, SinglefileData
+
+BLOCK_POCKET_EXTRA = "raspa_block_pocket"
+
+
+def get_block_pocket_key(framework, probe_radius, molecule):
+    """Return the key under which the block pocket file of a framework is registered.
+
+    :param framework: `CifData` node of the framework
+    :param probe_radius: radius of the probe used to compute the block pockets (Angstrom)
+    :param molecule: name of the molecule (component) the pockets are blocked for
+    :returns: hexadecimal hash
+    """
+    content = {
+        "framework": framework.base.caching.get_hash(),
+        "probe_radius": round(float(probe_radius), 4),
+        "molecule": molecule,
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def register_block_pocket(block_pocket, framework, probe_radius, molecule):
+    """Add a block pocket file to the registry, the node is stored if needed.
+
+    :param block_pocket: `SinglefileData` node with the block pocket file computed by Zeo++
+    :returns: the stored block pocket node
+    """
+    if not block_pocket.is_stored:
+        block_pocket.store()
+    block_pocket.base.extras.set(
+        BLOCK_POCKET_EXTRA,
+        {
+            "key": get_block_pocket_key(framework, probe_radius, molecule),
+            "framework": framework.uuid,
+            "probe_radius": float(probe_radius),
+            "molecule": molecule,
+        },
+    )
+    return block_pocket
+
+
+def find_block_pocket(framework, probe_radius, molecule):
+    """Return the most recently registered block pocket file for a framework, probe radius and molecule.
+
+    :returns: `SinglefileData` node or None if no block pocket file was registered
+    """
+    query = QueryBuilder()
+    query.append(
+        SinglefileData,
+        filters={f"extras.{BLOCK_POCKET_EXTRA}.key": get_block_pocket_key(framework, probe_radius, molecule)},
+        tag="block_pocket",
+    )
+    query.order_by({"block_pocket": {"ctime": "desc"}})
+    return query.first(flat=True)
+
+
+def get_block_pockets(parameters, frameworks, probe_radius):
+    """Look up the registered block pockets of all the framework and component pairs of a calculation.
+
+    Components that already define `BlockPocketsFileName`, or that have no entry in a dictionary of probe radii, are
+    skipped.
+
+    :param parameters: dictionary with the RASPA parameters
+    :param frameworks: dictionary of the `CifData` frameworks, keyed by framework name
+    :param probe_radius: probe radius, or dictionary of probe radii keyed by component
+    :returns: tuple with the `BlockPocketsFileName` of each component, as a dictionary keyed by system name (None for
+        the systems without block pockets), and the dictionary of the block pocket nodes, keyed by file name
+    """
+    file_names = {}
+    block_pockets = {}
+    for molecule, component in parameters["Component"].items():
+        if "BlockPocketsFileName" in component:
+            continue
+        if isinstance(probe_radius, dict) and molecule not in probe_radius:
+            continue
+        radius = probe_radius[molecule] if isinstance(probe_radius, dict) else probe_radius
+        names = {}
+        for name, system in parameters["System"].items():
+            names[name] = None
+            if system["type"] != "Framework" or name not in frameworks:
+                continue
+            block_pocket = find_block_pocket(frameworks[name], radius, molecule)
+            if block_pocket is not None:
+                names[name] = re.sub(r"\W", "_", f"{name}_{molecule}")
+                block_pockets[names[name]] = block_pocket
+        if any(names.values()):
+            file_names[molecule] = names
+    return file_names, block_pockets
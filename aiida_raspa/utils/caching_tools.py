@@ -0,0 +1,90 @@
+"""Tools to recognize equivalent RASPA calculations for caching."""
+from .keyword_schema import BOOL, INT, KEYWORD_NAMES, SECTION_KEYWORDS
+
+# parameters that only control how often RASPA writes its output and restart files. `PrintEvery` is not one of them,
+# since the loadings printed every `PrintEvery` cycles are the samples of the convergence monitor and the pilot runs
+HASH_IGNORED_PARAMETERS = ("PrintPropertiesEvery", "WriteBinaryRestartFileEvery")
+
+# settings that do not change the simulation
+HASH_IGNORED_SETTINGS = ("cmdline", "additional_retrieve_list")
+
+
+def _normalize_token(token, kind):
+    """Convert a word of a RASPA input line to the type it is read as."""
+    try:
+        if kind == BOOL:
+            return {"yes": True, "no": False}[token.lower()]
+        if kind == INT:
+            return int(token)
+        # the arguments of the other keywords are mostly read as floats, one per system or component
+        return float(token)
+    except (KeyError, ValueError):
+        pass
+    return token
+
+
+def _get_tokens(value):
+    """Return the words into which a parameter value is rendered."""
+    if isinstance(value, list):
+        return [token for item in value for token in _get_tokens(item)]
+    if isinstance(value, bool):
+        return ["yes" if value else "no"]
+    return str(value).split()
+
+
+def _normalize_value(value, kind):
+    """Return the arguments of a keyword as they are read by RASPA, regardless of how they were written."""
+    if isinstance(value, dict):
+        return {key: _normalize_value(val, kind) for key, val in value.items()}
+    if value is None:
+        return None
+    tokens = [_normalize_token(token, kind) for token in _get_tokens(value)]
+    return tokens[0] if len(tokens) == 1 else tokens
+
+
+def _normalize_section(section, params):
+    """Normalize the keywords of one (sub)section."""
+    keywords = SECTION_KEYWORDS[section]
+    normalized = {}
+    for key, value in params.items():
+        kind = keywords.get(key.lower())
+        if kind is None:
+            normalized[key] = value
+            continue
+        name = KEYWORD_NAMES[key.lower()]
+        if name not in HASH_IGNORED_PARAMETERS:
+            normalized[name] = _normalize_value(value, kind)
+    return normalized
+
+
+def normalize_parameters(parameters):
+    """Return a canonical form of the RASPA parameters.
+
+    The keywords get their canonical spelling and their values the type RASPA reads them as, so that for example
+    `"ExternalPressure": "1e5"` and `"externalpressure": 100000.0` are the same. The keywords that only control the
+    output frequency are dropped.
+    """
+    normalized = dict(parameters)
+    if isinstance(parameters.get("GeneralSettings"), dict):
+        normalized["GeneralSettings"] = _normalize_section("GeneralSettings", parameters["GeneralSettings"])
+    for section in ("System", "Component"):
+        if isinstance(parameters.get(section), dict):
+            normalized[section] = {
+                name: _normalize_section(section, params) if isinstance(params, dict) else params
+                for name, params in parameters[section].items()
+            }
+    return normalized
+
+
+def normalize_settings(settings):
+    """Return the settings without the ones that do not change the simulation, the parameters of the stages are
+    normalized like the `parameters` input."""
+    normalized = {key: value for key, value in settings.items() if key not in HASH_IGNORED_SETTINGS}
+    if isinstance(normalized.get("stages"), list):
+        normalized["stages"] = [
+            dict(stage, parameters=normalize_parameters(stage["parameters"]))
+            if isinstance(stage, dict) and isinstance(stage.get("parameters"), dict)
+            else stage
+            for stage in normalized["stages"]
+        ]
+    return normalized
@@ -0,0 +1,114 @@
+"""Tools to detect RASPA simulations without any charged atom."""
+import re
+
+PSEUDO_ATOMS_FILE = "pseudo_atoms.def"
+CHARGE_TOLERANCE = 1e-10
+
+
+def parse_pseudo_atoms(contents):
+    """Return the charges of the pseudo atoms defined in the content of a `pseudo_atoms.def` file."""
+    lines = [line.split() for line in contents.splitlines() if line.strip() and not line.lstrip().startswith("#")]
+    return {words[0]: float(words[6]) for words in lines[1:]}
+
+
+def parse_molecule_atom_types(contents):
+    """Return the pseudo atoms used in the content of a molecule definition file."""
+    atom_types = []
+    reading = False
+    for line in contents.splitlines():
+        if line.lstrip().startswith("#"):
+            reading = "atomic positions" in line.lower()
+        elif reading and line.strip():
+            atom_types.append(line.split()[1])
+    return atom_types
+
+
+def get_framework_charges(cif, pseudo_atoms, use_cif_charges, remove_number_code):
+    """Return the charges RASPA assigns to the atoms of a framework.
+
+    Atoms take the charge of the pseudo atom with the same label, unless `UseChargesFromCIFFile` is set or the label
+    is not a pseudo atom, in which case the charge is read from the CIF file (zero if the file has no charges).
+    """
+    block = cif.values[cif.values.keys()[0]]
+    labels = list(block["_atom_site_label"])
+    if "_atom_site_charge" in block:
+        cif_charges = [float(re.sub(r"\(\d+\)$", "", charge)) for charge in block["_atom_site_charge"]]
+    else:
+        cif_charges = [0.0] * len(labels)
+
+    charges = []
+    for label, cif_charge in zip(labels, cif_charges):
+        if remove_number_code:
+            label = re.match(r"[a-zA-Z]*", label.split("_")[0]).group()
+        if use_cif_charges or label not in pseudo_atoms:
+            charges.append(cif_charge)
+        else:
+            charges.append(pseudo_atoms[label])
+    return charges
+
+
+def _is_yes(value):
+    """Return True if a RASPA boolean keyword is switched on."""
+    return value is True or str(value).lower() == "yes"
+
+
+def has_charges(parameters, frameworks, files):
+    """Check whether any atom of the simulation carries a charge.
+
+    The charges can only be determined if the force field and the molecule definitions are provided as input files
+    (`Local`), since the files of the RASPA installation are not available before the submission. They are not
+    determined either if RASPA computes the charges of the frameworks by charge equilibration.
+
+    :param parameters: dictionary with the RASPA parameters
+    :param frameworks: dictionary of the `CifData` frameworks, keyed by framework name
+    :param files: dictionary of the additional `SinglefileData` inputs
+    :returns: True or False, or None if the charges can not be determined
+    """
+    general = parameters["GeneralSettings"]
+    files = {node.filename: node for node in files.values()}
+    if general.get("Forcefield") != "Local" or PSEUDO_ATOMS_FILE not in files:
+        return None
+    if _is_yes(general.get("ChargeFromChargeEquilibration", False)):
+        return None
+    pseudo_atoms = parse_pseudo_atoms(files[PSEUDO_ATOMS_FILE].get_content())
+
+    charges = []
+    for name, component in parameters["Component"].items():
+        if component.get("MoleculeDefinition") != "Local" or f"{name}.def" not in files:
+            return None
+        atom_types = parse_molecule_atom_types(files[f"{name}.def"].get_content())
+        if not set(atom_types).issubset(pseudo_atoms):
+            return None
+        charges += [pseudo_atoms[atom_type] for atom_type in atom_types]
+
+    for name, system in parameters["System"].items():
+        if system["type"] != "Framework":
+            continue
+        if name not in frameworks:
+            return None
+        charges += get_framework_charges(
+            frameworks[name],
+            pseudo_atoms,
+            use_cif_charges=_is_yes(general.get("UseChargesFromCIFFile", False)),
+            remove_number_code=_is_yes(
+                system.get("RemoveAtomNumberCodeFromLabel", general.get("RemoveAtomNumberCodeFromLabel", False))
+            ),
+        )
+
+    return any(abs(charge) > CHARGE_TOLERANCE for charge in charges)
+
+
+def check_charge_method(parameters, frameworks, files):
+    """Switch off the charge method if none of the atoms of the simulation is charged.
+
+    :param parameters: dictionary with the RASPA parameters, modified in place
+    :param frameworks: dictionary of the `CifData` frameworks, keyed by framework name
+    :param files: dictionary of the additional `SinglefileData` inputs
+    :returns: list of warnings about the changes
+    """
+    if str(parameters["GeneralSettings"].get("ChargeMethod", "Ewald")).lower() == "none":
+        return []
+    if has_charges(parameters, frameworks, files) is not False:
+        return []
+    parameters["GeneralSettings"]["ChargeMethod"] = "None"
+    return ["None of the atoms is charged: the ChargeMethod is set to None."]
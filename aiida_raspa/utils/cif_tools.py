@@ -0,0 +1,188 @@
+"""Tools to convert the frameworks once into P1 CIF files, which RASPA reads without expanding the symmetry."""
+import io
+import re
+from fractions import Fraction
+
+import numpy as np
+from aiida.engine import calcfunction
+from aiida.orm import CifData, Dict, QueryBuilder
+
+from .structure_tools import CELL_PARAMETERS, cell_from_parameters, get_cell_parameters
+
+NORMALIZED_CIF_EXTRA = "raspa_normalized_cif"
+SYMMETRY_OPERATION_KEYS = ("_symmetry_equiv_pos_as_xyz", "_space_group_symop_operation_xyz")
+SPACE_GROUP_KEYS = ("_symmetry_space_group_name_H-M", "_space_group_name_H-M_alt")
+OVERLAP_TOLERANCE = 0.1  # Angstrom, symmetry copies of a site closer than this are the same atom
+
+_SYMMETRY_TERM = re.compile(r"([+-]?)(\d*\.?\d+(?:/\d+)?)?\*?([xyz])?")
+
+
+def _strip_uncertainty(value):
+    """Remove the standard uncertainty from a CIF number, e.g. 0.1234(5).
+
+    :returns: the number, or None for the placeholders of unknown ('?') and inapplicable ('.') values
+    """
+    value = str(value).strip()
+    if value in ("?", "."):
+        return None
+    return float(re.sub(r"\(\d+\)$", "", value))
+
+
+def parse_symmetry_operation(operation):
+    """Convert a symmetry operation in the xyz notation into a rotation matrix and a translation vector.
+
+    :param operation: symmetry operation, e.g. '-x+1/2, y, -z'
+    :returns: tuple with the rotation matrix (3x3) and the translation vector (3) acting on fractional coordinates
+    """
+    components = operation.replace(" ", "").lower().split(",")
+    if len(components) != 3:
+        raise ValueError(f"Could not parse the symmetry operation '{operation}'.")
+
+    rotation = np.zeros((3, 3))
+    translation = np.zeros(3)
+    for row, component in enumerate(components):
+        for sign, number, axis in _SYMMETRY_TERM.findall(component):
+            if not number and not axis:
+                continue
+            value = float(Fraction(number)) if number else 1.0
+            value = -value if sign == "-" else value
+            if axis:
+                rotation[row, "xyz".index(axis)] += value
+            else:
+                translation[row] += value
+    return rotation, translation
+
+
+def expand_site(position, operations, cell, tolerance=OVERLAP_TOLERANCE):
+    """Return the symmetry copies of a site in the unit cell, without duplicates.
+
+    :param position: fractional coordinates of the site
+    :param operations: list of (rotation, translation) tuples
+    :param cell: cell vectors as rows, used to measure the distance between the copies
+    :returns: array of shape (n, 3) with the fractional coordinates of the distinct copies, in [0, 1)
+    """
+    copies = np.array([rotation @ position + translation for rotation, translation in operations])
+    copies = np.round(copies % 1.0, 10) % 1.0
+    distinct = []
+    for copy in copies:
+        if distinct:
+            delta = np.asarray(distinct) - copy
+            delta -= np.round(delta)
+            if np.min(np.linalg.norm(delta @ cell, axis=1)) < tolerance:
+                continue
+        distinct.append(copy)
+    return np.asarray(distinct)
+
+
+def _read_atom_sites(block):
+    """Read the atom sites of a CIF block.
+
+    :returns: tuple with the dictionary of the label columns, the fractional positions (n x 3) and the list of the
+        charges, None if the block has no charges. Charges that are not known ('?' or '.') are set to zero.
+    """
+    columns = {key: list(block[key]) for key in ("_atom_site_label", "_atom_site_type_symbol") if key in block}
+    positions = [[_strip_uncertainty(x) for x in block[f"_atom_site_fract_{axis}"]] for axis in "xyz"]
+    if any(x is None for axis in positions for x in axis):
+        raise ValueError("The CIF file contains atom sites without fractional coordinates.")
+    charges = [_strip_uncertainty(q) for q in block["_atom_site_charge"]] if "_atom_site_charge" in block else []
+    if all(q is None for q in charges):
+        charges = None
+    else:
+        charges = [0.0 if q is None else q for q in charges]
+    return columns, np.array(positions, dtype=float).T, charges
+
+
+def _expand_atom_sites(columns, positions, charges, operations, cell):
+    """Return the lines of the atoms in the unit cell and their net charge (zero without charges)."""
+    atoms = []
+    net_charge = 0.0
+    for site, position in enumerate(positions):
+        for copy in expand_site(position, operations, cell):
+            words = [values[site] for values in columns.values()] + [f"{x:.8f}" for x in copy]
+            if charges is not None:
+                words.append(f"{charges[site]:.8f}")
+                net_charge += charges[site]
+            atoms.append(" ".join(words))
+    return atoms, net_charge
+
+
+def _get_p1_header(name, cell_parameters, columns, with_charges):
+    """Return the lines of a P1 CIF file up to the loop of the atom sites, including its column names."""
+    lines = [f"data_{re.sub(r'[^A-Za-z0-9_.-]', '_', name)}", ""]
+    lines += [f"{key:<24}{value:.6f}" for key, value in zip(CELL_PARAMETERS, cell_parameters)]
+    lines += ["", "_symmetry_space_group_name_H-M    'P 1'", "_symmetry_Int_Tables_number       1", ""]
+    lines += ["loop_", "_symmetry_equiv_pos_as_xyz", "'x, y, z'", "", "loop_"]
+    lines += columns + [f"_atom_site_fract_{axis}" for axis in "xyz"]
+    if with_charges:
+        lines.append("_atom_site_charge")
+    return lines
+
+
+def get_p1_cif(cif):
+    """Expand the symmetry of a framework and write it as a P1 CIF file.
+
+    The labels, type symbols and charges of the atoms are kept, since RASPA assigns the pseudo atoms and the charges
+    of the framework from them.
+
+    :param cif: `CifData` node
+    :returns: tuple with the content of the P1 CIF file and a dictionary with metadata of the framework
+    """
+    block = cif.values[cif.values.keys()[0]]
+    cell_parameters = get_cell_parameters(cif)
+
+    operations = next((block[key] for key in SYMMETRY_OPERATION_KEYS if key in block), ["x,y,z"])
+    operations = [parse_symmetry_operation(operation) for operation in operations]
+    columns, positions, charges = _read_atom_sites(block)
+
+    atoms, net_charge = _expand_atom_sites(
+        columns, positions, charges, operations, cell_from_parameters(cell_parameters)
+    )
+    metadata = {
+        "cell_parameters": cell_parameters,
+        "space_group": next((block[key] for key in SPACE_GROUP_KEYS if key in block), "P 1"),
+        "number_of_symmetry_operations": len(operations),
+        "number_of_atoms": len(atoms),
+        "net_charge": net_charge if charges is not None else None,
+    }
+    header = _get_p1_header(cif.values.keys()[0], cell_parameters, list(columns), charges is not None)
+    return "\n".join(header + atoms) + "\n", metadata
+
+
+@calcfunction
+def normalize_cif(cif):
+    """Convert a framework into a P1 CIF file with the symmetry expanded."""
+    content, metadata = get_p1_cif(cif)
+    return {
+        "cif": CifData(file=io.BytesIO(content.encode("utf-8")), filename=cif.filename),
+        "metadata": Dict(metadata),
+    }
+
+
+def find_normalized_cif(cif):
+    """Return the P1 version of a framework, if it was created with `get_normalized_cif`.
+
+    :param cif: `CifData` node of the framework
+    :returns: `CifData` node or None
+    """
+    if not cif.is_stored:
+        return None
+    query = QueryBuilder()
+    query.append(CifData, filters={f"extras.{NORMALIZED_CIF_EXTRA}": cif.base.caching.get_hash()}, tag="cif")
+    query.order_by({"cif": {"ctime": "desc"}})
+    return query.first(flat=True)
+
+
+def get_normalized_cif(cif):
+    """Return the P1 version of a framework, converting and registering it if it does not exist yet.
+
+    The P1 version is registered under the hash of the framework, so that it is found again for any copy of the same
+    CIF file.
+
+    :param cif: stored `CifData` node of the framework
+    :returns: stored `CifData` node
+    """
+    normalized = find_normalized_cif(cif)
+    if normalized is None:
+        normalized = normalize_cif(cif)["cif"]
+        normalized.base.extras.set(NORMALIZED_CIF_EXTRA, cif.base.caching.get_hash())
+    return normalized
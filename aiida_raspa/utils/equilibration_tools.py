@@ -0,0 +1,58 @@
+"""Tools to detect the end of the equilibration of a RASPA simulation."""
+import numpy as np
+
+from .monitor_tools import parse_production_blocks
+
+
+def mser_truncation(values, batch_size=1, max_fraction=0.5):
+    """Return the number of initial values to discard with the Marginal Standard Error Rule (MSER).
+
+    The truncation minimizes the squared standard error of the mean of the remaining values,
+    `sum((x_i - mean)**2) / (n - d)**2`, which is computed for all the truncations `d` at once from cumulative sums.
+    With a `batch_size` larger than 1 the rule is applied to the batch means, e.g. MSER-5 for a size of 5.
+
+    :param values: the series, ordered in time
+    :param batch_size: number of values averaged in a batch
+    :param max_fraction: largest fraction of the series that can be discarded
+    :returns: the number of values to discard, None if the series is too short or if the standard error still
+        decreases after discarding `max_fraction` of the series, i.e. the series is not equilibrated
+    """
+    values = np.asarray(values, dtype=float)
+    nbatches = len(values) // batch_size
+    if nbatches < 4:
+        return None
+    batches = values[: nbatches * batch_size].reshape(nbatches, batch_size).mean(axis=1)
+
+    # sums over the batches that are kept, for every truncation
+    sums = np.cumsum(batches[::-1])[::-1]
+    sums_of_squares = np.cumsum(batches[::-1] ** 2)[::-1]
+    counts = np.arange(nbatches, 0, -1)
+    mser = np.maximum(sums_of_squares - sums**2 / counts, 0) / counts**2
+
+    max_truncation = int(max_fraction * nbatches)
+    truncation = int(np.argmin(mser[: max_truncation + 1]))
+    if truncation == max_truncation and max_truncation > 0:
+        return None
+    return truncation * batch_size
+
+
+def detect_equilibration(output_contents, batch_size=1, max_fraction=0.5):
+    """Return the production cycle after which a RASPA simulation is equilibrated.
+
+    The MSER truncation is computed for the total potential energy and the loading of every component printed every
+    `PrintEvery` production cycles, the simulation is equilibrated once all of them are.
+
+    :param output_contents: the output of a simulation without initialization cycles
+    :param batch_size: number of printed values averaged in a batch
+    :param max_fraction: largest fraction of the simulation that can be discarded
+    :returns: the production cycle, None if the simulation did not equilibrate
+    """
+    blocks = parse_production_blocks(output_contents)
+    series = [[block["energy"] for block in blocks]]
+    for name in blocks[0]["loadings"] if blocks else []:
+        series.append([block["loadings"].get(name, 0.0) for block in blocks])
+
+    truncations = [mser_truncation(values, batch_size, max_fraction) for values in series]
+    if any(truncation is None for truncation in truncations):
+        return None
+    return blocks[max(truncations)]["cycle"]
@@ -0,0 +1,134 @@
+"""Tools to generate RASPA energy grids once and reuse them in later calculations."""
+import hashlib
+import json
+
+from aiida.orm import CalcJobNode, Computer, QueryBuilder, RemoteData
+
+from .caching_tools import normalize_parameters
+from .structure_tools import DEFAULT_CUTOFF
+
+RASPA_DIR_FOLDER = "RaspaDir"
+GRID_CACHE_EXTRA = "raspa_grids"
+
+# settings that change the energy grids of a framework, spelled as by `normalize_parameters`
+GRID_GENERAL_SETTINGS = (
+    "ForceField",
+    "CutOff",
+    "CutOffVDW",
+    "CutOffChargeCharge",
+    "ChargeMethod",
+    "EwaldPrecision",
+    "UseChargesFromCIFFile",
+    "SpacingVDWGrid",
+    "SpacingCoulombGrid",
+)
+GRID_FRAMEWORK_SETTINGS = ("UseChargesFromCIFFile", "RemoveAtomNumberCodeFromLabel")
+
+# RASPA defaults of the grid settings, so that an omitted setting and its explicit default give the same key.
+# `CutOffVDW` and `CutOffChargeCharge` default to `CutOff`.
+GRID_SETTING_DEFAULTS = {
+    "CutOff": DEFAULT_CUTOFF,
+    "ChargeMethod": "Ewald",
+    "EwaldPrecision": 1e-6,
+    "UseChargesFromCIFFile": False,
+    "RemoveAtomNumberCodeFromLabel": False,
+    "SpacingVDWGrid": 0.1,
+    "SpacingCoulombGrid": 0.1,
+}
+
+RASPA_DIR_TEMPLATE = """# use a private RASPA directory, so that the energy grids are stored in the working directory
+_raspa_share="${{RASPA2_DIR:-${{RASPA_DIR:-$HOME/RASPA/simulations}}}}/share/raspa"
+mkdir -p {folder}/share/raspa/grids
+for _raspa_item in "$_raspa_share"/*; do
+    [ "$(basename "$_raspa_item")" = grids ] || ln -sfn "$_raspa_item" {folder}/share/raspa/
+done
+export RASPA_DIR="$PWD/{folder}" RASPA2_DIR="$PWD/{folder}"
+"""
+
+
+def is_make_grid(parameters):
+    """Return True if the RASPA parameters describe a calculation that only generates the energy grids."""
+    return str(parameters["GeneralSettings"].get("SimulationType", "")).lower() == "makegrid"
+
+
+def get_raspa_dir_script():
+    """Return the bash snippet that sets up the private RASPA directory in the working directory.
+
+    All the content of the `share/raspa` folder of the RASPA installation is linked, except for the `grids` folder,
+    which is either filled by a MakeGrid calculation or contains the links to the grids of previous calculations.
+    """
+    return RASPA_DIR_TEMPLATE.format(folder=RASPA_DIR_FOLDER)
+
+
+def get_grid_folder(forcefield, framework_name):
+    """Return the folder, relative to the working directory, that contains the grids of a framework."""
+    return f"{RASPA_DIR_FOLDER}/share/raspa/grids/{forcefield}/{framework_name}"
+
+
+def get_grid_key(parameters, framework_name, framework, files=None):
+    """Return the key under which the energy grids of a framework are cached.
+
+    The key is the hash of the framework, the force field (name, settings and files), the probe atoms (`GridTypes`)
+    and the grid spacing. The settings are normalized first, so that e.g. `CutOff: 12` and `CutOff: 12.0`, or an
+    omitted `ChargeMethod` and `ChargeMethod: Ewald`, give the same key.
+
+    :param parameters: dictionary with the RASPA parameters
+    :param framework_name: name of the framework in the `System` section
+    :param framework: `CifData` node of the framework
+    :param files: dictionary of the additional `SinglefileData` inputs, e.g. the force field files
+    :returns: hexadecimal hash
+    """
+    normalized = normalize_parameters(
+        {
+            "GeneralSettings": parameters["GeneralSettings"],
+            "System": {framework_name: parameters["System"][framework_name]},
+        }
+    )
+    general = {**GRID_SETTING_DEFAULTS, **normalized["GeneralSettings"]}
+    general.setdefault("CutOffVDW", general["CutOff"])
+    general.setdefault("CutOffChargeCharge", general["CutOff"])
+    system = {**GRID_SETTING_DEFAULTS, **normalized["System"][framework_name]}
+    grid_types = general.get("GridTypes", [])
+    if not isinstance(grid_types, list):
+        grid_types = [grid_types]
+
+    content = {
+        "framework": framework.base.caching.get_hash(),
+        "framework_name": framework_name,
+        "files": sorted(node.base.caching.get_hash() for node in (files or {}).values()),
+        "general": {key: general.get(key) for key in GRID_GENERAL_SETTINGS},
+        "system": {key: system.get(key) for key in GRID_FRAMEWORK_SETTINGS},
+        "grid_types": sorted(grid_types),
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def find_cached_grids(parameters, frameworks, computer, files=None):
+    """Find the remote folders of the MakeGrid calculations that generated the grids needed by a calculation.
+
+    Only successful calculations that ran on `computer` are considered, the most recent one is used.
+
+    :param parameters: dictionary with the RASPA parameters
+    :param frameworks: dictionary of the `CifData` frameworks, keyed by framework name
+    :param computer: computer on which the calculation is going to run
+    :param files: dictionary of the additional `SinglefileData` inputs, e.g. the force field files
+    :returns: dictionary of `RemoteData` nodes, keyed by framework name
+    """
+    grids = {}
+    for name, system in parameters["System"].items():
+        if system["type"] != "Framework" or name not in frameworks:
+            continue
+        key = get_grid_key(parameters, name, frameworks[name], files)
+        query = QueryBuilder()
+        query.append(
+            CalcJobNode,
+            filters={f"extras.{GRID_CACHE_EXTRA}.{name}": key, "attributes.exit_status": 0},
+            tag="calc",
+        )
+        query.append(RemoteData, with_incoming="calc", tag="remote", project="*")
+        query.append(Computer, with_node="remote", filters={"uuid": computer.uuid})
+        query.order_by({"calc": {"ctime": "desc"}})
+        result = query.first()
+        if result is not None:
+            grids[name] = result[0]
+    return grids
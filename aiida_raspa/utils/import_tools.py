@@ -0,0 +1,290 @@
+"""Tools to import RASPA simulations that were run outside of AiiDA."""
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+from aiida.common import LinkType
+from aiida.engine import ProcessState
+from aiida.manage import get_manager
+from aiida.orm import CalcJobNode, Dict, FolderData, List, QueryBuilder
+from aiida.plugins import DataFactory
+
+from .base_input_generator import RaspaInput
+from .base_parser import parse_base_output
+from .keyword_schema import KEYWORD_NAMES, SYSTEM_TYPES
+
+IMPORTED_RUN_EXTRA = "raspa_imported_from"
+
+SYSTEM_TYPE_NAMES = {system_type.lower(): system_type for system_type in SYSTEM_TYPES}
+
+# lines starting with these characters are not keywords
+COMMENT_CHARACTERS = ("#", "!", "/")
+
+# exit codes of `RaspaCalculation` set on the imported calculations
+EXIT_STATUS_NO_OUTPUT_FILE = 101
+EXIT_STATUS_SIMULATION_DID_NOT_START = 102
+EXIT_STATUS_TIMEOUT = 500
+
+
+def _parse_value(arguments):
+    """Convert the arguments of a keyword, a single number is converted to int or float."""
+    tokens = arguments.split()
+    if len(tokens) != 1:
+        return " ".join(tokens)
+    for kind in (int, float):
+        try:
+            return kind(tokens[0])
+        except ValueError:
+            pass
+    return tokens[0]
+
+
+def _split_per_system(value, system_names):
+    """Convert the value of a component keyword with one argument per system to a dictionary keyed by system."""
+    tokens = str(value).split()
+    if len(tokens) != len(system_names):
+        raise ValueError(f"Expected {len(system_names)} values, one per system, got '{value}'.")
+    return {name: _parse_value(token) for name, token in zip(system_names, tokens)}
+
+
+def _split_component_per_system(component, system_names):
+    """Convert the values of the component keywords that are given per system into dictionaries keyed by system."""
+    if len(system_names) > 1 and "CreateNumberOfMolecules" in component:
+        component["CreateNumberOfMolecules"] = _split_per_system(component["CreateNumberOfMolecules"], system_names)
+    if "BlockPocketsFileName" in component:
+        use_block_pockets = component.pop("BlockPockets", "yes")
+        if len(system_names) > 1:
+            block_pockets = _split_per_system(use_block_pockets, system_names)
+            file_names = _split_per_system(component["BlockPocketsFileName"], system_names)
+            component["BlockPocketsFileName"] = {
+                name: file_name if block_pockets[name] == "yes" else None for name, file_name in file_names.items()
+            }
+        elif use_block_pockets != "yes":
+            del component["BlockPocketsFileName"]
+
+
+def parse_input_file(content):
+    """Convert the content of a RASPA input file into the parameters dictionary used by `RaspaCalculation`.
+
+    The keywords get their canonical spelling. Frameworks are named by their `FrameworkName` and boxes `box_<id>`,
+    the values of the component keywords that are given per system are converted into dictionaries keyed by system.
+
+    :returns: tuple of the parameters and the names of the systems, ordered as in the input file
+    :raises ValueError: if the input file can not be converted
+    """
+    parameters = {"GeneralSettings": {}, "System": {}, "Component": {}}
+    system_names = []
+    section = parameters["GeneralSettings"]
+    for line in content.splitlines():
+        words = line.split(maxsplit=1)
+        if not words or words[0].startswith(COMMENT_CHARACTERS):
+            continue
+        keyword, arguments = words[0], words[1] if len(words) > 1 else ""
+
+        if keyword.lower() in SYSTEM_TYPE_NAMES:
+            section = {"type": SYSTEM_TYPE_NAMES[keyword.lower()]}
+            system_names.append(f"box_{len(system_names)}")
+            parameters["System"][system_names[-1]] = section
+        elif keyword.lower() == "frameworkname" and section.get("type") == "Framework":
+            if len(arguments.split()) != 1:
+                raise ValueError("Systems with more than one framework are not supported.")
+            parameters["System"][arguments.strip()] = parameters["System"].pop(system_names[-1])
+            system_names[-1] = arguments.strip()
+        elif keyword.lower() == "component":
+            tokens = arguments.split()
+            if len(tokens) != 3 or tokens[1].lower() != "moleculename":
+                raise ValueError(f"Could not read the component definition '{line.strip()}'.")
+            section = {}
+            parameters["Component"][tokens[2]] = section
+        else:
+            section[KEYWORD_NAMES.get(keyword.lower(), keyword)] = _parse_value(arguments)
+
+    if not system_names:
+        raise ValueError("The input file does not define any framework or box.")
+
+    # `RaspaInput` orders the systems by name, the per-system values are given by name to keep them right
+    for component in parameters["Component"].values():
+        _split_component_per_system(component, system_names)
+
+    return parameters, system_names
+
+
+def read_raspa_run(directory, input_file="simulation.input"):
+    """Read the input and the output files of a RASPA simulation in `directory`.
+
+    Only files are read, so that many simulations can be read in parallel by a process pool.
+
+    :returns: dictionary with the `parameters`, the `exit_status` and, if the simulation finished, the
+        `output_parameters` and `warnings` as `RaspaParser` would return them. The `error` key is set instead if the
+        input file could not be read.
+    """
+    directory = Path(directory)
+    result = {"directory": str(directory)}
+    try:
+        parameters, system_names = parse_input_file((directory / input_file).read_text(encoding="utf-8"))
+    except (OSError, UnicodeDecodeError, ValueError) as err:
+        result["error"] = f"{directory / input_file}: {err}"
+        return result
+    result["parameters"] = parameters
+    result["system_names"] = system_names
+    result["frameworks"] = {
+        name: str(directory / f"{name}.cif")
+        for name in system_names
+        if parameters["System"][name]["type"] == "Framework" and (directory / f"{name}.cif").is_file()
+    }
+
+    output_parameters = {}
+    warnings = []
+    for system_id, system_name in enumerate(system_names):
+        output_dir = directory / "Output" / f"System_{system_id}"
+        output_files = sorted(output_dir.iterdir()) if output_dir.is_dir() else []
+        if not output_files:
+            result["exit_status"] = EXIT_STATUS_NO_OUTPUT_FILE
+            return result
+        output_contents = output_files[0].read_text(encoding="utf-8", errors="replace")
+        if "Starting simulation" not in output_contents:
+            result["exit_status"] = EXIT_STATUS_SIMULATION_DID_NOT_START
+            return result
+        if "Simulation finished" not in output_contents:
+            result["exit_status"] = EXIT_STATUS_TIMEOUT
+            return result
+        output_parameters[system_name], parsed_warnings = parse_base_output(
+            output_contents, system_name, len(parameters["Component"])
+        )
+        warnings += [warning for warning in parsed_warnings if warning not in warnings]
+
+    result.update({"exit_status": 0, "output_parameters": output_parameters, "warnings": warnings})
+    return result
+
+
+def find_raspa_runs(paths, input_file="simulation.input"):
+    """Return the directories below `paths` that contain a RASPA input file and an `Output` folder."""
+    directories = []
+    for path in paths:
+        for dirpath, dirnames, filenames in os.walk(path):
+            if input_file in filenames and "Output" in dirnames:
+                directories.append(os.path.abspath(dirpath))
+    return sorted(directories)
+
+
+def _get_retrieved(directory, system_names):
+    """Return the `retrieved` folder of a simulation, with its `Output` and `Restart` folders.
+
+    RASPA numbers the `System_<id>` folders in the order of the input file, they are renumbered in the order of
+    `RaspaInput`, which sorts the systems by name, since the parser and the restarts of `RaspaCalculation` expect it.
+    """
+    system_order = RaspaInput({"System": dict.fromkeys(system_names)}).system_order
+    system_folders = {
+        f"System_{system_id}": f"System_{system_order.index(name)}" for system_id, name in enumerate(system_names)
+    }
+    retrieved = FolderData()
+    for folder in ("Output", "Restart"):
+        if not (directory / folder).is_dir():
+            continue
+        for path in sorted((directory / folder).iterdir()):
+            target = f"{folder}/{system_folders.get(path.name, path.name)}"
+            if path.is_dir():
+                retrieved.base.repository.put_object_from_tree(path, target)
+            else:
+                retrieved.base.repository.put_object_from_file(path, target)
+    return retrieved, system_order
+
+
+def _store_run(run, code, frameworks):
+    """Store a `RaspaCalculation` node with the inputs and the outputs of a simulation read by `read_raspa_run`."""
+    CifData = DataFactory("core.cif")  # pylint: disable=invalid-name
+
+    node = CalcJobNode(computer=code.computer if code is not None else None, process_type="aiida.calculations:raspa")
+    node.set_option("resources", {"num_machines": 1, "num_mpiprocs_per_machine": 1})
+    node.set_option("parser_name", "raspa")
+    node.base.links.add_incoming(Dict(run["parameters"]).store(), LinkType.INPUT_CALC, "parameters")
+    if code is not None:
+        node.base.links.add_incoming(code, LinkType.INPUT_CALC, "code")
+
+    # identical CIF files are only stored once
+    for name, filename in run["frameworks"].items():
+        with open(filename, "rb") as fobj:
+            key = hashlib.sha256(fobj.read()).hexdigest()
+        if key not in frameworks:
+            frameworks[key] = CifData(file=filename).store()
+        node.base.links.add_incoming(frameworks[key], LinkType.INPUT_CALC, f"framework__{name}")
+
+    retrieved, system_order = _get_retrieved(Path(run["directory"]), run["system_names"])
+    node.set_process_state(ProcessState.FINISHED)
+    node.set_exit_status(run["exit_status"])
+    node.base.extras.set_many({IMPORTED_RUN_EXTRA: run["directory"], "system_order": system_order})
+    node.store()
+
+    outputs = {"retrieved": retrieved}
+    if run["exit_status"] == 0:
+        outputs.update(output_parameters=Dict(run["output_parameters"]), warnings=List(run["warnings"]))
+    for label, output in outputs.items():
+        output.base.links.add_incoming(node, LinkType.CREATE, label)
+        output.store()
+    node.seal()
+    return node
+
+
+def _find_new_runs(paths, input_file):
+    """Return the directories of the simulations below `paths` that were not imported before."""
+    directories = find_raspa_runs(paths, input_file)
+    if not directories:
+        return []
+    query = QueryBuilder().append(
+        CalcJobNode,
+        filters={f"extras.{IMPORTED_RUN_EXTRA}": {"in": directories}},
+        project=f"extras.{IMPORTED_RUN_EXTRA}",
+    )
+    imported = set(query.all(flat=True))
+    return [directory for directory in directories if directory not in imported]
+
+
+def _store_batch(runs, code, frameworks, logger):
+    """Store the simulations read by `read_raspa_run`, skipping and reporting those that could not be read."""
+    nodes = []
+    for run in runs:
+        if "error" in run:
+            if logger is not None:
+                logger.warning("Could not import %s: %s", run["directory"], run["error"])
+            continue
+        nodes.append(_store_run(run, code, frameworks))
+    return nodes
+
+
+def import_raspa_runs(
+    paths, code=None, group=None, input_file="simulation.input", max_workers=None, batch_size=100, logger=None
+):  # pylint: disable=too-many-arguments
+    """Import the RASPA simulations found below `paths` as finished `RaspaCalculation` nodes.
+
+    The input and output files are read in parallel by a process pool, the nodes are stored in batches of
+    `batch_size` simulations, each batch in one database transaction. The `Output` and `Restart` folders are stored
+    in the `retrieved` output, such that an imported calculation can be continued with `retrieved_parent_folder`.
+    Their `System_<id>` folders are renumbered in the order of the systems of `RaspaCalculation`.
+    The directories that were imported before are skipped.
+
+    :param paths: directories that are searched for simulations, recursively
+    :param code: the RASPA `Code` the simulations were run with (optional)
+    :param group: `Group` the imported calculations are added to (optional)
+    :param input_file: name of the RASPA input file
+    :param max_workers: number of processes that read the files (default: number of processors)
+    :param logger: logger to report the simulations that could not be imported (optional)
+    :returns: list of the imported `CalcJobNode`
+    """
+    directories = _find_new_runs(paths, input_file)
+    storage = get_manager().get_profile_storage()
+    nodes = []
+    frameworks = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        runs = executor.map(read_raspa_run, directories, [input_file] * len(directories), chunksize=16)
+        while True:
+            batch = list(islice(runs, batch_size))
+            if not batch:
+                break
+            with storage.transaction():
+                batch_nodes = _store_batch(batch, code, frameworks, logger)
+            if group is not None:
+                group.add_nodes(batch_nodes)
+            nodes += batch_nodes
+    return nodes
@@ -2,6 +2,9 @@
 from aiida.engine import calcfunction
 from aiida.orm import Dict
 
+from .move_tools import tune_parameters, use_cbcf_swap_moves
+from .statistics_tools import merge_production_segments
+
 
 @calcfunction
 def add_write_binary_restart(input_dict, write_every):
@@ -33,6 +36,15 @@ def modify_number_of_cycles(input_dict, additional_init_cycle, additional_prod_c
     return input_dict if input_dict.get_dict() == final_dict else Dict(final_dict)
 
 
+@calcfunction
+def add_block_pocket_file_names(input_dict, file_names):
+    """Set the block pocket file names of the components."""
+    final_dict = input_dict.get_dict()
+    for component, names in file_names.get_dict().items():
+        final_dict["Component"][component]["BlockPocketsFileName"] = names
+    return Dict(final_dict)
+
+
 @calcfunction
 def increase_box_lenght(input_dict, box_name, box_length_current):
     """Increase the box lenght to improve the convegence."""
@@ -47,3 +59,22 @@ def increase_box_lenght(input_dict, box_name, box_length_current):
     final_dict["System"][box_name.value]["BoxLengths"] = " ".join(str(l) for l in box_one_length_new)
 
     return Dict(final_dict)
+
+
+@calcfunction
+def merge_production_results(cycles, **segments):
+    """Merge the output parameters of the production segments `segment_<index>`, weighted by their `cycles`."""
+    names = sorted(segments, key=lambda name: int(name.rsplit("_", 1)[1]))
+    return Dict(merge_production_segments([segments[name].get_dict() for name in names], cycles.get_list()))
+
+
+@calcfunction
+def tune_move_probabilities(input_dict, output_parameters, min_fraction):
+    """Tune the move probabilities of the components on the move statistics of a pilot run."""
+    return Dict(tune_parameters(input_dict.get_dict(), output_parameters.get_dict(), min_fraction.value))
+
+
+@calcfunction
+def switch_to_cbcf_swap_moves(input_dict, components):
+    """Replace the swap moves of the components by CB/CFCMC swap moves."""
+    return Dict(use_cbcf_swap_moves(input_dict.get_dict(), components.get_list()))
@@ -0,0 +1,798 @@
+"""Schema of the RASPA input keywords.
+
+The keywords and the types of their arguments are taken from the input parser of RASPA 2.0 (`src/input.c`). RASPA
+matches the keywords case-insensitively and applies the keywords of a system or a component to the last one declared
+in the input, so the system keywords are also accepted in `GeneralSettings`, where they act on the first system.
+"""
+from difflib import get_close_matches
+
+BOOL = "bool"
+INT = "int"
+FLOAT = "float"
+STR = "str"
+
+GENERAL_KEYWORDS = {
+    "ActiveAtomType": STR,
+    "ActiveAtomTypes": STR,
+    "AverageDensityOverUnitCellsVTK": BOOL,
+    "BackPolarization": BOOL,
+    "BarostatChainLength": INT,
+    "BendConstraintType": STR,
+    "BlockEnergyGridOverlapCriteria": FLOAT,
+    "BlockEnergyGrids": BOOL,
+    "BlockGridPockets": BOOL,
+    "BlockGridPores": BOOL,
+    "BufferLengthMSDConventional": INT,
+    "BufferLengthVACFConventional": INT,
+    "CBMCBiasingMethod": STR,
+    "CFCRXMCLambdaHistogramSize": INT,
+    "CFRXMCWangLandauScalingFactor": INT,
+    "ChargeEquilibrationMethod": STR,
+    "ChargeFromChargeEquilibration": BOOL,
+    "ChargeMethod": STR,
+    "ChiralInversionProbability": FLOAT,
+    "ComputeElasticConstants": BOOL,
+    "ComputeElasticConstantsThirdOrder": BOOL,
+    "ComputeIndividualMSD": BOOL,
+    "ComputeIndividualRVACF": BOOL,
+    "ComputeIndividualVACF": BOOL,
+    "ComputeLambda": STR,
+    "ComputeMSDPerPseudoAtom": BOOL,
+    "ComputeNormalModes": BOOL,
+    "ComputePolarization": BOOL,
+    "ComputePowderDiffractionPattern": BOOL,
+    "ComputePrincipleMomentsOfInertia": BOOL,
+    "ComputeRattleSteps": BOOL,
+    "ComputeRVACFPerPseudoAtom": BOOL,
+    "ComputeSiteTypeMSD": BOOL,
+    "ComputeVACFPerPseudoAtom": BOOL,
+    "ConfirmPseudoAtomWithoutVDWInteraction": STR,
+    "ContinueAfterCrash": BOOL,
+    "CorrectNormalModesForConstraints": BOOL,
+    "CreateDlpolyInput": BOOL,
+    "CreateTinkerInput": BOOL,
+    "CutOff": FLOAT,
+    "CutOffBondDipoleBondDipole": FLOAT,
+    "CutOffBondDipoleBondDipoleSwitch": FLOAT,
+    "CutOffChargeBondDipole": FLOAT,
+    "CutOffChargeBondDipoleSwitch": FLOAT,
+    "CutOffIons": FLOAT,
+    "CutOffVDW": FLOAT,
+    "CutOffVDWSwitch": FLOAT,
+    "DensityAveragingTypeVTK": STR,
+    "DensityProfile3DVTKGridPoints": INT,
+    "DielectricConstantOfTheMedium": FLOAT,
+    "DiffractionRadiationType": STR,
+    "DiffractionType": STR,
+    "DihedralConstraintType": STR,
+    "Dimension": INT,
+    "DistanceConstraintType": STR,
+    "ElasticConstantEnergyVolume": STR,
+    "EnergyOverlapCriteria": FLOAT,
+    "Ensemble": STR,
+    "EwaldPrecision": FLOAT,
+    "FileNameAppend": STR,
+    "FixedAtomType": STR,
+    "FixedAtomTypes": STR,
+    "ForbiddenFrameworkConnectivity": STR,
+    "ForceField": STR,
+    "FrameworkChangeMoveProbability": FLOAT,
+    "FrameworkShiftMoveProbability": FLOAT,
+    "FreeEnergyAveragingTypeVTK": STR,
+    "GibbsVolumeChangeProbability": FLOAT,
+    "GridSeed": FLOAT,
+    "GridTypes": STR,
+    "HybridMCMDMoveProbability": FLOAT,
+    "HybridNPHMoveProbability": FLOAT,
+    "HybridNPHPRMoveProbability": FLOAT,
+    "HybridNVEMoveProbability": FLOAT,
+    "HyperParallelTemperingProbability": FLOAT,
+    "ImproperDihedralConstraintType": STR,
+    "ImproperTorsionScanType": STR,
+    "InitEnsemble": STR,
+    "InternalFrameworkLennardJonesInteractions": BOOL,
+    "InversionBendConstraintType": STR,
+    "MaxGradientTolerance": FLOAT,
+    "MaximumMode": INT,
+    "MaximumNumberOfMinimizationSteps": INT,
+    "MaximumStepLength": FLOAT,
+    "MaxRangeAngleBetweenPlanesHistogram": FLOAT,
+    "MaxRangeBendAngleHistogram": FLOAT,
+    "MaxRangeDihedralAngleHistogram": FLOAT,
+    "MaxRangeDistanceHistogram": FLOAT,
+    "MeasureLambdaBelow": FLOAT,
+    "MinimizationConvergenceFactor": FLOAT,
+    "MinimizationMethod": STR,
+    "MinimizationPotentialMethod": STR,
+    "MinimizationVariables": STR,
+    "MinimumInnerCycles": INT,
+    "MinimumMode": INT,
+    "MinimumRosenbluthFactor": FLOAT,
+    "ModeResolution": INT,
+    "Modify": STR,
+    "ModifyFrameworkAtomConnectedTo": STR,
+    "ModifyFrameworkDimer": STR,
+    "ModifyFrameworkPlanar": STR,
+    "ModifyFrameworkTriple": STR,
+    "ModifyOxgensConnectedToAluminium": STR,
+    "ModifyOxygensConnectedToAluminium": STR,
+    "MolecularOrientationGroup": INT,
+    "MolecularOrientationType": STR,
+    "MolecularOrientationVector": FLOAT,
+    "MonoclinicAngleType": STR,
+    "MovieScale": FLOAT,
+    "NPTPRCellType": STR,
+    "NumberOfBackPolarizationSteps": INT,
+    "NumberOfBlockElementsBOACF": INT,
+    "NumberOfBlockElementsMOACF": INT,
+    "NumberOfBlockElementsMSD": INT,
+    "NumberOfBlockElementsRVACF": INT,
+    "NumberOfBlockElementsVACF": INT,
+    "NumberOfBlocksBOACF": INT,
+    "NumberOfBlocksMOACF": INT,
+    "NumberOfBlocksMSD": INT,
+    "NumberOfBlocksRVACF": INT,
+    "NumberOfBlocksVACF": INT,
+    "NumberOfBuffersMSDConventional": INT,
+    "NumberOfBuffersVACFConventional": INT,
+    "NumberOfCycles": INT,
+    "NumberOfElementsAngleBetweenPlanesHistogram": INT,
+    "NumberOfElementsBendAngleHistogram": INT,
+    "NumberOfElementsDihedralAngleHistogram": INT,
+    "NumberOfElementsDistanceHistogram": INT,
+    "NumberOfEquilibrationCycles": INT,
+    "NumberOfGrids": INT,
+    "NumberOfHybridNPHPRSteps": INT,
+    "NumberOfHybridNPHSteps": INT,
+    "NumberOfHybridNVESteps": INT,
+    "NumberOfInitializationCycles": INT,
+    "NumberOfTrialMovesPerOpenBead": INT,
+    "NumberOfTrialPositions": INT,
+    "NumberOfTrialPositionsForTheFirstBead": INT,
+    "NumberOfTrialPositionsForTheFirstBeadGibbs": INT,
+    "NumberOfTrialPositionsForTheFirstBeadIdentityChange": INT,
+    "NumberOfTrialPositionsForTheFirstBeadPartialReinsertion": INT,
+    "NumberOfTrialPositionsForTheFirstBeadReinsertion": INT,
+    "NumberOfTrialPositionsForTheFirstBeadSwap": INT,
+    "NumberOfTrialPositionsForTheFirstBeadWidom": INT,
+    "NumberOfTrialPositionsGibbs": INT,
+    "NumberOfTrialPositionsIdentityChange": INT,
+    "NumberOfTrialPositionsPartialReinsertion": INT,
+    "NumberOfTrialPositionsReinsertion": INT,
+    "NumberOfTrialPositionsSwap": INT,
+    "NumberOfTrialPositionsTorsion": INT,
+    "NumberOfTrialPositionsWidom": INT,
+    "NumberOfVelocityScalingCycles": INT,
+    "NumberOfYoshidaSuzukiSteps": INT,
+    "OmitAdsorbateAdsorbateCoulombInteractions": BOOL,
+    "OmitAdsorbateAdsorbatePolarization": BOOL,
+    "OmitAdsorbateAdsorbateVDWInteractions": BOOL,
+    "OmitAdsorbateCationCoulombInteractions": BOOL,
+    "OmitAdsorbateCationPolarization": BOOL,
+    "OmitAdsorbateCationVDWInteractions": BOOL,
+    "OmitCationCationCoulombInteractions": BOOL,
+    "OmitCationCationPolarization": BOOL,
+    "OmitCationCationVDWInteractions": BOOL,
+    "OmitEwaldFourier": BOOL,
+    "OmitInterMolecularCoulombInteractions": BOOL,
+    "OmitInterMolecularInteractions": BOOL,
+    "OmitInterMolecularVDWInteractions": BOOL,
+    "OmitIntraFrameworkPolarization": BOOL,
+    "OptimizeAcceptenceEvery": INT,
+    "OptimizeCBCFGibbsLambdaChange": BOOL,
+    "OptimizeCBCFLambdaChange": BOOL,
+    "OptimizeCFGibbsLambdaChange": BOOL,
+    "OptimizeCFLambdaChange": BOOL,
+    "OptimizeFrameworkChange": BOOL,
+    "OptimizeFrameworkShift": BOOL,
+    "OptimizeGibbsVolumeChange": BOOL,
+    "OptimizeRotation": BOOL,
+    "OptimizeRXMCLambdaChange": BOOL,
+    "OptimizeTranslation": BOOL,
+    "OptimizeVolumeChange": BOOL,
+    "OutOfPlaneConstraintType": STR,
+    "Output": STR,
+    "OverlapDistance": FLOAT,
+    "ParallelMolFractionComponentA": INT,
+    "ParallelMolFractionComponentB": INT,
+    "ParallelMolFractionProbability": FLOAT,
+    "ParallelTemperingProbability": FLOAT,
+    "PeakShape": STR,
+    "PeakWidthModifierU": FLOAT,
+    "PeakWidthModifierV": FLOAT,
+    "PeakWidthModifierW": FLOAT,
+    "PolarizationMatrix": STR,
+    "PrintAdsorbateBendBendStatus": BOOL,
+    "PrintAdsorbateBendBendStatusOnly": STR,
+    "PrintAdsorbateBendStatus": BOOL,
+    "PrintAdsorbateBendStatusOnly": STR,
+    "PrintAdsorbateBendTorsionStatus": BOOL,
+    "PrintAdsorbateBendTorsionStatusOnly": STR,
+    "PrintAdsorbateBondBendStatus": BOOL,
+    "PrintAdsorbateBondBendStatusOnly": STR,
+    "PrintAdsorbateBondBondStatus": BOOL,
+    "PrintAdsorbateBondBondStatusOnly": STR,
+    "PrintAdsorbateBondStatus": BOOL,
+    "PrintAdsorbateBondStatusOnly": STR,
+    "PrintAdsorbateBondTorsionStatus": BOOL,
+    "PrintAdsorbateBondTorsionStatusOnly": STR,
+    "PrintAdsorbateImproperTorsionStatus": BOOL,
+    "PrintAdsorbateImproperTorsionStatusOnly": STR,
+    "PrintAdsorbateIntraBondDipoleBondDipoleStatus": BOOL,
+    "PrintAdsorbateIntraBondDipoleBondDipoleStatusOnly": STR,
+    "PrintAdsorbateIntraChargeBondDipoleStatus": BOOL,
+    "PrintAdsorbateIntraChargeBondDipoleStatusOnly": STR,
+    "PrintAdsorbateIntraChargeChargeStatus": BOOL,
+    "PrintAdsorbateIntraChargeChargeStatusOnly": STR,
+    "PrintAdsorbateIntraVDWStatus": BOOL,
+    "PrintAdsorbateIntraVDWStatusOnly": STR,
+    "PrintAdsorbateTorsionStatus": BOOL,
+    "PrintAdsorbateTorsionStatusOnly": STR,
+    "PrintAdsorbateUreyBradleyStatus": BOOL,
+    "PrintAdsorbateUreyBradleyStatusOnly": STR,
+    "PrintCationBendStatus": BOOL,
+    "PrintCationBendStatusOnly": STR,
+    "PrintCationBendTorsionStatus": BOOL,
+    "PrintCationBendTorsionStatusOnly": STR,
+    "PrintCationBondBendStatus": BOOL,
+    "PrintCationBondBendStatusOnly": STR,
+    "PrintCationBondBondStatus": BOOL,
+    "PrintCationBondBondStatusOnly": STR,
+    "PrintCationBondStatus": BOOL,
+    "PrintCationBondStatusOnly": STR,
+    "PrintCationBondTorsionStatus": BOOL,
+    "PrintCationBondTorsionStatusOnly": STR,
+    "PrintCationImproperTorsionStatus": BOOL,
+    "PrintCationImproperTorsionStatusOnly": STR,
+    "PrintCationIntraBondDipoleBondDipoleStatus": BOOL,
+    "PrintCationIntraBondDipoleBondDipoleStatusOnly": STR,
+    "PrintCationIntraChargeBondDipoleStatus": BOOL,
+    "PrintCationIntraChargeBondDipoleStatusOnly": STR,
+    "PrintCationIntraChargeChargeStatus": BOOL,
+    "PrintCationIntraChargeChargeStatusOnly": STR,
+    "PrintCationIntraVDWStatus": BOOL,
+    "PrintCationIntraVDWStatusOnly": STR,
+    "PrintCationTorsionStatus": BOOL,
+    "PrintCationTorsionStatusOnly": STR,
+    "PrintCationUreyBradleyStatus": BOOL,
+    "PrintCationUreyBradleyStatusOnly": STR,
+    "PrintEvery": INT,
+    "PrintForcefieldToOutput": BOOL,
+    "PrintFrameworkAdsorbateBondDipoleBondDipoleStatus": BOOL,
+    "PrintFrameworkAdsorbateBondDipoleBondDipoleStatusOnly": STR,
+    "PrintFrameworkAdsorbateChargeBondDipoleStatus": BOOL,
+    "PrintFrameworkAdsorbateChargeBondDipoleStatusOnly": STR,
+    "PrintFrameworkAdsorbateChargeChargeStatus": BOOL,
+    "PrintFrameworkAdsorbateChargeChargeStatusOnly": STR,
+    "PrintFrameworkAdsorbateVDWStatus": BOOL,
+    "PrintFrameworkAdsorbateVDWStatusOnly": STR,
+    "PrintFrameworkBendBendStatus": BOOL,
+    "PrintFrameworkBendBendStatusOnly": STR,
+    "PrintFrameworkBendStatus": BOOL,
+    "PrintFrameworkBendStatusOnly": STR,
+    "PrintFrameworkBendTorsionStatus": BOOL,
+    "PrintFrameworkBendTorsionStatusOnly": STR,
+    "PrintFrameworkBondBendStatus": BOOL,
+    "PrintFrameworkBondBendStatusOnly": STR,
+    "PrintFrameworkBondBondStatus": BOOL,
+    "PrintFrameworkBondBondStatusOnly": STR,
+    "PrintFrameworkBondStatus": BOOL,
+    "PrintFrameworkBondStatusOnly": STR,
+    "PrintFrameworkCationBondDipoleBondDipoleStatus": BOOL,
+    "PrintFrameworkCationBondDipoleBondDipoleStatusOnly": STR,
+    "PrintFrameworkCationChargeBondDipoleStatus": BOOL,
+    "PrintFrameworkCationChargeBondDipoleStatusOnly": STR,
+    "PrintFrameworkCationChargeChargeStatus": BOOL,
+    "PrintFrameworkCationChargeChargeStatusOnly": STR,
+    "PrintFrameworkCationVDWStatus": BOOL,
+    "PrintFrameworkCationVDWStatusOnly": STR,
+    "PrintFrameworkImproperTorsionStatus": BOOL,
+    "PrintFrameworkImproperTorsionStatusOnly": STR,
+    "PrintFrameworkIntraBondDipoleBondDipoleStatus": BOOL,
+    "PrintFrameworkIntraBondDipoleBondDipoleStatusOnly": STR,
+    "PrintFrameworkIntraChargeBondDipoleStatus": BOOL,
+    "PrintFrameworkIntraChargeBondDipoleStatusOnly": STR,
+    "PrintFrameworkIntraChargeChargeStatus": BOOL,
+    "PrintFrameworkIntraChargeChargeStatusOnly": STR,
+    "PrintFrameworkIntraVDWStatus": BOOL,
+    "PrintFrameworkIntraVDWStatusOnly": STR,
+    "PrintFrameworkInversionBendStatus": BOOL,
+    "PrintFrameworkInversionBendStatusOnly": STR,
+    "PrintFrameworkTorsionStatus": BOOL,
+    "PrintFrameworkTorsionStatusOnly": STR,
+    "PrintFrameworkUreyBradleyStatus": BOOL,
+    "PrintFrameworkUreyBradleyStatusOnly": STR,
+    "PrintInterBondDipoleBondDipoleStatus": BOOL,
+    "PrintInterBondDipoleBondDipoleStatusOnly": STR,
+    "PrintInterChargeBondDipoleStatus": BOOL,
+    "PrintInterChargeBondDipoleStatusOnly": STR,
+    "PrintInterChargeChargeStatus": BOOL,
+    "PrintInterChargeChargeStatusOnly": STR,
+    "PrintInterVDWStatus": BOOL,
+    "PrintInterVDWStatusOnly": STR,
+    "PrintMoleculeDefinitionToOutput": BOOL,
+    "PrintPropertiesEvery": INT,
+    "PrintPseudoAtomsToOutput": BOOL,
+    "ProbabilityCFCRXMCLambdaChangeMove": FLOAT,
+    "RandomlyModify": STR,
+    "RandomlySubstitute": STR,
+    "RandomSeed": INT,
+    "Reaction": STR,
+    "ReducedUnits": BOOL,
+    "ReinitializeVelocities": BOOL,
+    "Remove11NeighboursFromChargeBondDipoleInteraction": BOOL,
+    "Remove12NeighboursFromBondDipoleBondDipoleInteraction": BOOL,
+    "Remove12NeighboursFromChargeBondDipoleInteraction": BOOL,
+    "Remove12NeighboursFromChargeChargeInteraction": BOOL,
+    "Remove12NeighboursFromVDWInteraction": BOOL,
+    "Remove13NeighboursFromBondDipoleBondDipoleInteraction": BOOL,
+    "Remove13NeighboursFromChargeBondDipoleInteraction": BOOL,
+    "Remove13NeighboursFromChargeChargeInteraction": BOOL,
+    "Remove13NeighboursFromVDWInteraction": BOOL,
+    "Remove14NeighboursFromBondDipoleBondDipoleInteraction": BOOL,
+    "Remove14NeighboursFromChargeBondDipoleInteraction": BOOL,
+    "Remove14NeighboursFromChargeChargeInteraction": BOOL,
+    "Remove14NeighboursFromVDWInteraction": BOOL,
+    "RemoveBendNeighboursFromLongRangeInteraction": BOOL,
+    "RemoveBondNeighboursFromLongRangeInteraction": BOOL,
+    "RemoveFractionalMoleculesFromRestartFile": BOOL,
+    "RemoveRotationFromHessian": BOOL,
+    "RemoveTorsionNeighboursFromLongRangeInteraction": BOOL,
+    "RemoveTranslationFromHessian": BOOL,
+    "RestartFile": BOOL,
+    "RestartStyle": STR,
+    "RMSGradientTolerance": FLOAT,
+    "RunEnsemble": STR,
+    "SampleEveryInfraRed": INT,
+    "SimulationType": STR,
+    "SpacingCoulombGrid": FLOAT,
+    "SpacingVDWGrid": FLOAT,
+    "Substitute": STR,
+    "SymmetrizeFrameworkCharges": BOOL,
+    "TargetAccRatioLambdaChange": FLOAT,
+    "TargetAccRatioReactionLambdaChange": FLOAT,
+    "TargetAccRatioRotation": FLOAT,
+    "TargetAccRatioSmallMCScheme": FLOAT,
+    "TargetAccRatioTranslation": FLOAT,
+    "ThermostatChainLength": INT,
+    "TimeScaleParameterBarostat": FLOAT,
+    "TimeScaleParameterThermostat": FLOAT,
+    "TimeStep": FLOAT,
+    "TransformUnitCell": BOOL,
+    "TwoThetaMax": FLOAT,
+    "TwoThetaMin": FLOAT,
+    "TwoThetaStep": FLOAT,
+    "UnitCellDeformation": FLOAT,
+    "UseChargesFromCIFFile": BOOL,
+    "UseChargesFromMOLFile": BOOL,
+    "UseGradientInLineMinimization": BOOL,
+    "UseSymmetryInMinimization": BOOL,
+    "UseTabularGrid": BOOL,
+    "VolumeChangeDirection": STR,
+    "VolumeChangeProbability": FLOAT,
+    "VTKFractionalAdsorbateMax": FLOAT,
+    "VTKFractionalAdsorbateMin": FLOAT,
+    "VTKFractionalCationMax": FLOAT,
+    "VTKFractionalCationMin": FLOAT,
+    "VTKFractionalFrameworkAtomsMax": FLOAT,
+    "VTKFractionalFrameworkAtomsMin": FLOAT,
+    "VTKFractionalFrameworkBondsMax": FLOAT,
+    "VTKFractionalFrameworkBondsMin": FLOAT,
+    "WaveLength": FLOAT,
+    "WaveLengthType": STR,
+    "WidomParticleInsertionComponent": INT,
+    "WriteBinaryRestartFileEvery": INT,
+    "WriteVTKGrids": BOOL,
+}
+
+SYSTEM_KEYWORDS = {
+    "ActiveAdsorbateAtom": INT,
+    "ActiveAdsorbateAtomX": INT,
+    "ActiveAdsorbateAtomY": INT,
+    "ActiveAdsorbateAtomZ": INT,
+    "ActiveAdsorbateGroup": INT,
+    "ActiveAdsorbateGroupCenterOfMass": INT,
+    "ActiveAdsorbateGroupOrientation": INT,
+    "ActiveAdsorbateMolecule": INT,
+    "ActiveCationAtom": INT,
+    "ActiveCationAtomX": INT,
+    "ActiveCationAtomY": INT,
+    "ActiveCationAtomZ": INT,
+    "ActiveCationGroup": INT,
+    "ActiveCationGroupCenterOfMass": INT,
+    "ActiveCationGroupOrientation": INT,
+    "ActiveCationMolecule": INT,
+    "ActiveFrameworkAtom": INT,
+    "ActiveFrameworkAtoms": STR,
+    "ActiveFrameworkAtomsX": STR,
+    "ActiveFrameworkAtomsY": STR,
+    "ActiveFrameworkAtomsZ": STR,
+    "ActiveFrameworkAtomX": INT,
+    "ActiveFrameworkAtomY": INT,
+    "ActiveFrameworkAtomZ": INT,
+    "AddAtomNumberCodeToLabel": BOOL,
+    "AdsorbateFixedInitialization": STR,
+    "AngleBetweenPlanesHistogramDefinition": STR,
+    "AngleConstraint": STR,
+    "BarrierAngle": FLOAT,
+    "BarrierNormal": FLOAT,
+    "BarrierPosition": FLOAT,
+    "BendAngleHistogramDefinition": STR,
+    "BendAngleHistogramSize": INT,
+    "BendAngleRange": FLOAT,
+    "BondLengthHistogramSize": INT,
+    "BondLengthRange": FLOAT,
+    "BondOrientationAngleHistogramSize": INT,
+    "BoundaryCondition": STR,
+    "BoxAngles": FLOAT,
+    "BoxLengths": FLOAT,
+    "BoxMatrix": STR,
+    "BoxShapeChangeProbability": FLOAT,
+    "CalculateSpaceGroup": BOOL,
+    "CationFixedInitialization": STR,
+    "CellAngles": FLOAT,
+    "CellLengths": FLOAT,
+    "CFCRXMCLambdaHistogramBins": INT,
+    "ComputeAngleBetweenPlanesHistograms": BOOL,
+    "ComputeBendAngleHistograms": BOOL,
+    "ComputeBOACF": BOOL,
+    "ComputeCationAndAdsorptionSites": BOOL,
+    "ComputeCFCRXMCLambdaHistogram": BOOL,
+    "ComputeDensityProfile3DVTKGrid": BOOL,
+    "ComputeDihedralAngleHistograms": BOOL,
+    "ComputeDistanceHistograms": BOOL,
+    "ComputeEndToEndDistanceHistogram": BOOL,
+    "ComputeEnergyHistogram": BOOL,
+    "ComputeFrameworkSpacingHistogram": BOOL,
+    "ComputeInfraRedSpectra": BOOL,
+    "ComputeMOACF": BOOL,
+    "ComputeMolecularPressure": BOOL,
+    "ComputeMoleculeProperties": BOOL,
+    "ComputeMSD": BOOL,
+    "ComputeMSDConventional": BOOL,
+    "ComputeNumberOfMoleculesHistogram": BOOL,
+    "ComputePositionHistogram": BOOL,
+    "ComputePressure": BOOL,
+    "ComputeProjectedAngles": BOOL,
+    "ComputeProjectedLengths": BOOL,
+    "ComputePSD": BOOL,
+    "ComputePSDHistogram": BOOL,
+    "ComputeRDF": BOOL,
+    "ComputeResidenceTimes": BOOL,
+    "ComputeRVACF": BOOL,
+    "ComputeThermoDynamicFactor": BOOL,
+    "ComputeVACF": BOOL,
+    "ComputeVACFConventional": BOOL,
+    "CutOffChargeCharge": FLOAT,
+    "CutOffChargeChargeSwitch": FLOAT,
+    "CutOffCoulomb": FLOAT,
+    "CutOffCoulombSwitch": FLOAT,
+    "DihedralAngleHistogramDefinition": STR,
+    "DihedralConstraint": STR,
+    "DihedralHistogramSize": INT,
+    "DihedralRange": FLOAT,
+    "DistanceConstraint": STR,
+    "DistanceHistogramDefinition": STR,
+    "EndToEndHistogramSize": INT,
+    "EndToEndRange": FLOAT,
+    "EnergyHistogramLowerLimit": FLOAT,
+    "EnergyHistogramSize": INT,
+    "EnergyHistogramUpperLimit": FLOAT,
+    "EwaldParameters": STR,
+    "ExcessVolume": FLOAT,
+    "ExternalPressure": STR,
+    "ExternalStress": FLOAT,
+    "ExternalTemperature": FLOAT,
+    "FixedAdsorbateAtom": INT,
+    "FixedAdsorbateAtomX": INT,
+    "FixedAdsorbateAtomY": INT,
+    "FixedAdsorbateAtomZ": INT,
+    "FixedAdsorbateGroup": INT,
+    "FixedAdsorbateGroupCenterOfMass": INT,
+    "FixedAdsorbateGroupCenterOfMassX": INT,
+    "FixedAdsorbateGroupCenterOfMassY": INT,
+    "FixedAdsorbateGroupCenterOfMassZ": INT,
+    "FixedAdsorbateGroupOrientation": INT,
+    "FixedAdsorbateGroupOrientationX": INT,
+    "FixedAdsorbateGroupOrientationY": INT,
+    "FixedAdsorbateGroupOrientationZ": INT,
+    "FixedAdsorbateMolecule": INT,
+    "FixedCationAtom": INT,
+    "FixedCationAtomX": INT,
+    "FixedCationAtomY": INT,
+    "FixedCationAtomZ": INT,
+    "FixedCationGroup": INT,
+    "FixedCationGroupCenterOfMass": INT,
+    "FixedCationGroupOrientation": INT,
+    "FixedFrameworkAtom": INT,
+    "FixedFrameworkAtoms": STR,
+    "FixedFrameworkAtomsX": STR,
+    "FixedFrameworkAtomsY": STR,
+    "FixedFrameworkAtomsZ": STR,
+    "FixedFrameworkAtomX": INT,
+    "FixedFrameworkAtomY": INT,
+    "FixedFrameworkAtomZ": INT,
+    "FlexibleFramework": BOOL,
+    "FlexibleModelInputType": STR,
+    "ForceSpaceGroupDetection": BOOL,
+    "FrameworkDefinitions": STR,
+    "FrameworkExclusion": BOOL,
+    "FrameworkFixedInitialization": STR,
+    "FrameworkIntra14ChargeChargeScalingValue": FLOAT,
+    "FrameworkIntra14VDWScalingValue": FLOAT,
+    "FrameworkProbability": FLOAT,
+    "FrameworkSpacingHistogramSize": INT,
+    "FrameworkSpacingRange": FLOAT,
+    "FreeEnergyHistogramSize": INT,
+    "FreeEnergyMappingType": STR,
+    "HarmonicAngleConstraint": STR,
+    "HarmonicDihedralConstraint": STR,
+    "HarmonicDistanceConstraint": STR,
+    "HeliumVoidFraction": FLOAT,
+    "Histogram": BOOL,
+    "ImproperDihedralConstraint": STR,
+    "InputFileType": STR,
+    "InversionBendConstraint": STR,
+    "IonsName": STR,
+    "MaxBarrierDistance": FLOAT,
+    "MaxBarrierTime": FLOAT,
+    "MaximumGibbsVolumeChange": STR,
+    "MaximumReactionLambdaChange": FLOAT,
+    "MaximumVolumeChange": STR,
+    "MeasureDihedralWithMidpoint": STR,
+    "Movies": BOOL,
+    "NoReciprocalCutOff": STR,
+    "NumberOfMoleculesHistogramSize": INT,
+    "NumberOfMoleculesRange": FLOAT,
+    "NumberOfSitesMSDOrderN": INT,
+    "NumberOfVelocities": INT,
+    "orientation_framework_bond": STR,
+    "OrientationFrameworkBond": STR,
+    "OutOfPlaneConstraint": STR,
+    "PositionHistogramMappingType": STR,
+    "PositionHistogramSize": INT,
+    "ProjectedAnglesHistogramSize": INT,
+    "ProjectedAnglesRange": FLOAT,
+    "ProjectedLengthsHistogramSize": INT,
+    "ProjectedLengthsRange": FLOAT,
+    "PSDHistogramSize": INT,
+    "PSDProbeDistance": STR,
+    "PSDRange": FLOAT,
+    "PutMoleculeOnBarrier": BOOL,
+    "RangeResidenceTimes": FLOAT,
+    "RDFHistogramSize": INT,
+    "RDFRange": FLOAT,
+    "ReadCIFAsCartesian": BOOL,
+    "ReciprocalCutOff": FLOAT,
+    "RemoveAtomNumberCodeFromLabel": BOOL,
+    "RemoveHydrogenDisorder": BOOL,
+    "ReplicaUnitCells": INT,
+    "ResidenceTimesHistogramSize": INT,
+    "RestrictFrameworkAtomsToBox": BOOL,
+    "SampleBOACFEvery": INT,
+    "SampleMOACFEvery": INT,
+    "SampleMSDConventionalEvery": INT,
+    "SampleMSDEvery": INT,
+    "SampleRVACFEvery": INT,
+    "SampleVACFConventionalEvery": INT,
+    "SampleVACFEvery": INT,
+    "ShiftUnitCells": FLOAT,
+    "SurfaceAreaProbeAtom": STR,
+    "SurfaceAreaProbeDistance": STR,
+    "SurfaceAreaSamplingPointsPerSphere": INT,
+    "UnitCells": INT,
+    "WriteAngleBetweenPlanesHistogramEvery": INT,
+    "WriteBendAngleHistogramEvery": INT,
+    "WriteBOACFEvery": INT,
+    "WriteCationAndAdsorptionSitesEvery": INT,
+    "WriteCFCRXMCLambdaHistogramEvery": INT,
+    "WritedcTSTSnapShotsEvery": INT,
+    "WritedcTSTSnapShotsToFile": BOOL,
+    "WriteDensityProfile3DVTKGridEvery": INT,
+    "WriteDihedralAngleHistogramEvery": INT,
+    "WriteDistanceHistogramEvery": INT,
+    "WriteEndToEndDistanceHistogramEvery": INT,
+    "WriteEnergyHistogramEvery": INT,
+    "WriteFrameworkSpacingHistogramEvery": INT,
+    "WriteFreeEnergyProfileEvery": INT,
+    "WriteInfraRedSpectraEvery": INT,
+    "WriteMOAACFEvery": INT,
+    "WriteMoleculePropertiesEvery": INT,
+    "WriteMoviesEvery": INT,
+    "WriteMSDConventionalEvery": INT,
+    "WriteMSDEvery": INT,
+    "WriteNumberOfMoleculesHistogramEvery": INT,
+    "WritePositionHistogramEvery": INT,
+    "WriteProjectedAnglesEvery": INT,
+    "WriteProjectedLengthsEvery": INT,
+    "WritePSDHistogramEvery": INT,
+    "WriteRDFEvery": INT,
+    "WriteResidenceTimesEvery": INT,
+    "WriteRVACFEvery": INT,
+    "WriteThermoDynamicFactorEvery": INT,
+    "WriteVACFConventionalEvery": INT,
+    "WriteVACFEvery": INT,
+}
+
+COMPONENT_KEYWORDS = {
+    "BiasingDirection": STR,
+    "BiasingMethod": STR,
+    "BiasingProfile": STR,
+    "BinaryEOSInteractionParameter": STR,
+    "BlockPockets": STR,
+    "BlockPocketsFileName": STR,
+    "BoxAxisABC_Max": FLOAT,
+    "BoxAxisABC_Max2": FLOAT,
+    "BoxAxisABC_Max3": FLOAT,
+    "BoxAxisABC_Max4": FLOAT,
+    "BoxAxisABC_Min": FLOAT,
+    "BoxAxisABC_Min2": FLOAT,
+    "BoxAxisABC_Min3": FLOAT,
+    "BoxAxisABC_Min4": FLOAT,
+    "CBCFGibbsProbability": FLOAT,
+    "CBCFSwapLambdaProbability": FLOAT,
+    "CBMCProbability": FLOAT,
+    "CFBiasingFactors": STR,
+    "CFGibbsFractionalToIntegerMoveProbability": FLOAT,
+    "CFGibbsLambdaChangeMoveProbability": FLOAT,
+    "CFGibbsProbability": FLOAT,
+    "CFGibbsSwapFractionalMoleculeToOtherBoxMoveProbability": FLOAT,
+    "CFLambdaHistogramSize": INT,
+    "CFSwapLambdaProbability": FLOAT,
+    "CFWangLandauScalingFactor": FLOAT,
+    "CFWidomProbability": FLOAT,
+    "ComputeFreeEnergyProfile": STR,
+    "CreateNumberOfMolecules": STR,
+    "Cylinder": INT,
+    "CylinderABC_Max": FLOAT,
+    "CylinderABC_Min": FLOAT,
+    "CylinderCenter": FLOAT,
+    "CylinderDiameter": FLOAT,
+    "CylinderDirection": STR,
+    "CylinderRadius": FLOAT,
+    "Enantioface": STR,
+    "EnantiofaceAtoms": STR,
+    "ExchangeFractionalParticleProbability": FLOAT,
+    "ExtraFrameworkMolecule": BOOL,
+    "FugacityCoefficient": STR,
+    "GibbsIdentityChangeProbability": FLOAT,
+    "GibbsIdentityChangesList": STR,
+    "GibbsSwapProbability": FLOAT,
+    "GibbsWidomProbability": FLOAT,
+    "IdealGasRosenbluthWeight": STR,
+    "IdentityChangeProbability": FLOAT,
+    "IdentityChangesList": STR,
+    "Intra14ChargeChargeScalingValue": FLOAT,
+    "Intra14VDWScalingValue": FLOAT,
+    "InvertBlockPockets": BOOL,
+    "LnPartitionFunction": FLOAT,
+    "MoleculeDefinition": STR,
+    "MolFraction": STR,
+    "NumberOfGibbsIdentityChanges": INT,
+    "NumberOfIdentityChanges": INT,
+    "PartialReinsertionProbability": FLOAT,
+    "PartitionFunction": FLOAT,
+    "Prism": INT,
+    "PrismABC_Max": FLOAT,
+    "PrismABC_Min": FLOAT,
+    "RandomRotationProbability": FLOAT,
+    "RandomTranslationProbability": FLOAT,
+    "RegrowInPlaceProbability": FLOAT,
+    "RegrowProbability": FLOAT,
+    "ReinsertionInPlaceProbability": FLOAT,
+    "ReinsertionInPlaneProbability": FLOAT,
+    "ReinsertionProbability": FLOAT,
+    "RestrictEnantionface": BOOL,
+    "RestrictMovesToBox": BOOL,
+    "RestrictMovesToCylinder": BOOL,
+    "RestrictMovesToPrism": BOOL,
+    "RestrictMovesToSphere": BOOL,
+    "RotationProbability": FLOAT,
+    "RuizMonterofactor": FLOAT,
+    "Sphere": INT,
+    "SphereCenter": FLOAT,
+    "SphereDiameter": FLOAT,
+    "SphereRadius": FLOAT,
+    "StartingBead": INT,
+    "SurfaceAreaProbability": FLOAT,
+    "SwapProbability": FLOAT,
+    "TranslationDirection": STR,
+    "TranslationProbability": FLOAT,
+    "TransmissionCoefficients": BOOL,
+    "UmbrellaFactor": FLOAT,
+    "WidomProbability": FLOAT,
+}
+# keywords that take one value per system, given as a dictionary keyed by the system names
+PER_SYSTEM_KEYWORDS = ("BlockPocketsFileName", "CreateNumberOfMolecules")
+
+SYSTEM_TYPES = ("Framework", "Box")
+
+# the keywords accepted in each section, keyed by their lowercase name for a case-insensitive lookup
+SECTION_KEYWORDS = {
+    "GeneralSettings": {key.lower(): kind for key, kind in {**GENERAL_KEYWORDS, **SYSTEM_KEYWORDS}.items()},
+    "System": {key.lower(): kind for key, kind in {**GENERAL_KEYWORDS, **SYSTEM_KEYWORDS}.items()},
+    "Component": {key.lower(): kind for key, kind in COMPONENT_KEYWORDS.items()},
+}
+KEYWORD_NAMES = {key.lower(): key for key in {**GENERAL_KEYWORDS, **SYSTEM_KEYWORDS, **COMPONENT_KEYWORDS}}
+
+
+def _is_valid_token(token, kind):
+    """Check whether a word of a RASPA input line can be read as the given type."""
+    if kind == BOOL:
+        return token.lower() in ("yes", "no")
+    try:
+        (int if kind == INT else float)(token)
+    except ValueError:
+        return False
+    return True
+
+
+def is_valid_value(value, kind):
+    """Check whether a parameter value is rendered into arguments of the given type."""
+    if isinstance(value, list):
+        return bool(value) and all(is_valid_value(item, kind) for item in value)
+    if isinstance(value, str):
+        return kind == STR or (bool(value.split()) and all(_is_valid_token(token, kind) for token in value.split()))
+    if isinstance(value, bool):
+        return kind in (BOOL, STR)
+    if isinstance(value, int):
+        return kind in (INT, FLOAT, STR)
+    if isinstance(value, float):
+        return kind in (FLOAT, STR)
+    return False
+
+
+def _check_keywords(section, params, where, allow_per_system=False):
+    """Return the errors found in the keywords of one (sub)section."""
+    errors = []
+    keywords = SECTION_KEYWORDS[section]
+    for key, value in params.items():
+        kind = keywords.get(key.lower())
+        if kind is None:
+            if key.lower() in KEYWORD_NAMES:
+                errors.append(f"{where}: '{key}' is not a keyword of the {section} section.")
+            else:
+                matches = get_close_matches(key.lower(), keywords, n=1)
+                hint = f", did you mean '{KEYWORD_NAMES[matches[0]]}'?" if matches else "."
+                errors.append(f"{where}: unknown keyword '{key}'{hint}")
+        elif isinstance(value, dict) and allow_per_system and KEYWORD_NAMES[key.lower()] in PER_SYSTEM_KEYWORDS:
+            if not all(item is None or is_valid_value(item, kind) for item in value.values()):
+                errors.append(f"{where}: the values of '{key}' should be of type {kind}.")
+        elif not is_valid_value(value, kind):
+            errors.append(f"{where}: the value {value!r} of '{key}' should be of type {kind}.")
+    return errors
+
+
+def validate_keywords(parameters):
+    """Validate the RASPA parameters against the keyword schema.
+
+    :param parameters: dictionary with the RASPA parameters
+    :returns: a message listing the errors, or None if the parameters are valid
+    """
+    errors = []
+    for section in parameters:
+        if section not in SECTION_KEYWORDS:
+            errors.append(f"Unknown section '{section}', expected one of {', '.join(SECTION_KEYWORDS)}.")
+    for section in SECTION_KEYWORDS:
+        if not isinstance(parameters.get(section), dict):
+            errors.append(f"The {section} section is missing.")
+    if errors:
+        return "\n".join(errors)
+
+    errors += _check_keywords("GeneralSettings", parameters["GeneralSettings"], "GeneralSettings")
+
+    for name, system in parameters["System"].items():
+        where = f"System '{name}'"
+        if not isinstance(system, dict) or system.get("type") not in SYSTEM_TYPES:
+            errors.append(f"{where}: the type should be one of {', '.join(SYSTEM_TYPES)}.")
+            continue
+        errors += _check_keywords("System", {key: val for key, val in system.items() if key != "type"}, where)
+
+    for name, component in parameters["Component"].items():
+        where = f"Component '{name}'"
+        if not isinstance(component, dict):
+            errors.append(f"{where}: the parameters should be a dictionary.")
+            continue
+        errors += _check_keywords("Component", component, where, allow_per_system=True)
+
+    return "\n".join(errors) if errors else None
@@ -0,0 +1,38 @@
+"""Tools to run several RASPA simulations within a single scheduler job."""
+import shlex
+
+LAUNCHER_SCRIPT = "launcher.sh"
+
+LAUNCHER_TEMPLATE = """#!/bin/bash
+# Run the RASPA simulations in the given directories, at most NPROCS of them at the same time.
+# usage: bash {launcher} RASPA_EXECUTABLE NPROCS
+RASPA="$1"
+NPROCS="$2"
+case "$RASPA" in /*) ;; *) RASPA="$PWD/$RASPA";; esac
+
+run_task() {{
+    (cd "$1" && "$RASPA" {input_file} > simulate.log 2>&1; echo $? > exit_status)
+}}
+
+for task in {tasks}; do
+    while [ "$(jobs -rp | wc -l)" -ge "$NPROCS" ]; do
+        wait -n
+    done
+    run_task "$task" &
+done
+wait
+"""
+
+
+def get_launcher_script(task_dirs, input_file="simulation.input"):
+    """Return the bash script that runs a RASPA simulation in each of the `task_dirs` concurrently."""
+    return LAUNCHER_TEMPLATE.format(
+        launcher=LAUNCHER_SCRIPT,
+        input_file=shlex.quote(input_file),
+        tasks=" ".join(shlex.quote(task_dir) for task_dir in task_dirs),
+    )
+
+
+def get_launcher_command(code, nprocs):
+    """Return the command that executes the launcher script with the executable of `code`."""
+    return f"bash {LAUNCHER_SCRIPT} {shlex.quote(str(code.get_executable()))} {int(nprocs)}"
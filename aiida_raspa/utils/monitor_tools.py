@@ -0,0 +1,103 @@
+"""Tools to follow the averages of a running RASPA simulation from its periodic output."""
+from math import sqrt
+
+MONITOR_EXTRA = "raspa_monitor"
+
+# RASPA estimates the errors from the averages of 5 blocks, with the Student's t value of a 95% confidence interval
+NUMBER_OF_BLOCKS = 5
+STUDENT_T_95 = 2.776
+
+# header of the blocks of the periodic output, the one of the initialization and equilibration cycles is prefixed
+BLOCK_HEADER = "Current cycle:"
+
+
+def parse_production_blocks(output_contents):
+    """Return the loadings and the energy printed every `PrintEvery` production cycles.
+
+    Only the complete blocks are read, the output can be the beginning of the file of a running simulation.
+
+    :returns: list of dictionaries with the `cycle`, the absolute `loadings` (molecules/unit cell) keyed by component
+        name and the total potential `energy` (K) of each block
+    """
+    blocks = []
+    block, component = None, None
+    for line in output_contents.splitlines():
+        if BLOCK_HEADER in line:
+            # the initialization and equilibration blocks are not part of the averages
+            block = {"cycle": int(line.split()[2]), "loadings": {}} if line.startswith(BLOCK_HEADER) else None
+            component = None
+        elif block is None:
+            continue
+        elif line.startswith("Component ") and "current number" in line:
+            # the number of molecules is the loading of a box, the loading of a framework follows on the next line
+            component = line.split("(", 1)[1].split(")", 1)[0]
+            block["loadings"][component] = float(line.split("molecules:", 1)[1].split("/", 1)[0])
+        elif component is not None and "absolute adsorption:" in line:
+            block["loadings"][component] = float(line.split()[2])
+            component = None
+        elif line.startswith("Current total potential energy:"):
+            # the energies are printed after the loadings, the block is complete
+            block["energy"] = float(line.split()[4])
+            blocks.append(block)
+            block = None
+    return blocks
+
+
+def parse_running_loadings(output_contents):
+    """Return the loadings printed every `PrintEvery` production cycles.
+
+    :returns: tuple of the last production cycle that was read (None if there is none) and a dictionary with the
+        list of absolute loadings (molecules/unit cell) of every component, keyed by component name
+    """
+    blocks = parse_production_blocks(output_contents)
+    loadings = {}
+    for block in blocks:
+        for name, value in block["loadings"].items():
+            loadings.setdefault(name, []).append(value)
+    return (blocks[-1]["cycle"] if blocks else None), loadings
+
+
+def get_complete_output(output_contents):
+    """Return the part of the output of a running simulation up to the header of its last block.
+
+    The last block can be incomplete, it is read again with the next part of the output. The initialization and
+    equilibration blocks count as well, so that a monitor reading the output in parts does not read them again.
+    """
+    end = output_contents.rfind(BLOCK_HEADER)
+    if end == -1:
+        return ""
+    return output_contents[: max(output_contents.rfind("\n", 0, end), 0)]
+
+
+def block_average(values, nblocks=NUMBER_OF_BLOCKS):
+    """Return the average of `values` and its error, estimated as RASPA does from the averages of `nblocks` blocks.
+
+    :returns: tuple of the average and the error, (None, None) if there are fewer values than blocks
+    """
+    if len(values) < nblocks:
+        return None, None
+    block_size = len(values) / nblocks
+    blocks = [values[round(i * block_size) : round((i + 1) * block_size)] for i in range(nblocks)]
+    means = [sum(block) / len(block) for block in blocks]
+    average = sum(means) / nblocks
+    variance = sum((mean - average) ** 2 for mean in means) / (nblocks - 1)
+    return average, STUDENT_T_95 * sqrt(variance / nblocks)
+
+
+def get_running_results(output_contents):
+    """Return the results of a simulation that was stopped before the end, from its periodic output.
+
+    The results have the keys of `parse_base_output` that can be estimated from the periodic output, i.e. the
+    absolute loadings of the components.
+    """
+    cycle, loadings = parse_running_loadings(output_contents)
+    components = {}
+    for name, values in loadings.items():
+        average, dev = block_average(values)
+        components[name] = {
+            "loading_absolute_average": average,
+            "loading_absolute_dev": dev,
+            "loading_absolute_unit": "molecules/unit cell",
+        }
+    general = {"stopped_early": True, "number_of_cycles_completed": cycle}
+    return {"general": general, "components": components}
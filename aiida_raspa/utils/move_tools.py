@@ -0,0 +1,179 @@
+"""Tools to read the statistics of the Monte Carlo moves and to tune the move probabilities."""
+import re
+
+# moves of the molecules: probability keyword, headers of their statistics and labels of their CPU timings
+MOVES = {
+    "translation": ("TranslationProbability", ("translation move",), ("translation",)),
+    "rotation": ("RotationProbability", ("rotation move",), ("rotation",)),
+    "reinsertion": ("ReinsertionProbability", ("Reinsertion move",), ("reinsertion",)),
+    "partial_reinsertion": ("PartialReinsertionProbability", ("partial reinsertion move",), ("partial reinsertion",)),
+    "swap": ("SwapProbability", ("swap addition move", "swap deletion move"), ("swap (insertion)", "swap (deletion)")),
+    "cf_swap": ("CFSwapLambdaProbability", ("CFCMC swap lambda move",), ("swap lambda (CFMC)",)),
+    "cbcf_swap": ("CBCFSwapLambdaProbability", ("CB/CFCMC swap lambda move",), ("swap lambda (CB/CFMC)",)),
+}
+
+HEADER_MOVES = {f"Performance of the {header}:": move for move, (_, headers, _) in MOVES.items() for header in headers}
+TIMING_MOVES = {label: move for move, (_, _, labels) in MOVES.items() for label in labels}
+
+# "Component [name] total tried: 1949.000000 succesfull growth: 1773.000000 (...) accepted: 284.000000 (...)"
+TRIED_LINE = re.compile(r"^Component \[(.+?)\] total tried: (\S+) .*? accepted: (\S+)")
+
+
+def parse_move_statistics(output_contents):
+    """Return the number of tried and accepted moves of every component and their CPU time in the production run.
+
+    :returns: dictionary keyed by component name of the statistics of each move, as dictionaries with the number of
+        moves `tried` and `accepted`, their `acceptance` ratio and their `cpu_time` in seconds
+    """
+    lines = iter(output_contents.splitlines())
+    statistics = _parse_move_counts(lines)
+    _add_cpu_timings(statistics, lines)
+
+    for moves in statistics.values():
+        for values in moves.values():
+            values["acceptance"] = values["accepted"] / values["tried"] if values["tried"] else None
+    return statistics
+
+
+def _parse_move_counts(lines):
+    """Return the tried and accepted moves of every component, reading `lines` up to the CPU timings of the moves."""
+    statistics = {}
+    move, component = None, None
+    for line in lines:
+        if line.startswith("Performance of the"):
+            move = HEADER_MOVES.get(line.strip())
+        elif line.startswith("Production run CPU timings of the MC moves:"):
+            break
+        elif line.startswith("Total CPU timings"):
+            move = None
+        elif move is None:
+            continue
+        elif TRIED_LINE.match(line):
+            name, tried, accepted = TRIED_LINE.match(line).groups()
+            _add_moves(statistics, name, move, float(tried), float(accepted))
+        elif re.match(r"^Component \d+ \[.+\]$", line.strip()):
+            component = line.split("[", 1)[1].rsplit("]", 1)[0]
+        elif component is not None and line.strip().startswith(("total ", "succesfull ")):
+            values = sum(float(value) for value in line.split()[1:])
+            if line.strip().startswith("total "):
+                _add_moves(statistics, component, move, values, 0.0)
+            else:
+                _add_moves(statistics, component, move, 0.0, values)
+    return statistics
+
+
+def _add_cpu_timings(statistics, lines):
+    """Add the CPU time of the moves to the `statistics`, reading the production run timings from `lines`.
+
+    The CPU timings of the production run are given per component, until the total over all components.
+    """
+    component = None
+    for line in lines:
+        if line.startswith("Component:"):
+            component = line.split("(", 1)[1].rsplit(")", 1)[0]
+        elif line.startswith("Total all components:"):
+            break
+        elif component is not None and line.startswith("\t") and line.rstrip().endswith("[s]"):
+            label, value = line.strip().rsplit(":", 1)
+            move = TIMING_MOVES.get(label)
+            if move is not None and move in statistics.get(component, {}):
+                statistics[component][move]["cpu_time"] += float(value.split()[0])
+
+
+def _add_moves(statistics, component, move, tried, accepted):
+    """Add tried and accepted moves to the `statistics` of a component."""
+    values = statistics.setdefault(component, {}).setdefault(move, {"tried": 0.0, "accepted": 0.0, "cpu_time": 0.0})
+    values["tried"] += tried
+    values["accepted"] += accepted
+
+
+def get_tuned_probabilities(component, statistics, min_fraction=0.05):
+    """Return the move probabilities of a component rebalanced with the move statistics of a pilot run.
+
+    Each move gets a share proportional to the number of moves it has accepted per CPU second, so that the moves
+    that decorrelate the configurations at the lowest cost are tried most. Every move keeps at least `min_fraction`
+    of the tuned share, such that all the degrees of freedom are still sampled. Only the moves enabled in `component`
+    with statistics and CPU timings are tuned, together they keep the same share as before.
+
+    :param component: the `Component` section of a component
+    :param statistics: the move statistics of the component, as returned by `parse_move_statistics`
+    :param min_fraction: minimum fraction of the tuned share of every move
+    :returns: dictionary with the tuned probabilities, keyed by probability keyword
+    """
+    rates = {}
+    for move, (keyword, _, _) in MOVES.items():
+        values = statistics.get(move, {})
+        if float(component.get(keyword, 0)) > 0 and values.get("tried") and values.get("cpu_time"):
+            rates[keyword] = values["accepted"] / values["cpu_time"]
+    if not rates:
+        return {}
+
+    share = sum(float(component[keyword]) for keyword in rates)
+    total_rate = sum(rates.values())
+    fractions = {keyword: max(rate / total_rate if total_rate else 0, min_fraction) for keyword, rate in rates.items()}
+    normalization = sum(fractions.values())
+    return {keyword: float(f"{share * fraction / normalization:.4g}") for keyword, fraction in fractions.items()}
+
+
+def tune_parameters(parameters, output_parameters, min_fraction=0.05):
+    """Return the RASPA parameters with the move probabilities of every component tuned on the results of a pilot run.
+
+    The move statistics of the systems are added up.
+
+    :param parameters: dictionary with the RASPA parameters
+    :param output_parameters: the output parameters of the pilot run, keyed by system name
+    :param min_fraction: minimum fraction of the tuned share of every move
+    """
+    tuned = dict(parameters, Component=dict(parameters["Component"]))
+    for name, component in parameters["Component"].items():
+        statistics = {}
+        for system in output_parameters.values():
+            for move, values in system["components"].get(name, {}).get("move_statistics", {}).items():
+                for key in ("tried", "accepted", "cpu_time"):
+                    statistics.setdefault(move, {"tried": 0.0, "accepted": 0.0, "cpu_time": 0.0})[key] += values[key]
+        tuned["Component"][name] = dict(component, **get_tuned_probabilities(component, statistics, min_fraction))
+    return tuned
+
+
+def get_collapsed_swaps(parameters, output_parameters, min_acceptance=0.01, min_tried=1000):
+    """Return the components whose swap moves are hardly ever accepted, e.g. because of a high loading.
+
+    The swap statistics of the systems are added up. Only the components that use plain swap moves are checked, with
+    at least `min_tried` insertions and deletions tried to get a meaningful acceptance ratio.
+
+    :param parameters: dictionary with the RASPA parameters
+    :param output_parameters: the output parameters of the calculation, keyed by system name
+    :param min_acceptance: acceptance ratio of the swap moves below which they are considered collapsed
+    :param min_tried: minimum number of tried swap moves
+    :returns: list with the names of the components
+    """
+    collapsed = []
+    for name, component in parameters["Component"].items():
+        if float(component.get("SwapProbability", 0)) <= 0:
+            continue
+        tried, accepted = 0.0, 0.0
+        for system in output_parameters.values():
+            values = system.get("components", {}).get(name, {}).get("move_statistics", {}).get("swap", {})
+            tried += values.get("tried", 0.0)
+            accepted += values.get("accepted", 0.0)
+        if tried >= min_tried and accepted / tried < min_acceptance:
+            collapsed.append(name)
+    return collapsed
+
+
+def use_cbcf_swap_moves(parameters, components):
+    """Return the RASPA parameters with the swap moves of `components` replaced by CB/CFCMC swap moves.
+
+    The continuous fractional component moves insert and delete the molecules gradually, they keep an acceptance that
+    does not collapse at high loadings. The CB/CFCMC moves get the probability of the swap moves they replace.
+
+    :param parameters: dictionary with the RASPA parameters
+    :param components: names of the components
+    """
+    modified = dict(parameters, Component=dict(parameters["Component"]))
+    for name in components:
+        component = dict(parameters["Component"][name])
+        probability = float(component.pop("SwapProbability", 0))
+        component["CBCFSwapLambdaProbability"] = float(component.get("CBCFSwapLambdaProbability", 0)) + probability
+        modified["Component"][name] = component
+    return modified
@@ -0,0 +1,130 @@
+"""Tools to control which files of a RASPA calculation are retrieved."""
+import shlex
+
+RETRIEVAL_POLICY_LOG = "retrieval_policy.log"
+WITHHELD_FOLDER = "Withheld"
+
+RETRIEVAL_POLICY_DEFAULTS = {
+    "include": [],
+    "exclude": [],
+    "max_file_size": None,
+    "oversize_action": "skip",
+    "large_files_on_failure": False,
+}
+
+
+def get_retrieval_policy(policy):
+    """Validate the retrieval policy dictionary and complete it with the default values.
+
+    The policy may contain the following keys:
+
+    * ``include``: list of glob patterns of additional files to retrieve, e.g. ``"Movies/System_0/*.pdb"``.
+    * ``exclude``: list of glob patterns of files that should never be retrieved, e.g. ``"VTK*"``.
+    * ``max_file_size``: maximum size of a retrieved file in bytes.
+    * ``oversize_action``: ``"skip"`` or ``"truncate"`` the files that exceed ``max_file_size``.
+    * ``large_files_on_failure``: if True, the policy is not applied when the simulation did not finish.
+
+    The policy is applied by a script in the `append_text` of the job, after RASPA. It does not run if the scheduler
+    kills the job, e.g. when the walltime is exceeded: all the files are then retrieved, however large they are.
+    The output and restart files of the systems are never withheld.
+
+    :raises ValueError: if the policy is not valid
+    :returns: the complete policy
+    """
+    unknown = set(policy) - set(RETRIEVAL_POLICY_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown key(s) in the retrieval policy: {', '.join(sorted(unknown))}.")
+
+    result = dict(RETRIEVAL_POLICY_DEFAULTS, **policy)
+    for key in ("include", "exclude"):
+        if not isinstance(result[key], list) or not all(isinstance(item, str) for item in result[key]):
+            raise ValueError(f"The `{key}` key of the retrieval policy should be a list of glob patterns.")
+    if result["max_file_size"] is not None and (
+        not isinstance(result["max_file_size"], int) or result["max_file_size"] < 0
+    ):
+        raise ValueError("The `max_file_size` key of the retrieval policy should be a non-negative integer.")
+    if result["oversize_action"] not in ("skip", "truncate"):
+        raise ValueError("The `oversize_action` key of the retrieval policy should be either 'skip' or 'truncate'.")
+    return result
+
+
+def get_retrieval_policy_script(policy, retrieved_paths, protected_paths=()):
+    """Construct the bash snippet that enforces the retrieval policy before the files are retrieved.
+
+    Files that are excluded or too large are moved to the `Withheld` folder, so they stay available in the remote
+    folder. Truncated files are copied there before being cut to `max_file_size` bytes. Every action is written
+    to the `retrieval_policy.log` file.
+
+    :param policy: complete retrieval policy as returned by `get_retrieval_policy`
+    :param retrieved_paths: list of paths or glob patterns that are going to be retrieved
+    :param protected_paths: glob patterns of files that are never withheld (e.g. the files needed by the parser)
+    :returns: the bash snippet
+    """
+    lines = ["# apply the retrieval policy", "shopt -s nullglob globstar", f": > {RETRIEVAL_POLICY_LOG}"]
+    if policy["large_files_on_failure"]:
+        lines += [
+            "_raspa_finished=yes",
+            "for _raspa_out in Output/System_*/*; do",
+            '    grep -qs "Simulation finished" "$_raspa_out" || _raspa_finished=no',
+            "done",
+            "[ -d Output ] || _raspa_finished=no",
+            'if [ "$_raspa_finished" = no ]; then',
+            f'    echo "not applied: the simulation did not finish" >> {RETRIEVAL_POLICY_LOG}',
+            "else",
+        ]
+        indent = " " * 4
+    else:
+        indent = ""
+
+    patterns = " ".join(_quote_glob(path) + suffix for path in retrieved_paths for suffix in ("", "/**"))
+    body = [
+        f"for _raspa_path in {patterns}; do",
+        '    [ -f "$_raspa_path" ] || continue',
+    ]
+    if protected_paths:
+        body += [f'    case "$_raspa_path" in {"|".join(_quote_glob(p) for p in protected_paths)}) continue;; esac']
+    withhold = [
+        f'        mkdir -p "{WITHHELD_FOLDER}/$(dirname "$_raspa_path")"',
+        f'        mv "$_raspa_path" "{WITHHELD_FOLDER}/$_raspa_path"',
+    ]
+    if policy["exclude"]:
+        body += [f'    case "$_raspa_path" in {"|".join(_quote_glob(p) for p in policy["exclude"])})']
+        body += withhold
+        body += [f'        echo "excluded $_raspa_path" >> {RETRIEVAL_POLICY_LOG}', "        continue;;", "    esac"]
+    if policy["max_file_size"] is not None:
+        max_size = policy["max_file_size"]
+        body += [f'    if [ "$(wc -c < "$_raspa_path")" -gt {max_size} ]; then']
+        if policy["oversize_action"] == "truncate":
+            body += [
+                f'        mkdir -p "{WITHHELD_FOLDER}/$(dirname "$_raspa_path")"',
+                f'        cp "$_raspa_path" "{WITHHELD_FOLDER}/$_raspa_path"',
+                f'        head -c {max_size} "{WITHHELD_FOLDER}/$_raspa_path" > "$_raspa_path"',
+                f'        echo "truncated $_raspa_path" >> {RETRIEVAL_POLICY_LOG}',
+            ]
+        else:
+            body += withhold + [f'        echo "skipped $_raspa_path" >> {RETRIEVAL_POLICY_LOG}']
+        body += ["    fi"]
+    body += ["done"]
+
+    lines += [indent + line for line in body]
+    if policy["large_files_on_failure"]:
+        lines += ["fi"]
+    return "\n".join(lines)
+
+
+def parse_retrieval_policy_log(contents):
+    """Parse the log written by the retrieval policy script.
+
+    :returns: dictionary with the lists of `excluded`, `skipped` and `truncated` files
+    """
+    result = {"excluded": [], "skipped": [], "truncated": []}
+    for line in contents.splitlines():
+        action, _, path = line.partition(" ")
+        if action in result:
+            result[action].append(path)
+    return result
+
+
+def _quote_glob(pattern):
+    """Quote a glob pattern for bash, leaving the wildcards active."""
+    return "".join(char if char in "*?[]" else shlex.quote(char) for char in pattern)
@@ -0,0 +1,128 @@
+"""Tools to build the inputs of screenings over many frameworks and conditions."""
+from itertools import islice, product
+
+from aiida.common.hashing import make_hash
+from aiida.manage import get_manager
+from aiida.orm import Dict, QueryBuilder, SinglefileData
+from aiida.plugins import WorkflowFactory
+
+# maximum number of values in the `in` filter of a query
+QUERY_CHUNK_SIZE = 1000
+
+
+def get_screening_parameters(general_settings, components, framework_name, condition, system_settings=None):
+    """Return the RASPA parameters of the adsorption of `components` in one framework at one temperature and pressure.
+
+    :param general_settings: the `GeneralSettings` section
+    :param components: the `Component` section
+    :param framework_name: name of the framework, i.e. the label of its `framework` input
+    :param condition: (temperature, pressure) pair, in K and Pa
+    :param system_settings: additional keywords of the framework system, e.g. `UseChargesFromCIFFile` (optional)
+    """
+    temperature, pressure = condition
+    system = dict(system_settings or {})
+    system.update(type="Framework", ExternalTemperature=float(temperature), ExternalPressure=float(pressure))
+    return {
+        "GeneralSettings": general_settings,
+        "System": {framework_name: system},
+        "Component": components,
+    }
+
+
+def _store_all(nodes):
+    """Store the unstored `nodes` within a single database transaction."""
+    unstored = [node for node in nodes if not node.is_stored]
+    if unstored:
+        with get_manager().get_profile_storage().transaction():
+            for node in unstored:
+                node.store()
+
+
+def _get_parameters_nodes(parameters_list):
+    """Return a stored `Dict` node for each parameters dictionary.
+
+    A single node is used for identical dictionaries, and the nodes already in the database are reused. The hashes
+    are computed as AiiDA does when storing the nodes, from the public `get_objects_to_hash` of aiida-core 2.6 (the
+    `compute_hash` method refuses unstored nodes).
+    """
+    nodes = {}
+    parameters_hashes = []
+    for parameters in parameters_list:
+        node = Dict(parameters)
+        parameters_hashes.append(make_hash(node.base.caching.get_objects_to_hash()))
+        nodes.setdefault(parameters_hashes[-1], node)
+
+    hashes = list(nodes)
+    for start in range(0, len(hashes), QUERY_CHUNK_SIZE):
+        query = QueryBuilder().append(
+            Dict,
+            filters={"extras._aiida_hash": {"in": hashes[start : start + QUERY_CHUNK_SIZE]}},
+            project=["extras._aiida_hash", "*"],
+        )
+        for node_hash, node in query.iterall():
+            nodes[node_hash] = node
+    _store_all(nodes.values())
+
+    return [nodes[parameters_hash] for parameters_hash in parameters_hashes]
+
+
+def _get_builders(chunk, parameters_nodes, code, files, options):
+    """Yield the `RaspaBaseWorkChain` builders of a chunk of ((name, framework), condition) pairs."""
+    RaspaBaseWorkChain = WorkflowFactory("raspa.base")  # pylint: disable=invalid-name
+    for ((name, framework), (temperature, pressure)), parameters in zip(chunk, parameters_nodes):
+        builder = RaspaBaseWorkChain.get_builder()
+        builder.metadata.label = f"{name}_{float(temperature):g}K_{float(pressure):g}Pa"
+        builder.raspa.code = code
+        builder.raspa.parameters = parameters
+        builder.raspa.framework = {name: framework}
+        if files:
+            builder.raspa.file = files
+        if options:
+            builder.raspa.metadata.options = options
+        yield builder
+
+
+def get_screening_builders(
+    code,
+    frameworks,
+    components,
+    conditions,
+    general_settings,
+    system_settings=None,
+    files=None,
+    options=None,
+    chunk_size=1000,
+):  # pylint: disable=too-many-arguments
+    """Yield the `RaspaBaseWorkChain` builders of every framework at every condition.
+
+    The input nodes are created and stored in chunks of `chunk_size` builders, each chunk in a single database
+    transaction. Identical parameters share one `Dict` node, also with the ones already in the database, such that
+    repeated screenings can be cached. The frameworks and the files are shared by all the builders.
+
+    :param code: the RASPA `Code`
+    :param frameworks: dictionary of `CifData` nodes, the keys are used as framework names
+    :param components: the `Component` section of the parameters
+    :param conditions: iterable of (temperature, pressure) pairs, in K and Pa
+    :param general_settings: the `GeneralSettings` section of the parameters
+    :param system_settings: additional keywords of every framework system (optional)
+    :param files: dictionary of `SinglefileData` nodes, or of paths to the files, shared by all the builders (optional)
+    :param options: the scheduler options of the calculations (optional)
+    :param chunk_size: number of builders whose inputs are stored at once
+    :returns: generator of `RaspaBaseWorkChain` builders, ordered by framework and then by condition
+    """
+    files = {
+        name: SinglefileData(file) if not isinstance(file, SinglefileData) else file
+        for name, file in (files or {}).items()
+    }
+    _store_all(list(frameworks.values()) + list(files.values()))
+
+    grid = product(frameworks.items(), conditions)
+    while True:
+        chunk = list(islice(grid, chunk_size))
+        if not chunk:
+            return
+        parameters_list = [
+            get_screening_parameters(general_settings, components, name, condition, system_settings)
+            for (name, _), condition in chunk
+        ]
+        yield from _get_builders(chunk, _get_parameters_nodes(parameters_list), code, files, options)
@@ -0,0 +1,162 @@
+"""Tools to run several RASPA stages one after another within a single scheduler job."""
+import shlex
+
+STAGE_SCRIPT = "stages.sh"
+STAGE_LOG = "stages.log"
+
+STAGE_TEMPLATE = """#!/bin/bash
+# Run the RASPA stages one after another, the restart of a stage is the initial configuration of the next one.
+# usage: bash {script} RASPA_EXECUTABLE
+set -e
+RASPA="$1"
+{stages}"""
+
+RUN_STAGE_TEMPLATE = """
+# stage '{name}'
+"$RASPA" -i {input_file} > {log_file} 2>&1
+echo {name} >> {stage_log}
+"""
+
+TRANSFER_TEMPLATE = """mv Output {stage_dir}/Output
+rm -rf RestartInitial CrashRestart
+{copy_restarts}
+mv Restart {stage_dir}/Restart
+"""
+
+
+def _merge(parameters, overrides):
+    """Return `parameters` updated recursively with `overrides`, a `None` value removes the keyword."""
+    merged = dict(parameters)
+    for key, value in overrides.items():
+        if value is None:
+            merged.pop(key, None)
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def get_stage_names(stages):
+    """Return the names of the stages, a stage without a name is called after its position."""
+    return [stage.get("name", f"stage_{index}") for index, stage in enumerate(stages)]
+
+
+def get_stage_parameters(parameters, stages):
+    """Return the RASPA parameters of every stage.
+
+    Each stage is a dictionary with an optional `name` and the `parameters` that override the base `parameters`.
+    The stages after the first one start from the restart of the previous stage, without inserting new molecules.
+
+    :raises ValueError: if the stages are not well defined.
+    """
+    if not isinstance(stages, list) or not stages or not all(isinstance(stage, dict) for stage in stages):
+        raise ValueError("The `stages` should be a non-empty list of dictionaries.")
+    for stage in stages:
+        unknown = set(stage) - {"name", "parameters"}
+        if unknown:
+            raise ValueError(f"Unknown key(s) {', '.join(sorted(unknown))} in the definition of a stage.")
+    names = get_stage_names(stages)
+    for name in names:
+        if not isinstance(name, str) or not name.isidentifier():
+            raise ValueError(f"The name of the stage '{name}' is not a valid identifier.")
+    if len(set(names)) != len(names):
+        raise ValueError("The names of the stages should be unique.")
+
+    stage_parameters = []
+    for index, stage in enumerate(stages):
+        params = _merge(parameters, stage.get("parameters", {}))
+        if set(params.get("System", {})) != set(parameters["System"]) or list(params.get("Component", {})) != list(
+            parameters["Component"]
+        ):
+            raise ValueError(f"The stage '{names[index]}' can not change the systems or the components.")
+        if index > 0:
+            params = _merge(params, _get_restart_overrides(params))
+        stage_parameters.append(params)
+    return stage_parameters
+
+
+def _get_restart_overrides(params):
+    """Return the overrides that make a stage start from the restart of the previous one."""
+    overrides = {"GeneralSettings": {"RestartFile": True}}
+    components = {
+        name: {"CreateNumberOfMolecules": 0}
+        for name, component in params["Component"].items()
+        if "CreateNumberOfMolecules" in component
+    }
+    if components:
+        overrides["Component"] = components
+    return overrides
+
+
+def get_remaining_stages(parameters, stages, finished):
+    """Return the stages that did not finish, named as in the original list of stages.
+
+    If some stages finished, the first remaining one keeps starting from the restart of the previous stage: its
+    `parameters` get the `RestartFile` and `CreateNumberOfMolecules` overrides of `get_stage_parameters`.
+
+    :param parameters: dictionary with the base RASPA parameters
+    :param stages: list of the stages
+    :param finished: names of the finished stages
+    """
+    names = get_stage_names(stages)
+    remaining = [dict(stage, name=name) for stage, name in zip(stages, names) if name not in finished]
+    if remaining and len(remaining) < len(stages):
+        overrides = remaining[0].get("parameters", {})
+        overrides = _merge(overrides, _get_restart_overrides(_merge(parameters, overrides)))
+        remaining[0] = dict(remaining[0], parameters=overrides)
+    return remaining
+
+
+def get_restart_filename(system_name, system):
+    """Return the name under which RASPA looks for the initial configuration of a system in `RestartInitial`."""
+    if system["type"] == "Box":
+        system_or_box = "Box"
+        (n_x, n_y, n_z) = (1, 1, 1)
+    else:
+        system_or_box = system_name
+        try:
+            (n_x, n_y, n_z) = tuple(map(int, system["UnitCells"].split()))
+        except KeyError:
+            (n_x, n_y, n_z) = 1, 1, 1
+    external_temperature = float(system["ExternalTemperature"])
+    external_pressure = float(system.get("ExternalPressure", 0))
+    return f"restart_{system_or_box:s}_{n_x:d}.{n_y:d}.{n_z:d}_{external_temperature:f}_{external_pressure:g}"
+
+
+def get_stage_script(stage_dirs, names, restart_filenames, input_file="simulation.input"):
+    """Return the bash script that runs the RASPA stages one after another in the working directory.
+
+    The input of each stage is read from its folder in `stage_dirs` and the names of the finished stages are written
+    to `STAGE_LOG`. After a stage, its `Output` and `Restart` folders are moved into its folder and the restart files
+    become the `RestartInitial` of the next stage, under the names in `restart_filenames` (one list per stage, ordered
+    as the systems). The `Output` and `Restart` of the last stage stay in the working directory.
+    """
+    stages = []
+    for index, (stage_dir, name) in enumerate(zip(stage_dirs, names)):
+        stages.append(
+            RUN_STAGE_TEMPLATE.format(
+                name=name,
+                stage_log=STAGE_LOG,
+                input_file=shlex.quote(f"{stage_dir}/{input_file}"),
+                log_file=shlex.quote(f"{stage_dir}/simulate.log"),
+            )
+        )
+        if index + 1 < len(stage_dirs):
+            copy_restarts = "\n".join(
+                f"mkdir -p RestartInitial/System_{system_id}\n"
+                f"cp Restart/System_{system_id}/* {shlex.quote(f'RestartInitial/System_{system_id}/{filename}')}"
+                for system_id, filename in enumerate(restart_filenames[index + 1])
+            )
+            stages.append(TRANSFER_TEMPLATE.format(stage_dir=shlex.quote(stage_dir), copy_restarts=copy_restarts))
+    return STAGE_TEMPLATE.format(script=STAGE_SCRIPT, stages="".join(stages))
+
+
+def parse_stage_log(content):
+    """Return the names of the finished stages from the content of the `STAGE_LOG`."""
+    return content.split()
+
+
+def get_stage_command(code):
+    """Return the command that executes the stage script with the executable of `code`."""
+    return f"bash {STAGE_SCRIPT} {shlex.quote(str(code.get_executable()))}"
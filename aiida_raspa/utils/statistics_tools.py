@@ -0,0 +1,101 @@
+"""Tools to combine the results of independent RASPA simulations."""
+from copy import deepcopy
+from math import ceil, sqrt
+
+
+def combine_averages(averages, devs, weights=None):
+    """Combine independent estimates of the same average into a single one.
+
+    The combined average is the weighted mean of the `averages`, its error is obtained by propagating the
+    independent errors `devs`. With equal weights, K replicas with the same error `dev` give an error of
+    `dev / sqrt(K)`.
+
+    :param averages: list of averages
+    :param devs: list of the errors of the averages
+    :param weights: list of weights, e.g. the number of production cycles of each simulation (default: equal weights)
+    :returns: tuple with the combined average and error, (None, None) if any of the averages or errors is missing
+    """
+    if weights is None:
+        weights = [1] * len(averages)
+    if any(value is None for value in list(averages) + list(devs)):
+        return None, None
+
+    total_weight = sum(weights)
+    average = sum(weight * value for weight, value in zip(weights, averages)) / total_weight
+    dev = sqrt(sum((weight * value) ** 2 for weight, value in zip(weights, devs))) / total_weight
+    return average, dev
+
+
+def merge_output_parameters(results, weights=None):
+    """Merge the results of a system parsed by `parse_base_output` from independent simulations.
+
+    Every `<property>_average` that has a matching `<property>_dev` in all the simulations is combined with
+    `combine_averages`, all the other values are taken from the first simulation.
+
+    :param results: list of dictionaries with the `general` and `components` results of the same system
+    :param weights: list of weights of the simulations (default: equal weights)
+    :returns: the merged dictionary
+    """
+    merged = deepcopy(results[0])
+    _merge_section(merged["general"], [result["general"] for result in results], weights)
+    for name, component in merged["components"].items():
+        _merge_section(component, [result["components"][name] for result in results], weights)
+    return merged
+
+
+def merge_production_segments(segments, cycles):
+    """Merge the output parameters of the successive production segments of a simulation.
+
+    A simulation continued from its restart file starts a new production phase, whose averages are independent of the
+    ones of the previous segments. The averages of the segments are combined with `merge_output_parameters`, weighted
+    by their number of production cycles. The other values are taken from the last segment.
+
+    :param segments: list of the output parameters of the segments, keyed by system name, in the order they were run
+    :param cycles: list of the number of production cycles of the segments
+    :returns: the merged output parameters
+    """
+    order = [len(segments) - 1] + list(range(len(segments) - 1))
+    merged = {}
+    for system_name in segments[-1]:
+        merged[system_name] = merge_output_parameters(
+            [segments[index][system_name] for index in order], [cycles[index] for index in order]
+        )
+        merged[system_name]["general"]["number_of_production_segments"] = len(segments)
+        merged[system_name]["general"]["number_of_production_cycles"] = sum(cycles)
+    return merged
+
+
+def _merge_section(merged, sections, weights):
+    """Combine in place the averages of `sections` into `merged`.
+
+    Only the averages found in all the sections are combined, e.g. a simulation stopped by the convergence monitor
+    reports the loadings only. The other values are kept as they are in `merged`.
+    """
+    for key in list(merged):
+        if not key.endswith("_average"):
+            continue
+        dev_key = key[: -len("_average")] + "_dev"
+        if not all(key in section and dev_key in section for section in sections):
+            continue
+        merged[key], merged[dev_key] = combine_averages(
+            [section[key] for section in sections], [section[dev_key] for section in sections], weights
+        )
+
+
+def estimate_required_cycles(cycles, relative_error, target_error, safety_factor=1.2):
+    """Estimate the number of production cycles needed to reach the `target_error`.
+
+    The error of a block average decreases as 1/sqrt(N) once the blocks are longer than the correlation time, the
+    error `relative_error` obtained with `cycles` production cycles is therefore reached again with
+    `cycles * (relative_error / target_error)**2` cycles. The `safety_factor` accounts for the noise of the error
+    estimate itself, which is computed from a few blocks only.
+
+    :param cycles: number of production cycles of the simulation
+    :param relative_error: relative error of the average obtained with `cycles` cycles
+    :param target_error: relative error to reach
+    :param safety_factor: factor applied to the estimate
+    :returns: the number of production cycles
+    """
+    if cycles <= 0 or relative_error < 0 or target_error <= 0:
+        raise ValueError("The number of cycles and the target error should be positive.")
+    return ceil(cycles * safety_factor * (relative_error / target_error) ** 2)
@@ -0,0 +1,128 @@
+"""Tools to choose the simulation cell of the frameworks."""
+import re
+
+import numpy as np
+
+CELL_PARAMETERS = (
+    "_cell_length_a",
+    "_cell_length_b",
+    "_cell_length_c",
+    "_cell_angle_alpha",
+    "_cell_angle_beta",
+    "_cell_angle_gamma",
+)
+
+# RASPA cutoffs that require the minimum image convention, `CutOff` sets all of them
+CUTOFF_KEYS = ("CutOff", "CutOffVDW", "CutOffChargeCharge", "CutOffChargeBondDipole", "CutOffBondDipoleBondDipole")
+DEFAULT_CUTOFF = 12.0  # Angstrom, the RASPA default
+
+
+def get_cutoff(parameters):
+    """Return the largest cutoff of the RASPA parameters."""
+    general = parameters["GeneralSettings"]
+    return max(float(general.get(key, DEFAULT_CUTOFF if key == "CutOff" else 0)) for key in CUTOFF_KEYS)
+
+
+def get_cell_parameters(cif):
+    """Return the cell lengths (Angstrom) and angles (degrees) of a `CifData` node."""
+    block = cif.values[cif.values.keys()[0]]
+    # remove the standard uncertainty, e.g. 25.832(2)
+    return [float(re.sub(r"\(\d+\)$", "", block[key])) for key in CELL_PARAMETERS]
+
+
+def cell_from_parameters(parameters):
+    """Convert cell parameters into cell vectors, following the RASPA convention (a along x, b in the xy plane).
+
+    :param parameters: array-like of shape (..., 6) with the lengths a, b, c and the angles alpha, beta, gamma
+    :returns: array of shape (..., 3, 3) with the cell vectors as rows
+    """
+    parameters = np.asarray(parameters, dtype=float)
+    len_a, len_b, len_c = np.moveaxis(parameters[..., :3], -1, 0)
+    alpha, beta, gamma = np.moveaxis(np.radians(parameters[..., 3:]), -1, 0)
+    cos_alpha, cos_beta, cos_gamma = np.cos(alpha), np.cos(beta), np.cos(gamma)
+    sin_gamma = np.sin(gamma)
+
+    c_y = len_c * (cos_alpha - cos_beta * cos_gamma) / sin_gamma
+    c_z = np.sqrt(len_c**2 - (len_c * cos_beta) ** 2 - c_y**2)
+    zeros = np.zeros_like(len_a)
+    return np.stack(
+        [
+            np.stack([len_a, zeros, zeros], axis=-1),
+            np.stack([len_b * cos_gamma, len_b * sin_gamma, zeros], axis=-1),
+            np.stack([len_c * cos_beta, c_y, c_z], axis=-1),
+        ],
+        axis=-2,
+    )
+
+
+def get_perpendicular_widths(cells):
+    """Return the distances between the opposite faces of the cells.
+
+    :param cells: array-like of shape (..., 3, 3) with the cell vectors as rows
+    :returns: array of shape (..., 3)
+    """
+    cells = np.asarray(cells, dtype=float)
+    volumes = np.abs(np.linalg.det(cells))
+    vec_a, vec_b, vec_c = cells[..., 0, :], cells[..., 1, :], cells[..., 2, :]
+    face_normals = np.stack([np.cross(vec_b, vec_c), np.cross(vec_c, vec_a), np.cross(vec_a, vec_b)], axis=-2)
+    return volumes[..., None] / np.linalg.norm(face_normals, axis=-1)
+
+
+def compute_unit_cells(cells, cutoff):
+    """Compute the minimal number of unit cells that satisfies the minimum image convention.
+
+    The perpendicular widths of the simulation cell have to be at least twice the cutoff.
+
+    :param cells: array-like of shape (..., 3, 3) with the cell vectors as rows
+    :param cutoff: cutoff (Angstrom), either a scalar or an array-like broadcastable to the number of cells
+    :returns: integer array of shape (..., 3)
+    """
+    widths = get_perpendicular_widths(cells)
+    cutoff = np.asarray(cutoff, dtype=float)[..., None]
+    # the small tolerance avoids an extra replica due to rounding errors when the width is exactly twice the cutoff
+    return np.maximum(np.ceil(2 * cutoff / widths - 1e-8), 1).astype(int)
+
+
+def get_unit_cells(frameworks, cutoff):
+    """Compute the minimal `UnitCells` of several frameworks at once.
+
+    :param frameworks: dictionary of `CifData` nodes
+    :param cutoff: cutoff (Angstrom)
+    :returns: dictionary with the same keys and the `UnitCells` strings, e.g. "2 2 3"
+    """
+    names = list(frameworks)
+    if not names:
+        return {}
+    cells = cell_from_parameters([get_cell_parameters(frameworks[name]) for name in names])
+    unit_cells = compute_unit_cells(cells, cutoff)
+    return {name: " ".join(str(n) for n in replicas) for name, replicas in zip(names, unit_cells)}
+
+
+def check_unit_cells(parameters, frameworks):
+    """Fill in the missing `UnitCells` of the frameworks and check the ones that are given.
+
+    The frameworks without `UnitCells` get the minimal number of unit cells for the cutoff, rather than the single unit
+    cell RASPA would use. Given `UnitCells` are never changed: if they are too few, a warning is returned.
+
+    :param parameters: dictionary with the RASPA parameters, modified in place
+    :param frameworks: dictionary of the `CifData` frameworks, keyed by framework name
+    :returns: list of warnings about the frameworks with too few unit cells
+    """
+    frameworks = {
+        name: frameworks[name]
+        for name, system in parameters["System"].items()
+        if system["type"] == "Framework" and name in frameworks
+    }
+    warnings = []
+    for name, unit_cells in get_unit_cells(frameworks, get_cutoff(parameters)).items():
+        system = parameters["System"][name]
+        if "UnitCells" not in system:
+            system["UnitCells"] = unit_cells
+            continue
+        given = system["UnitCells"].split() if isinstance(system["UnitCells"], str) else system["UnitCells"]
+        if any(int(n_given) < int(n_min) for n_given, n_min in zip(given, unit_cells.split())):
+            warnings.append(
+                f"The framework '{name}' uses {' '.join(str(n) for n in given)} unit cells, but at least {unit_cells} "
+                "are needed for the cutoff."
+            )
+    return warnings
@@ -0,0 +1,200 @@
+"""Estimate the walltime of RASPA calculations from the timings of previous ones."""
+import numpy as np
+from aiida.orm import CalcJobNode, Dict, QueryBuilder, RemoteData
+
+from .import_tools import IMPORTED_RUN_EXTRA
+from .structure_tools import get_cutoff, get_unit_cells
+
+CYCLE_KEYS = ("NumberOfCycles", "NumberOfInitializationCycles", "NumberOfEquilibrationCycles")
+
+# headers of the periodic output of the phases of a simulation, in the order they are run
+PHASE_HEADERS = (
+    ("[Init] Current cycle:", "NumberOfInitializationCycles"),
+    ("[Equilibration] Current cycle:", "NumberOfEquilibrationCycles"),
+    ("Current cycle:", "NumberOfCycles"),
+)
+
+
+def get_number_of_cycles(parameters):
+    """Return the total number of cycles of a RASPA simulation."""
+    return sum(int(parameters["GeneralSettings"].get(key, 0)) for key in CYCLE_KEYS)
+
+
+def parse_cycle_progress(output_contents, parameters):
+    """Return the progress of a RASPA run from the cycles printed in its output.
+
+    The cycles are counted over the initialization, equilibration and production phases. A run continued from a
+    binary restart file starts from the last cycle at which the file was written, every `WriteBinaryRestartFileEvery`
+    cycles of a phase.
+
+    :param output_contents: the output of the run, which can be incomplete
+    :param parameters: dictionary with the RASPA parameters of the run
+    :returns: tuple of the first and the last cycle printed by the run and of the cycle a continuation would start
+        from, (None, None, 0) if no cycle was printed
+    """
+    general_settings = parameters["GeneralSettings"]
+    write_every = int(general_settings.get("WriteBinaryRestartFileEvery", 0))
+    first, last, restart = None, None, 0
+    offset = 0
+    for header, key in PHASE_HEADERS:
+        for line in output_contents.splitlines():
+            if line.startswith(header):
+                cycle = int(line[len(header) :].split()[0])
+                first = offset + cycle if first is None else first
+                last = offset + cycle
+                restart = offset + cycle // write_every * write_every if write_every > 0 else 0
+        offset += int(general_settings.get(key, 0))
+    return first, last, restart
+
+
+def estimate_remaining_walltime(output_contents, parameters, walltime, safety_factor=1.2):
+    """Estimate the walltime needed to finish a RASPA run that was stopped after `walltime` seconds.
+
+    The time per cycle is the `walltime` divided by the number of cycles printed in the output, such that the start up
+    of the run is included. The remaining cycles are counted from the cycle the continuation starts from.
+
+    :returns: the walltime in seconds, None if fewer than two cycles were printed
+    """
+    first, last, restart = parse_cycle_progress(output_contents, parameters)
+    if first is None or last <= first:
+        return None
+    seconds_per_cycle = walltime / (last - first)
+    return int(np.ceil(safety_factor * seconds_per_cycle * (get_number_of_cycles(parameters) - restart)))
+
+
+def get_walltime_features(parameters, number_of_framework_atoms):
+    """Return the features the cost of a cycle is estimated from.
+
+    :param parameters: dictionary with the RASPA parameters
+    :param number_of_framework_atoms: number of framework atoms in the simulation cell(s)
+    :returns: list of features: constant, log(framework atoms), log(cutoff), charges, log(components)
+    """
+    charges = str(parameters["GeneralSettings"].get("ChargeMethod", "Ewald")).lower() != "none"
+    return [
+        1.0,
+        np.log1p(number_of_framework_atoms),
+        np.log(get_cutoff(parameters)),
+        float(charges),
+        np.log(max(len(parameters["Component"]), 1)),
+    ]
+
+
+def get_number_of_framework_atoms(parameters, frameworks):
+    """Return the number of framework atoms of the simulation cell(s) of a new calculation.
+
+    :param parameters: dictionary with the RASPA parameters, the missing `UnitCells` are computed from the cutoff
+    :param frameworks: dictionary of the `CifData` frameworks, keyed by framework name
+    """
+    names = [name for name, system in parameters["System"].items() if system["type"] == "Framework"]
+    minimal_unit_cells = get_unit_cells({name: frameworks[name] for name in names}, get_cutoff(parameters))
+    natoms = 0
+    for name in names:
+        unit_cells = parameters["System"][name].get("UnitCells", minimal_unit_cells[name])
+        if isinstance(unit_cells, str):
+            unit_cells = unit_cells.split()
+        natoms += len(frameworks[name].get_ase()) * int(np.prod([int(n) for n in unit_cells]))
+    return natoms
+
+
+class WalltimeEstimator:
+    """Estimate the walltime of RASPA calculations.
+
+    The CPU time per cycle is fitted with a log-linear model of the number of framework atoms, the cutoff, the use
+    of charges and the number of components. The estimated walltime is the upper bound of the prediction interval,
+    `nsigma` standard deviations of the residuals above the prediction, times `safety_factor`.
+    """
+
+    def __init__(self, safety_factor=1.2, nsigma=2.0, min_walltime=300, max_walltime=None):
+        """Create an estimator that still has to be fitted.
+
+        :param safety_factor: factor applied to the upper bound of the prediction interval
+        :param nsigma: width of the prediction interval, in standard deviations of the residuals
+        :param min_walltime: minimum walltime in seconds
+        :param max_walltime: maximum walltime in seconds, e.g. the limit of the queue
+        """
+        self.safety_factor = safety_factor
+        self.nsigma = nsigma
+        self.min_walltime = min_walltime
+        self.max_walltime = max_walltime
+        self.coefficients = None
+        self.residual_std = None
+
+    def fit(self, features, seconds_per_cycle):
+        """Fit the model to the features and the CPU time per cycle of previous calculations.
+
+        :raises ValueError: if there are not enough calculations to fit the model
+        """
+        features = np.asarray(features, dtype=float)
+        targets = np.log(np.asarray(seconds_per_cycle, dtype=float))
+        if features.ndim != 2 or len(features) <= features.shape[1]:
+            raise ValueError(f"At least {features.shape[-1] + 1} calculations are needed to fit the walltime model.")
+
+        self.coefficients = np.linalg.lstsq(features, targets, rcond=None)[0]
+        residuals = targets - features @ self.coefficients
+        self.residual_std = float(np.sqrt(np.sum(residuals**2) / (len(targets) - features.shape[1])))
+        return self
+
+    def fit_calculations(self, limit=1000):
+        """Fit the model to the most recent successful `RaspaCalculation`s.
+
+        Only the calculations that ran all their cycles from the start are used: the continuations of a calculation
+        that timed out, the simulations stopped early by the convergence monitor and the imported runs are skipped.
+
+        :param limit: maximum number of calculations used for the fit
+        :raises ValueError: if there are not enough calculations to fit the model
+        """
+        # the continuations after a crash only run the cycles left over by their parent
+        continuations = QueryBuilder()
+        continuations.append(RemoteData, tag="parent_folder")
+        continuations.append(
+            CalcJobNode, with_incoming="parent_folder", edge_filters={"label": "parent_folder"}, project="id"
+        )
+        continued = set(continuations.all(flat=True))
+
+        query = QueryBuilder()
+        query.append(
+            CalcJobNode,
+            filters={
+                "process_type": "aiida.calculations:raspa",
+                "attributes.exit_status": 0,
+                "extras": {"!has_key": IMPORTED_RUN_EXTRA},
+            },
+            tag="calc",
+            project="id",
+        )
+        query.append(Dict, with_outgoing="calc", edge_filters={"label": "parameters"}, project="attributes")
+        query.append(Dict, with_incoming="calc", edge_filters={"label": "output_parameters"}, project="attributes")
+        query.order_by({"calc": {"ctime": "desc"}})
+        query.limit(limit)
+
+        features = []
+        seconds_per_cycle = []
+        for pk, parameters, output_parameters in query.iterall():
+            systems = [result["general"] for result in output_parameters.values() if isinstance(result, dict)]
+            if pk in continued or any(system.get("stopped_early") for system in systems):
+                continue
+            cycles = get_number_of_cycles(parameters)
+            cpu_time = max((system.get("cpu_time_total") or 0 for system in systems), default=0)
+            if not cycles or not cpu_time:
+                continue  # calculations parsed before the CPU timings were stored
+            natoms = sum(system.get("number_of_framework_atoms", 0) for system in systems)
+            features.append(get_walltime_features(parameters, natoms))
+            seconds_per_cycle.append(cpu_time / cycles)
+
+        return self.fit(features, seconds_per_cycle)
+
+    def estimate(self, parameters, frameworks):
+        """Estimate the walltime (in seconds) of a new calculation.
+
+        :param parameters: dictionary with the RASPA parameters
+        :param frameworks: dictionary of the `CifData` frameworks, keyed by framework name
+        :raises RuntimeError: if the model was not fitted
+        """
+        if self.coefficients is None:
+            raise RuntimeError("The walltime model has to be fitted before estimating walltimes.")
+        features = get_walltime_features(parameters, get_number_of_framework_atoms(parameters, frameworks))
+        seconds_per_cycle = np.exp(np.dot(features, self.coefficients) + self.nsigma * self.residual_std)
+        walltime = max(self.safety_factor * seconds_per_cycle * get_number_of_cycles(parameters), self.min_walltime)
+        if self.max_walltime is not None:
+            walltime = min(walltime, self.max_walltime)
+        return int(np.ceil(walltime))
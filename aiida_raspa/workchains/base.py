@@ -1,19 +1,38 @@
 """Base work chain to run a RASPA calculation"""
+from pathlib import Path
 
 from aiida.common import AttributeDict
 from aiida.engine import (
     BaseRestartWorkChain,
     ProcessHandlerReport,
+    ToContext,
+    if_,
     process_handler,
     while_,
 )
-from aiida.orm import Float, Int, Str
+from aiida.orm import Bool, Dict, Float, Int, List, Str, load_node
 from aiida.plugins import CalculationFactory
 
 from aiida_raspa.utils import (
+    STAGE_LOG,
+    WalltimeEstimator,
+    add_block_pocket_file_names,
     add_write_binary_restart,
+    detect_equilibration,
+    estimate_remaining_walltime,
+    estimate_required_cycles,
+    find_cached_grids,
+    get_block_pockets,
+    get_collapsed_swaps,
+    get_normalized_cif,
+    get_remaining_stages,
     increase_box_lenght,
+    merge_production_results,
+    merge_production_segments,
     modify_number_of_cycles,
+    parse_stage_log,
+    switch_to_cbcf_swap_moves,
+    tune_move_probabilities,
 )
 
 RaspaCalculation = CalculationFactory("raspa")  # pylint: disable=invalid-name
@@ -24,12 +43,119 @@ class RaspaBaseWorkChain(BaseRestartWorkChain):
 
     _process_class = RaspaCalculation
 
+    # handlers that continue the simulation from the retrieved `Restart` folder
+    _restart_handlers = ("check_widom_convergence", "check_gcmc_convergence", "check_gemc_convergence")
+
+    # settings of the convergence handlers
+    _convergence_defaults = {
+        "relative_error": 0.1,  # target relative error of the checked averages
+        "safety_factor": 1.2,  # factor applied to the estimated number of cycles
+        "min_cycles": 1000,  # minimum number of production cycles of a continuation
+        "max_cycles": 100000,  # maximum number of production cycles of a continuation
+        "monitor_interval": 600,  # minimum time in seconds between two checks of the convergence monitor
+        "min_samples": 25,  # minimum number of printed loadings before the convergence monitor stops a calculation
+    }
+
+    # minimum fraction of the tuned probability of every move
+    _min_move_fraction = 0.05
+
+    # acceptance ratio below which the swap moves are replaced, and the tried swap moves needed to measure it
+    _min_swap_acceptance = 0.01
+    _min_swap_attempts = 1000
+
+    # number of values of the loadings and the energy printed by a pilot calculation that detects the equilibration
+    _pilot_samples = 250
+
+    # settings of the walltime estimates
+    _walltime_defaults = {
+        "safety_factor": 1.2,  # factor applied to the estimated walltime
+        "min_walltime": 300,  # minimum walltime in seconds
+        "max_walltime": None,  # maximum walltime in seconds allowed by the queue
+    }
+
     @classmethod
     def define(cls, spec):
         super().define(spec)
         spec.expose_inputs(RaspaCalculation, namespace="raspa")
+        spec.input(
+            "estimate_walltime",
+            valid_type=Bool,
+            default=lambda: Bool(False),
+            help="Set `max_wallclock_seconds` from the timings of previous RASPA calculations.",
+        )
+        spec.input(
+            "walltime_settings",
+            valid_type=Dict,
+            required=False,
+            validator=cls.validate_walltime_settings,
+            help="Settings of the walltime estimates: the `safety_factor` applied to the estimates and the "
+            "`min_walltime` and `max_walltime` in seconds, the latter being the limit of the queue.",
+        )
+        spec.input(
+            "normalize_frameworks",
+            valid_type=Bool,
+            default=lambda: Bool(False),
+            help="Convert the frameworks once into P1 CIF files, which the calculations use instead of the original "
+            "CIF files.",
+        )
+        spec.input(
+            "convergence_settings",
+            valid_type=Dict,
+            required=False,
+            validator=cls.validate_convergence_settings,
+            help="Settings of the convergence handlers: the target `relative_error` of the averages, the "
+            "`safety_factor` applied to the estimated number of cycles and the `min_cycles` and `max_cycles` of a "
+            "continuation, and the `monitor_interval` and `min_samples` (number of printed loadings) of the "
+            "convergence monitor.",
+        )
+        spec.input(
+            "monitor_convergence",
+            valid_type=Bool,
+            default=lambda: Bool(False),
+            help="Follow the loadings of the running calculations and stop them once the loadings reached the target "
+            "`relative_error` of the `convergence_settings`.",
+        )
+        spec.input(
+            "merge_production",
+            valid_type=Bool,
+            default=lambda: Bool(False),
+            help="Merge the averages of the production segments run by the convergence handlers, weighted by their "
+            "number of cycles, instead of keeping only the ones of the last calculation.",
+        )
+        spec.input(
+            "block_pocket_probe_radius",
+            valid_type=(Float, Dict),
+            required=False,
+            help="Probe radius (or dictionary of radii keyed by component) of the registered block pocket files to "
+            "use for the components that do not define `BlockPocketsFileName`. Components missing from the dictionary "
+            "are left without block pockets.",
+        )
+        spec.input(
+            "tune_moves",
+            valid_type=Bool,
+            default=lambda: Bool(False),
+            help="Run a short pilot calculation and rebalance the move probabilities of the components from the "
+            "acceptance and the CPU time of their moves.",
+        )
+        spec.input(
+            "detect_equilibration",
+            valid_type=Bool,
+            default=lambda: Bool(False),
+            help="Run a pilot calculation without initialization cycles, detect when its loadings and energy are "
+            "equilibrated and continue the production from its final configuration.",
+        )
+        spec.input(
+            "pilot_cycles",
+            valid_type=Int,
+            default=lambda: Int(500),
+            help="Number of production cycles of the pilot calculation.",
+        )
         spec.outline(
             cls.setup,
+            if_(cls.should_run_pilot)(
+                cls.run_pilot,
+                cls.inspect_pilot,
+            ),
             while_(cls.should_run_process)(
                 cls.run_process,
                 cls.inspect_process,
@@ -38,6 +164,35 @@ class RaspaBaseWorkChain(BaseRestartWorkChain):
         )
         spec.expose_outputs(RaspaCalculation)
 
+    @classmethod
+    def validate_convergence_settings(cls, value, _):
+        """Validate the `convergence_settings` input."""
+        settings = value.get_dict()
+        unknown = set(settings) - set(cls._convergence_defaults)
+        if unknown:
+            return f"Unknown convergence settings: {', '.join(sorted(unknown))}."
+        settings = dict(cls._convergence_defaults, **settings)
+        if settings["relative_error"] <= 0 or settings["safety_factor"] <= 0:
+            return "The `relative_error` and the `safety_factor` should be positive."
+        if not 0 < settings["min_cycles"] <= settings["max_cycles"]:
+            return "The `min_cycles` should be positive and not larger than `max_cycles`."
+        for key in ("monitor_interval", "min_samples"):
+            if not isinstance(settings[key], int) or settings[key] <= 0:
+                return f"The `{key}` should be a positive integer."
+
+    @classmethod
+    def validate_walltime_settings(cls, value, _):
+        """Validate the `walltime_settings` input."""
+        settings = value.get_dict()
+        unknown = set(settings) - set(cls._walltime_defaults)
+        if unknown:
+            return f"Unknown walltime settings: {', '.join(sorted(unknown))}."
+        settings = dict(cls._walltime_defaults, **settings)
+        if settings["safety_factor"] <= 0 or settings["min_walltime"] <= 0:
+            return "The `safety_factor` and the `min_walltime` should be positive."
+        if settings["max_walltime"] is not None and settings["max_walltime"] < settings["min_walltime"]:
+            return "The `max_walltime` should not be smaller than the `min_walltime`."
+
     def setup(self):
         """Call the `setup` of the `BaseRestartWorkChain` and then create the inputs dictionary in `self.ctx.inputs`.
         This `self.ctx.inputs` dictionary will be used by the `BaseRestartWorkChain` to submit the calculations in the
@@ -45,10 +200,261 @@ class RaspaBaseWorkChain(BaseRestartWorkChain):
 
         super().setup()
 
+        # calculations whose production was continued by a convergence handler
+        self.ctx.production_segments = []
         self.ctx.inputs = AttributeDict(self.exposed_inputs(RaspaCalculation, "raspa"))
         if "WriteBinaryRestartFileEvery" not in self.ctx.inputs.parameters["GeneralSettings"]:
             self.ctx.inputs.parameters = add_write_binary_restart(self.ctx.inputs.parameters, Int(1000))
 
+        # Use the energy grids generated by a previous MakeGrid calculation on the same computer, if any
+        if self._use_tabular_grid(self.ctx.inputs.parameters.get_dict()) and "grids" not in self.ctx.inputs:
+            grids = find_cached_grids(
+                self.ctx.inputs.parameters.get_dict(),
+                self.ctx.inputs.get("framework", {}),
+                self.ctx.inputs.code.computer,
+                self.ctx.inputs.get("file", {}),
+            )
+            if grids:
+                self.report(f"Using the cached energy grids of: {', '.join(sorted(grids))}")
+                self.ctx.inputs.grids = grids
+
+        # Use the registered block pocket files of the frameworks
+        if "block_pocket_probe_radius" in self.inputs:
+            self._add_block_pockets()
+
+        # Expand the symmetry of the frameworks once, the calculations then read the P1 CIF files. This comes after
+        # the look-ups of the grids and block pockets, which are registered for the original frameworks.
+        if self.inputs.normalize_frameworks and "framework" in self.ctx.inputs:
+            self.ctx.inputs.framework = {
+                name: get_normalized_cif(framework) for name, framework in self.ctx.inputs.framework.items()
+            }
+
+        # Estimate the walltime from the previous calculations
+        if self.inputs.estimate_walltime:
+            self._estimate_walltime()
+
+        # Stop the calculations once their loadings are converged
+        if self.inputs.monitor_convergence:
+            settings = self._get_convergence_settings()
+            monitor = {
+                "entry_point": "raspa.convergence",
+                "kwargs": {"relative_error": settings["relative_error"], "min_samples": settings["min_samples"]},
+                "minimum_poll_interval": settings["monitor_interval"],
+            }
+            self.ctx.inputs.monitors = dict(self.ctx.inputs.get("monitors", {}), convergence=Dict(monitor))
+
+        # The convergence handlers restart from the retrieved `Restart` folder, make sure it is kept
+        if "settings" in self.ctx.inputs:
+            settings = self.ctx.inputs.settings.get_dict()
+            if not settings.get("retrieve_restart", not settings.get("retrieve_temporary_output", False)):
+                if any(self._is_handler_enabled(name) for name in self._restart_handlers):
+                    settings["retrieve_restart"] = True
+                    self.ctx.inputs.settings = Dict(settings)
+
+    def should_run_pilot(self):
+        """Return whether a pilot calculation is run before the production."""
+        return self.inputs.tune_moves.value or self.inputs.detect_equilibration.value
+
+    def run_pilot(self):
+        """Run a short calculation with the inputs of the production, the averages are not used."""
+        inputs = AttributeDict(self.ctx.inputs)
+        inputs.pop("monitors", None)
+        parameters = self.ctx.inputs.parameters.get_dict()
+        parameters["GeneralSettings"]["NumberOfCycles"] = self.inputs.pilot_cycles.value
+        if self.inputs.detect_equilibration:
+            # the equilibration is detected on the values printed from the start of the simulation
+            parameters["GeneralSettings"]["NumberOfInitializationCycles"] = 0
+            parameters["GeneralSettings"]["PrintEvery"] = max(self.inputs.pilot_cycles.value // self._pilot_samples, 1)
+        inputs.parameters = Dict(parameters)
+        if "settings" in inputs:
+            settings = inputs.settings.get_dict()
+            for key in ("replicas", "stages", "retrieve_temporary_output", "retrieve_restart"):
+                settings.pop(key, None)
+            inputs.settings = Dict(settings)
+        inputs.metadata = dict(inputs.get("metadata", {}), call_link_label="pilot")
+
+        node = self.submit(RaspaCalculation, **inputs)
+        self.report(f"launching pilot {node.process_label}<{node.pk}>")
+        return ToContext(pilot=node)
+
+    def inspect_pilot(self):
+        """Tune the move probabilities and set the equilibration of the production from the pilot calculation."""
+        pilot = self.ctx.pilot
+        if not pilot.is_finished_ok:
+            self.report(f"The pilot {pilot.process_label}<{pilot.pk}> failed, the production inputs are not changed.")
+            return
+        if self.inputs.tune_moves:
+            self._tune_moves(pilot)
+        if self.inputs.detect_equilibration:
+            self._continue_equilibrated(pilot)
+
+    def _tune_moves(self, pilot):
+        """Tune the move probabilities of the production on the move statistics of the pilot calculation."""
+        self.ctx.inputs.parameters = tune_move_probabilities(
+            self.ctx.inputs.parameters, pilot.outputs.output_parameters, Float(self._min_move_fraction)
+        )
+        tuned = {
+            name: {keyword: value for keyword, value in component.items() if keyword.endswith("Probability")}
+            for name, component in self.ctx.inputs.parameters["Component"].items()
+        }
+        self.report(f"Tuned move probabilities: {tuned}")
+
+    def _continue_equilibrated(self, pilot):
+        """Continue the production from the final configuration of the pilot calculation if it is equilibrated.
+
+        The cycles of the pilot until the equilibration replace the initialization cycles of the production.
+        """
+        retrieved = pilot.outputs.retrieved.base.repository
+        equilibrations = []
+        for system_id in range(len(self.ctx.inputs.parameters["System"])):
+            output_dir = Path(RaspaCalculation.OUTPUT_FOLDER, f"System_{system_id}")
+            output_contents = retrieved.get_object_content(output_dir / retrieved.list_object_names(output_dir)[0])
+            equilibrations.append(detect_equilibration(output_contents))
+        if any(equilibration is None for equilibration in equilibrations):
+            self.report(
+                f"The pilot did not equilibrate within {self.inputs.pilot_cycles.value} cycles, the "
+                "initialization cycles of the production are not changed."
+            )
+            return
+
+        self.report(
+            f"The pilot equilibrated after {max(equilibrations)} cycles, the production continues from its final "
+            "configuration without initialization cycles."
+        )
+        self.ctx.inputs.retrieved_parent_folder = pilot.outputs.retrieved
+        init_cycles = int(self.ctx.inputs.parameters["GeneralSettings"].get("NumberOfInitializationCycles", 0))
+        self.ctx.inputs.parameters = modify_number_of_cycles(
+            self.ctx.inputs.parameters, additional_init_cycle=Int(-init_cycles), additional_prod_cycle=Int(0)
+        )
+
+    def _add_block_pockets(self):
+        """Add the registered block pocket files to the inputs and set the `BlockPocketsFileName` of the components."""
+        probe_radius = self.inputs.block_pocket_probe_radius
+        probe_radius = probe_radius.get_dict() if isinstance(probe_radius, Dict) else probe_radius.value
+        file_names, block_pockets = get_block_pockets(
+            self.ctx.inputs.parameters.get_dict(), self.ctx.inputs.get("framework", {}), probe_radius
+        )
+        if not block_pockets:
+            self.report("No registered block pocket file was found, the pockets are not blocked.")
+            return
+        self.report(f"Using the registered block pocket files: {', '.join(sorted(block_pockets))}")
+        self.ctx.inputs.block_pocket = dict(self.ctx.inputs.get("block_pocket", {}), **block_pockets)
+        self.ctx.inputs.parameters = add_block_pocket_file_names(self.ctx.inputs.parameters, Dict(file_names))
+
+    def _estimate_walltime(self):
+        """Set the walltime of the calculations to the estimate of the `WalltimeEstimator`."""
+        try:
+            estimator = WalltimeEstimator(**self._get_walltime_settings()).fit_calculations()
+        except ValueError as err:
+            self.report(f"The walltime is not estimated: {err}")
+            return
+        walltime = estimator.estimate(self.ctx.inputs.parameters.get_dict(), self.ctx.inputs.get("framework", {}))
+        self.report(f"Estimated walltime: {walltime} s")
+        self.ctx.inputs.setdefault("metadata", {}).setdefault("options", {})["max_wallclock_seconds"] = walltime
+
+    @staticmethod
+    def _use_tabular_grid(parameters):
+        """Return True if the parameters ask for precomputed energy grids."""
+        use_tabular_grid = parameters["GeneralSettings"].get("UseTabularGrid", False)
+        return use_tabular_grid is True or str(use_tabular_grid).lower() == "yes"
+
+    def _is_handler_enabled(self, name):
+        """Return whether the process handler `name` is enabled for this work chain."""
+        overrides = self.inputs.handler_overrides.get_dict() if "handler_overrides" in self.inputs else {}
+        override = overrides.get(name, {})
+        if isinstance(override, bool):
+            return override
+        return override.get("enabled", getattr(self, name).enabled)
+
+    def _get_walltime_settings(self):
+        """Return the settings of the walltime estimates."""
+        settings = self.inputs.walltime_settings.get_dict() if "walltime_settings" in self.inputs else {}
+        return dict(self._walltime_defaults, **settings)
+
+    def _get_convergence_settings(self):
+        """Return the settings of the convergence handlers."""
+        settings = self.inputs.convergence_settings.get_dict() if "convergence_settings" in self.inputs else {}
+        return dict(self._convergence_defaults, **settings)
+
+    @staticmethod
+    def _get_relative_error(average, dev):
+        """Return the relative error of an average, None if it is unknown."""
+        if not average or dev is None:
+            return None
+        return abs(dev / average)
+
+    def _is_converged(self, errors):
+        """Check whether all the relative `errors` reached the target."""
+        target = self._get_convergence_settings()["relative_error"]
+        return all(error is not None and error <= target for error in errors)
+
+    @staticmethod
+    def _get_production_cycles(calculation):
+        """Return the number of production cycles completed by `calculation`."""
+        output_parameters = calculation.outputs.output_parameters.get_dict()
+        general = next(iter(output_parameters.values()))["general"]
+        if general.get("stopped_early", False):
+            return general["number_of_cycles_completed"]
+        return int(calculation.inputs.parameters["GeneralSettings"]["NumberOfCycles"])
+
+    def _get_production_results(self, calculation):
+        """Return the output parameters of `calculation`, merged with the previous production segments if requested."""
+        output_parameters = calculation.outputs.output_parameters.get_dict()
+        if not self.inputs.merge_production or not self.ctx.production_segments:
+            return output_parameters
+        segments = [load_node(pk) for pk in self.ctx.production_segments]
+        return merge_production_segments(
+            [segment.outputs.output_parameters.get_dict() for segment in segments] + [output_parameters],
+            [self._get_production_cycles(segment) for segment in segments] + [self._get_production_cycles(calculation)],
+        )
+
+    def _extend_production(self, calculation, errors, additional_init_cycle):
+        """Set the production cycles of the next calculation such that the largest relative error reaches the target.
+
+        The error decreases as 1/sqrt(N), the number of cycles is estimated from the error of `calculation`, or from
+        the merged error of all the production segments if `merge_production` is set. The production is doubled if an
+        error is unknown, e.g. for a component that did not adsorb.
+        """
+        settings = self._get_convergence_settings()
+        # the cycles sampled so far, which the next calculation does not repeat if the segments are merged
+        sampled = self._get_production_cycles(calculation)
+        merged = 0
+        if self.inputs.merge_production:
+            sampled += sum(self._get_production_cycles(load_node(pk)) for pk in self.ctx.production_segments)
+            merged = sampled
+            self.ctx.production_segments.append(calculation.pk)
+        if any(error is None for error in errors):
+            required = 2 * sampled - merged
+        else:
+            required = (
+                estimate_required_cycles(sampled, max(errors), settings["relative_error"], settings["safety_factor"])
+                - merged
+            )
+        required = min(max(required, settings["min_cycles"]), settings["max_cycles"])
+        self.report(
+            f"Continuing with {required} production cycles to reach a relative error of "
+            f"{settings['relative_error']}."
+        )
+
+        current = int(self.ctx.inputs.parameters["GeneralSettings"]["NumberOfCycles"])
+        self.ctx.inputs.parameters = modify_number_of_cycles(
+            self.ctx.inputs.parameters,
+            additional_init_cycle=Int(additional_init_cycle),
+            additional_prod_cycle=Int(required - current),
+        )
+
+    def get_outputs(self, node):
+        """Return the outputs of the last calculation, with the merged averages of all the production segments if
+        `merge_production` is set."""
+        outputs = super().get_outputs(node)
+        if self.inputs.merge_production and self.ctx.production_segments and "output_parameters" in outputs:
+            segments = [load_node(pk) for pk in self.ctx.production_segments] + [node]
+            outputs["output_parameters"] = merge_production_results(
+                List([self._get_production_cycles(segment) for segment in segments]),
+                **{f"segment_{index}": segment.outputs.output_parameters for index, segment in enumerate(segments)},
+            )
+        return outputs
+
     def report_error_handled(self, calculation, action):
         """Report an action taken for a calculation that has failed.
         This should be called in a registered error handler if its condition is met and an action was taken.
@@ -64,36 +470,116 @@ class RaspaBaseWorkChain(BaseRestartWorkChain):
         """Error handler that restarts calculation finished with TIMEOUT ExitCode."""
         self.report_error_handled(calculation, "Timeout handler. Adding remote folder as input to use binary restart.")
         self.ctx.inputs.parent_folder = calculation.outputs.remote_folder
+
+        # the stages that finished are not run again, the interrupted one continues from the binary restart or, if
+        # none was written yet, from the restart of the last finished stage
+        settings = self.ctx.inputs.settings.get_dict() if "settings" in self.ctx.inputs else {}
+        if "stages" in settings:
+            retrieved = calculation.outputs.retrieved.base.repository
+            finished = []
+            if STAGE_LOG in retrieved.list_object_names():
+                finished = parse_stage_log(retrieved.get_object_content(STAGE_LOG))
+            settings["stages"] = get_remaining_stages(
+                self.ctx.inputs.parameters.get_dict(), settings["stages"], finished
+            )
+            self.ctx.inputs.settings = Dict(settings)
+            if finished:
+                if RaspaCalculation.validate_retrieved_parent_folder(calculation.outputs.retrieved, None) is None:
+                    self.ctx.inputs.retrieved_parent_folder = calculation.outputs.retrieved
+                else:
+                    self.report("The restart of the finished stages was not retrieved.")
+        else:
+            # the remaining cycles are known for a single simulation, but not for the stages that follow
+            self._adapt_walltime(calculation)
         return ProcessHandlerReport(False)
 
+    def _adapt_walltime(self, calculation):
+        """Set the walltime of the continuation of a `calculation` that timed out such that it can finish.
+
+        The time per cycle is measured on the output of `calculation`. If the remaining cycles do not fit in the
+        `max_walltime` of the queue, the continuation runs for the `max_walltime` and is continued again.
+        """
+        walltime = calculation.get_option("max_wallclock_seconds")
+        retrieved = calculation.outputs.retrieved.base.repository
+        settings = calculation.inputs.settings.get_dict() if "settings" in calculation.inputs else {}
+        replica_dir = calculation.process_class.get_replica_folders(settings.get("replicas", 1))[0]
+        output_dir = Path(replica_dir, calculation.process_class.OUTPUT_FOLDER, "System_0")
+        try:
+            output_file = output_dir / retrieved.list_object_names(output_dir)[0]
+        except (FileNotFoundError, IndexError):
+            output_file = None
+        if walltime is None or output_file is None:
+            self.report("The walltime is not adapted: the walltime or the output of the calculation is unknown.")
+            return
+
+        walltime_settings = self._get_walltime_settings()
+        required = estimate_remaining_walltime(
+            retrieved.get_object_content(output_file),
+            calculation.inputs.parameters.get_dict(),
+            walltime,
+            walltime_settings["safety_factor"],
+        )
+        if required is None:
+            required = 2 * walltime
+        required = max(required, walltime_settings["min_walltime"])
+        if walltime_settings["max_walltime"] is not None and required > walltime_settings["max_walltime"]:
+            self.report(
+                f"The remaining cycles need about {required} s, more than the `max_walltime`: the simulation "
+                "continues in several calculations."
+            )
+            required = walltime_settings["max_walltime"]
+        self.report(f"Continuing with a walltime of {required} s.")
+        self.ctx.inputs.setdefault("metadata", {}).setdefault("options", {})["max_wallclock_seconds"] = required
+
+    @process_handler(priority=420, enabled=True)
+    def check_swap_acceptance(self, calculation):
+        """Checks whether the swap moves of a calculation are still accepted. At high loadings the insertions hardly
+        ever succeed, the calculation is repeated with CB/CFCMC swap moves for the components concerned."""
+
+        if "output_parameters" not in calculation.outputs:
+            return None
+        collapsed = get_collapsed_swaps(
+            calculation.inputs.parameters.get_dict(),
+            calculation.outputs.output_parameters.get_dict(),
+            self._min_swap_acceptance,
+            self._min_swap_attempts,
+        )
+        if not collapsed:
+            return None
+
+        self.report(
+            f"The acceptance of the swap moves of {', '.join(collapsed)} is below {self._min_swap_acceptance}: "
+            "repeating with CB/CFCMC swap moves..."
+        )
+        self.ctx.inputs.parameters = switch_to_cbcf_swap_moves(self.ctx.inputs.parameters, List(collapsed))
+
+        # the production is repeated from the last configuration if it was retrieved, and is not merged
+        if RaspaCalculation.validate_retrieved_parent_folder(calculation.outputs.retrieved, None) is None:
+            self.ctx.inputs.retrieved_parent_folder = calculation.outputs.retrieved
+            self.ctx.inputs.parameters = modify_number_of_cycles(
+                self.ctx.inputs.parameters, additional_init_cycle=Int(0), additional_prod_cycle=Int(0)
+            )
+        self.ctx.production_segments = []
+        return ProcessHandlerReport(True)
+
     @process_handler(priority=400, enabled=False)
     def check_widom_convergence(self, calculation):
         """Checks whether a Widom particle insertion is converged. The check is based on the
         error bar of the Henry coefficient."""
 
-        conv_threshold = 0.1
-        additional_cycle = 2000
-
-        output_widom = calculation.outputs.output_parameters.get_dict()
+        output_widom = self._get_production_results(calculation)
         structure_label = list(calculation.get_incoming().nested()["framework"].keys())[0]
-        conv_stat = []
+        errors = []
 
         for comp in calculation.inputs.parameters["Component"]:
             kh_average_comp = output_widom[structure_label]["components"][comp]["henry_coefficient_average"]
             kh_dev_comp = output_widom[structure_label]["components"][comp]["henry_coefficient_dev"]
+            errors.append(self._get_relative_error(kh_average_comp, kh_dev_comp))
 
-            error = round((kh_dev_comp / kh_average_comp), 2)
-            if error <= conv_threshold:
-                conv_stat.append(True)
-            else:
-                conv_stat.append(False)
-
-        if not all(conv_stat):
+        if not self._is_converged(errors):
             self.report("Widom particle insertion calculationulation is NOT converged: repeating with more trials...")
             self.ctx.inputs.retrieved_parent_folder = calculation.outputs["retrieved"]
-            self.ctx.inputs.parameters = modify_number_of_cycles(
-                self.ctx.inputs.parameters, additional_init_cycle=Int(0), additional_prod_cycle=Int(additional_cycle)
-            )
+            self._extend_production(calculation, errors, additional_init_cycle=0)
             return ProcessHandlerReport(False)
 
         return None
@@ -101,38 +587,22 @@ class RaspaBaseWorkChain(BaseRestartWorkChain):
     @process_handler(priority=410, enabled=False)
     def check_gcmc_convergence(self, calc):
         """Checks whether a GCMC calc is converged. Checking is based on the error bar on average loading."""
-        conv_threshold = 0.1
-        additional_init_cycle = 2000
-        additional_prod_cycle = 2000
-
-        output_gcmc = calc.outputs.output_parameters.get_dict()
+        output_gcmc = self._get_production_results(calc)
         structure_label = list(calc.get_incoming().nested()["framework"].keys())[0]
-        conv_stat = []
+        errors = []
 
         for comp in calc.inputs.parameters["Component"]:
             loading_average_comp = output_gcmc[structure_label]["components"][comp]["loading_absolute_average"]
             loading_dev_comp = output_gcmc[structure_label]["components"][comp]["loading_absolute_dev"]
 
-            # It can happen for weekly adsorbed species.
-            # we need to think about a better way to handle it.
+            # It can happen for weekly adsorbed species, the error is unknown and the production is doubled.
             # Currently, if it happens for five iterations, self will not continue.
-            if loading_average_comp == 0:
-                conv_stat.append(False)
-            else:
-                error = round((loading_dev_comp / loading_average_comp), 2)
-                if error <= conv_threshold:
-                    conv_stat.append(True)
-                else:
-                    conv_stat.append(False)
+            errors.append(self._get_relative_error(loading_average_comp, loading_dev_comp))
 
-        if not all(conv_stat):
+        if not self._is_converged(errors):
             self.report("GCMC calculation is NOT converged: continuing from restart...")
             self.ctx.inputs.retrieved_parent_folder = calc.outputs["retrieved"]
-            self.ctx.inputs.parameters = modify_number_of_cycles(
-                self.ctx.inputs.parameters,
-                additional_init_cycle=Int(additional_init_cycle),
-                additional_prod_cycle=Int(additional_prod_cycle),
-            )
+            self._extend_production(calc, errors, additional_init_cycle=2000)
             return ProcessHandlerReport(False)
 
         return None
@@ -142,12 +612,8 @@ class RaspaBaseWorkChain(BaseRestartWorkChain):
         """Checks whether a GEMC calc is converged. Checking is based on the error bar on average loading which is
         average number of molecules in each simulation box."""
 
-        conv_threshold = 0.1
-        additional_init_cycle = 2000
-        additional_prod_cycle = 2000
-
-        output_gemc = calc.outputs.output_parameters.get_dict()
-        conv_stat = []
+        output_gemc = self._get_production_results(calc)
+        errors = []
 
         for comp in calc.inputs.parameters["Component"]:
             molec_per_box1_comp_average = output_gemc["box_one"]["components"][comp]["loading_absolute_average"]
@@ -155,22 +621,13 @@ class RaspaBaseWorkChain(BaseRestartWorkChain):
             molec_per_box1_comp_dev = output_gemc["box_one"]["components"][comp]["loading_absolute_dev"]
             molec_per_box2_comp_dev = output_gemc["box_two"]["components"][comp]["loading_absolute_dev"]
 
-            error_box1 = round((molec_per_box1_comp_dev / molec_per_box1_comp_average), 2)
-            error_box2 = round((molec_per_box2_comp_dev / molec_per_box2_comp_average), 2)
+            errors.append(self._get_relative_error(molec_per_box1_comp_average, molec_per_box1_comp_dev))
+            errors.append(self._get_relative_error(molec_per_box2_comp_average, molec_per_box2_comp_dev))
 
-            if (error_box1 <= conv_threshold) and (error_box2 <= conv_threshold):
-                conv_stat.append(True)
-            else:
-                conv_stat.append(False)
-
-        if not all(conv_stat):
+        if not self._is_converged(errors):
             self.report("GEMC calculation is NOT converged: continuing from restart...")
             self.ctx.inputs.retrieved_parent_folder = calc.outputs["retrieved"]
-            self.ctx.inputs.parameters = modify_number_of_cycles(
-                self.ctx.inputs.parameters,
-                additional_init_cycle=Int(additional_init_cycle),
-                additional_prod_cycle=Int(additional_prod_cycle),
-            )
+            self._extend_production(calc, errors, additional_init_cycle=2000)
             return ProcessHandlerReport(False)
 
         return None
@@ -1,6 +1,9 @@
 """
 For pytest initialise a test database and profile
 """
+import io
+import os
+
 import pytest
 
 pytest_plugins = ["aiida.manage.tests.pytest_fixtures"]  # pylint: disable=invalid-name
@@ -9,3 +12,61 @@ pytest_plugins = ["aiida.manage.tests.pytest_fixtures"]  # pylint: disable=inval
 @pytest.fixture(scope="function")
 def raspa_code(aiida_local_code_factory):  # pylint: disable=unused-argument
     return aiida_local_code_factory("raspa", "simulate")
+
+
+@pytest.fixture(scope="session")
+def read_output():
+    """Return a function that reads an output file of the tests, from `tests/outputs`."""
+
+    def reader(name):
+        with open(
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "outputs", name), encoding="utf-8"
+        ) as fobj:
+            return fobj.read()
+
+    return reader
+
+
+@pytest.fixture(scope="function")
+def fake_raspa_code(aiida_localhost):
+    """Return a RASPA code for the calculations that are only prepared, not run."""
+    from aiida.orm import InstalledCode
+
+    return InstalledCode(
+        label="fake_raspa",
+        computer=aiida_localhost,
+        filepath_executable="/usr/bin/simulate",
+        default_calc_job_plugin="raspa",
+    ).store()
+
+
+@pytest.fixture(scope="function")
+def generate_calc_job_node(aiida_localhost):
+    """Return a factory of stored calculation nodes with their inputs and `retrieved` folder, to test the parsers."""
+    from aiida.common import LinkType
+    from aiida.orm import CalcJobNode, FolderData
+
+    def link_inputs(node, inputs, namespace=""):
+        for label, value in inputs.items():
+            if isinstance(value, dict):
+                link_inputs(node, value, f"{namespace}{label}__")
+            else:
+                node.base.links.add_incoming(value.store(), LinkType.INPUT_CALC, f"{namespace}{label}")
+
+    def factory(entry_point, inputs, retrieved_files, options=None):
+        """Create a calculation of `entry_point` that retrieved `retrieved_files`, a dictionary of contents by path."""
+        node = CalcJobNode(computer=aiida_localhost, process_type=f"aiida.calculations:{entry_point}")
+        node.set_option("resources", {"num_machines": 1, "num_mpiprocs_per_machine": 1})
+        for key, value in (options or {}).items():
+            node.set_option(key, value)
+        link_inputs(node, inputs)
+        node.store()
+
+        retrieved = FolderData()
+        for path, contents in retrieved_files.items():
+            retrieved.base.repository.put_object_from_filelike(io.BytesIO(contents.encode("utf-8")), path)
+        retrieved.base.links.add_incoming(node, LinkType.CREATE, "retrieved")
+        retrieved.store()
+        return node
+
+    return factory
@@ -0,0 +1,108 @@
+"""Measure how many RASPA calculations are prepared per second."""
+import sys
+import time
+
+import click
+from aiida.common import NotExistent
+from aiida.engine import run
+from aiida.orm import Code, Dict
+from aiida.plugins import DataFactory
+from importlib_resources import files
+
+import aiida_raspa
+from aiida_raspa.utils import RaspaInput
+
+# data objects
+CifData = DataFactory("cif")  # pylint: disable=invalid-name
+
+PARAMETERS = {
+    "GeneralSettings": {
+        "SimulationType": "MonteCarlo",
+        "NumberOfCycles": 2000,
+        "NumberOfInitializationCycles": 2000,
+        "PrintEvery": 1000,
+        "Forcefield": "GenericMOFs",
+        "EwaldPrecision": 1e-6,
+        "CutOff": 12.0,
+    },
+    "System": {
+        "tcc1rs": {
+            "type": "Framework",
+            "UnitCells": "1 2 2",
+            "HeliumVoidFraction": 0.149,
+            "ExternalTemperature": 300.0,
+            "ExternalPressure": 5e5,
+        },
+    },
+    "Component": {
+        "methane": {
+            "MoleculeDefinition": "TraPPE",
+            "TranslationProbability": 0.5,
+            "ReinsertionProbability": 0.5,
+            "SwapProbability": 1.0,
+            "CreateNumberOfMolecules": 0,
+        },
+    },
+}
+
+
+def benchmark_render(number):
+    """Return the number of RASPA input files generated per second."""
+    start = time.perf_counter()
+    for _ in range(number):
+        RaspaInput(PARAMETERS).render()
+    return number / (time.perf_counter() - start)
+
+
+def benchmark_template(number):
+    """Return the number of RASPA input files generated per second from a compiled template, varying the pressure."""
+    start = time.perf_counter()
+    template = RaspaInput(PARAMETERS).compile([("System", "tcc1rs", "ExternalPressure")])
+    for pressure in range(number):
+        template.render(1e5 + pressure)
+    return number / (time.perf_counter() - start)
+
+
+def benchmark_dry_run(raspa_code, number):
+    """Return the number of RaspaCalculations prepared per second, running them as dry runs."""
+    framework = CifData(file=(files(aiida_raspa).parent / "examples" / "files" / "TCC1RS.cif").as_posix()).store()
+
+    start = time.perf_counter()
+    for pressure in range(number):
+        parameters = Dict(PARAMETERS)
+        parameters["System"]["tcc1rs"]["ExternalPressure"] = 1e5 + pressure
+        builder = raspa_code.get_builder()
+        builder.framework = {"tcc1rs": framework}
+        builder.parameters = parameters
+        builder.metadata.options = {
+            "resources": {
+                "num_machines": 1,
+                "num_mpiprocs_per_machine": 1,
+            },
+            "max_wallclock_seconds": 1 * 30 * 60,  # 30 min
+        }
+        builder.metadata.dry_run = True
+        builder.metadata.store_provenance = False
+        run(builder)
+    return number / (time.perf_counter() - start)
+
+
+@click.command("cli")
+@click.argument("codelabel")
+@click.option("--number", default=200, show_default=True, help="Number of calculations to prepare")
+def cli(codelabel, number):
+    """Click interface"""
+    try:
+        code = Code.get_from_string(codelabel)
+    except NotExistent:
+        print(f"The code '{codelabel}' does not exist")
+        sys.exit(1)
+    print(f"Input files rendered per second: {benchmark_render(100 * number):.0f}")
+    print(f"Input files rendered per second (compiled template): {benchmark_template(100 * number):.0f}")
+    print(f"Calculations prepared per second (dry run): {benchmark_dry_run(code, number):.1f}")
+
+
+if __name__ == "__main__":
+    cli()  # pylint: disable=no-value-for-parameter
+
+# EOF
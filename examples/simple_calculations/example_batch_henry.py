@@ -0,0 +1,106 @@
+"""Run several RASPA Henry coefficient calculations within a single scheduler job."""
+import os
+import sys
+
+import click
+from aiida.common import NotExistent
+from aiida.engine import run, run_get_pk
+from aiida.orm import Code, Dict
+from aiida.plugins import DataFactory
+
+from aiida_raspa.utils import get_batch_builders
+
+# data objects
+CifData = DataFactory("cif")  # pylint: disable=invalid-name
+
+
+def example_batch_henry(raspa_code, submit=True):
+    """Group Henry coefficient calculations at different temperatures into one task-farm calculation."""
+
+    # framework
+    pwd = os.path.dirname(os.path.realpath(__file__))
+    framework = CifData(file=os.path.join(pwd, "..", "files", "TCC1RS.cif"))
+
+    builders = {}
+    for temperature in (250, 300, 350):
+        builder = raspa_code.get_builder()
+        builder.framework = {
+            "tcc1rs": framework,
+        }
+        builder.parameters = Dict(
+            dict={
+                "GeneralSettings": {
+                    "SimulationType": "MonteCarlo",
+                    "NumberOfCycles": 50,
+                    "PrintPropertiesEvery": 10,
+                    "Forcefield": "GenericMOFs",
+                    "EwaldPrecision": 1e-6,
+                    "CutOff": 12.0,
+                },
+                "System": {
+                    "tcc1rs": {
+                        "type": "Framework",
+                        "UnitCells": "1 1 1",
+                        "HeliumVoidFraction": 0.149,
+                        "ExternalTemperature": float(temperature),
+                    }
+                },
+                "Component": {
+                    "methane": {
+                        "MoleculeDefinition": "TraPPE",
+                        "WidomProbability": 1.0,
+                        "CreateNumberOfMolecules": 0,
+                    }
+                },
+            }
+        )
+        builder.metadata.options = {
+            "resources": {
+                "num_machines": 1,
+                "num_mpiprocs_per_machine": 1,
+            },
+            "max_wallclock_seconds": 1 * 30 * 60,  # 30 min
+            "withmpi": False,
+        }
+        builders[f"temperature_{temperature}"] = builder
+
+    # all the calculations share the code and the scheduler options: they end up in the same job
+    (builder,) = get_batch_builders(builders, max_concurrent_tasks=3)
+
+    if submit:
+        print("Testing RASPA task farm on computing Henry coefficients ...")
+        res, pk = run_get_pk(builder)
+        print("calculation pk: ", pk)
+        for task, output_parameters in res["output_parameters"].items():
+            print(
+                f"Average Henry coefficient (methane in tcc1rs, {task}):",
+                output_parameters.dict.tcc1rs["components"]["methane"]["henry_coefficient_average"],
+            )
+        print("OK, calculation has completed successfully")
+    else:
+        print("Generating test input ...")
+        builder.metadata.dry_run = True
+        builder.metadata.store_provenance = False
+        run(builder)
+        print("submission test successful")
+        print("In order to actually submit, add '--submit'")
+    print("-----")
+
+
+@click.command("cli")
+@click.argument("codelabel")
+@click.option("--submit", is_flag=True, help="Actually submit calculation")
+def cli(codelabel, submit):
+    """Click interface"""
+    try:
+        code = Code.get_from_string(codelabel)
+    except NotExistent:
+        print(f"The code '{codelabel}' does not exist")
+        sys.exit(1)
+    example_batch_henry(code, submit)
+
+
+if __name__ == "__main__":
+    cli()  # pylint: disable=no-value-for-parameter
+
+# EOF
@@ -0,0 +1,110 @@
+"""Test the grouping of RASPA calculations into task-farm calculations"""
+
+import os
+
+import pytest
+from aiida.engine import run_get_node
+from aiida.orm import Dict, FolderData, RemoteData
+from aiida.plugins import CalculationFactory, DataFactory
+
+from aiida_raspa.utils import get_batch_builders
+
+RaspaCalculation = CalculationFactory("raspa")  # pylint: disable=invalid-name
+RaspaFarmCalculation = CalculationFactory("raspa.farm")  # pylint: disable=invalid-name
+CifData = DataFactory("core.cif")  # pylint: disable=invalid-name
+
+FILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "examples", "files")
+
+
+def get_builder(code, framework, temperature, walltime=1800):
+    """Return the builder of a Widom calculation of methane in the TCC1RS framework"""
+    builder = RaspaCalculation.get_builder()
+    builder.code = code
+    builder.framework = {"tcc1rs": framework}
+    builder.parameters = Dict(
+        {
+            "GeneralSettings": {"SimulationType": "MonteCarlo", "NumberOfCycles": 50, "Forcefield": "GenericMOFs"},
+            "System": {"tcc1rs": {"type": "Framework", "UnitCells": "1 1 1", "ExternalTemperature": temperature}},
+            "Component": {"methane": {"MoleculeDefinition": "TraPPE", "WidomProbability": 1.0}},
+        }
+    )
+    builder.metadata.options.resources = {"num_machines": 1, "num_mpiprocs_per_machine": 1}
+    builder.metadata.options.max_wallclock_seconds = walltime
+    return builder
+
+
+@pytest.fixture(name="framework")
+def fixture_framework(aiida_profile):  # pylint: disable=unused-argument
+    """Return the stored TCC1RS framework"""
+    return CifData(file=os.path.join(FILES, "TCC1RS.cif")).store()
+
+
+def test_get_batch_builders(fake_raspa_code, framework):
+    """Test that the calculations with the same code and options are grouped, at most `max_tasks` per group"""
+    builders = {f"t{temperature}": get_builder(fake_raspa_code, framework, temperature) for temperature in range(5)}
+    builders["long"] = get_builder(fake_raspa_code, framework, 300, walltime=3600)
+
+    farms = get_batch_builders(builders, max_tasks=3, max_concurrent_tasks=2)
+
+    assert [sorted(farm.parameters) for farm in farms] == [["t0", "t1", "t2"], ["t3", "t4"], ["long"]]
+    assert farms[0].parameters["t1"].uuid == builders["t1"].parameters.uuid
+    assert farms[0].framework["tcc1rs"].uuid == framework.uuid
+    assert farms[0].metadata.options.resources == {"num_machines": 1, "num_mpiprocs_per_machine": 2}
+    # three tasks, two at a time
+    assert farms[0].metadata.options.max_wallclock_seconds == 2 * 1800
+    assert farms[1].metadata.options.max_wallclock_seconds == 1800
+    assert farms[2].metadata.options.resources == {"num_machines": 1, "num_mpiprocs_per_machine": 1}
+
+
+def test_get_batch_builders_shared_inputs(fake_raspa_code, framework):
+    """Test that the calculations that use different frameworks under the same name are not grouped"""
+    other = CifData(file=os.path.join(FILES, "IRMOF-1.cif")).store()
+    builders = {
+        "first": get_builder(fake_raspa_code, framework, 300),
+        "second": get_builder(fake_raspa_code, other, 300),
+        "third": get_builder(fake_raspa_code, framework, 350),
+    }
+
+    farms = get_batch_builders(builders)
+
+    assert [sorted(farm.parameters) for farm in farms] == [["first", "third"], ["second"]]
+    assert farms[1].framework["tcc1rs"].uuid == other.uuid
+
+
+@pytest.mark.parametrize("name", ["settings", "grids", "parent_folder", "retrieved_parent_folder"])
+def test_get_batch_builders_unsupported(fake_raspa_code, framework, name):
+    """Test that the calculations with inputs that the task farm does not support are rejected"""
+    builder = get_builder(fake_raspa_code, framework, 300)
+    if name == "settings":
+        builder.settings = Dict({"cmdline": ["-a"]})
+    elif name == "grids":
+        builder.grids = {"tcc1rs": RemoteData(computer=fake_raspa_code.computer, remote_path="/scratch").store()}
+    elif name == "parent_folder":
+        builder.parent_folder = RemoteData(computer=fake_raspa_code.computer, remote_path="/scratch").store()
+    else:
+        retrieved = FolderData()
+        retrieved.base.repository.put_object_from_bytes(b"", "Restart/System_0/restart_tcc1rs_1.1.1_300.000000_0")
+        builder.retrieved_parent_folder = retrieved.store()
+
+    with pytest.raises(ValueError, match=name):
+        get_batch_builders({"task": builder})
+    with pytest.raises(ValueError, match="not a valid identifier"):
+        get_batch_builders({"300 K": get_builder(fake_raspa_code, framework, 300)})
+
+
+def test_batch_dry_run(fake_raspa_code, framework, tmp_path, monkeypatch):
+    """Test that the grouped calculations are run as the tasks of a task-farm calculation"""
+    monkeypatch.chdir(tmp_path)  # the dry run writes the `submit_test` folder in the working directory
+    builders = {
+        "t300": get_builder(fake_raspa_code, framework, 300),
+        "t350": get_builder(fake_raspa_code, framework, 350),
+    }
+    (farm,) = get_batch_builders(builders, max_concurrent_tasks=2)
+    farm.metadata.dry_run = True
+
+    _, node = run_get_node(farm)
+
+    for task in ("t300", "t350"):
+        task_dir = os.path.join(node.dry_run_info["folder"], RaspaFarmCalculation.get_task_folder(task))
+        assert os.path.isfile(os.path.join(task_dir, RaspaFarmCalculation.INPUT_FILE))
+        assert os.path.isfile(os.path.join(task_dir, "tcc1rs.cif"))
@@ -0,0 +1,82 @@
+"""Test the registry of the block pocket files"""
+
+import io
+import os
+
+from aiida.orm import SinglefileData
+from aiida.plugins import DataFactory
+
+from aiida_raspa.utils import (
+    RaspaInput,
+    find_block_pocket,
+    get_block_pockets,
+    register_block_pocket,
+)
+
+CifData = DataFactory("core.cif")  # pylint: disable=invalid-name
+
+FILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "examples", "files")
+
+
+def get_block_pocket(contents):
+    """Return a block pocket file with `contents`"""
+    return SinglefileData(io.BytesIO(contents.encode("utf-8")), filename="pockets.block")
+
+
+def test_find_block_pocket(aiida_profile_clean):  # pylint: disable=unused-argument
+    """Test that the most recent block pocket of a framework, probe radius and molecule is found"""
+    framework = CifData(file=os.path.join(FILES, "IRMOF-1.cif")).store()
+    assert find_block_pocket(framework, 1.8, "methane") is None
+
+    register_block_pocket(get_block_pocket("1\n"), framework, 1.8, "methane")
+    latest = register_block_pocket(get_block_pocket("2\n"), framework, 1.8, "methane")
+
+    assert find_block_pocket(framework, 1.8, "methane").uuid == latest.uuid
+    assert find_block_pocket(framework, 1.80001, "methane").uuid == latest.uuid
+    assert find_block_pocket(framework, 2.0, "methane") is None
+    assert find_block_pocket(framework, 1.8, "xenon") is None
+
+
+def test_get_block_pockets():
+    """Test that the systems without a registered block pocket are rendered with a placeholder"""
+    frameworks = {"irmof_1": CifData(file=os.path.join(FILES, "IRMOF-1.cif")).store()}
+    block_pocket = register_block_pocket(get_block_pocket("0\n"), frameworks["irmof_1"], 1.8, "methane")
+    parameters = {
+        "GeneralSettings": {"SimulationType": "MonteCarlo", "NumberOfCycles": 400},
+        "System": {
+            "irmof_1": {"type": "Framework", "UnitCells": "1 1 1"},
+            "box": {"type": "Box", "BoxLengths": "25 25 25"},
+        },
+        "Component": {
+            "methane": {"MoleculeDefinition": "TraPPE"},
+            "xenon": {"MoleculeDefinition": "Xenon"},
+            "ethane": {"MoleculeDefinition": "TraPPE", "BlockPocketsFileName": "ethane"},
+        },
+    }
+
+    file_names, block_pockets = get_block_pockets(parameters, frameworks, {"methane": 1.8, "xenon": 1.8})
+
+    assert file_names == {"methane": {"irmof_1": "irmof_1_methane", "box": None}}
+    assert block_pockets["irmof_1_methane"].uuid == block_pocket.uuid
+
+    parameters["Component"]["methane"]["BlockPocketsFileName"] = file_names["methane"]
+    rendered = RaspaInput(parameters).render()
+    assert "   BlockPocketsFileName - irmof_1_methane\n" in rendered
+    assert "   BlockPockets no yes\n" in rendered
+    assert "None" not in rendered
+
+
+def test_get_block_pockets_partial_radii():
+    """Test that the components missing from a dictionary of probe radii are skipped"""
+    frameworks = {"irmof_1": CifData(file=os.path.join(FILES, "IRMOF-1.cif")).store()}
+    register_block_pocket(get_block_pocket("0\n"), frameworks["irmof_1"], 1.8, "methane")
+    register_block_pocket(get_block_pocket("0\n"), frameworks["irmof_1"], 1.8, "xenon")
+    parameters = {
+        "System": {"irmof_1": {"type": "Framework", "UnitCells": "1 1 1"}},
+        "Component": {"methane": {"MoleculeDefinition": "TraPPE"}, "xenon": {"MoleculeDefinition": "Xenon"}},
+    }
+
+    file_names, block_pockets = get_block_pockets(parameters, frameworks, {"methane": 1.8})
+
+    assert file_names == {"methane": {"irmof_1": "irmof_1_methane"}}
+    assert list(block_pockets) == ["irmof_1_methane"]
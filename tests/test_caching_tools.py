@@ -0,0 +1,62 @@
+"""Test the normalization of the inputs used for caching"""
+
+from aiida.common import LinkType
+from aiida.orm import Dict, load_node
+from aiida.orm.nodes.process.calculation.calcjob import CalcJobNodeCaching
+
+from aiida_raspa.calculations.caching import RaspaCalcJobNode
+from aiida_raspa.utils import normalize_parameters, normalize_settings
+
+
+def test_equivalent_parameters():
+    """Parameters that RASPA reads in the same way are normalized to the same dictionary."""
+    parameters_1 = {
+        "GeneralSettings": {"NumberOfCycles": 1000, "PrintEvery": 100, "UseChargesFromCIFFile": True},
+        "System": {"irmof_1": {"type": "Framework", "UnitCells": "2 2 2", "ExternalPressure": 1e5}},
+        "Component": {"methane": {"CreateNumberOfMolecules": {"irmof_1": 0}, "WidomProbability": 1}},
+    }
+    parameters_2 = {
+        "GeneralSettings": {
+            "numberofcycles": "1000",
+            "printevery": "100",
+            "WriteBinaryRestartFileEvery": 10,
+            "UseChargesFromCIFFile": "yes",
+        },
+        "System": {"irmof_1": {"type": "Framework", "UnitCells": [2, 2, 2], "ExternalPressure": "100000"}},
+        "Component": {"methane": {"CreateNumberOfMolecules": {"irmof_1": "0"}, "WidomProbability": "1.0"}},
+    }
+    assert normalize_parameters(parameters_1) == normalize_parameters(parameters_2)
+    assert normalize_parameters(parameters_1) == {
+        "GeneralSettings": {"NumberOfCycles": 1000, "PrintEvery": 100, "UseChargesFromCIFFile": True},
+        "System": {"irmof_1": {"type": "Framework", "UnitCells": [2, 2, 2], "ExternalPressure": 100000.0}},
+        "Component": {"methane": {"CreateNumberOfMolecules": {"irmof_1": 0}, "WidomProbability": 1.0}},
+    }
+
+    # the loadings are sampled every `PrintEvery` cycles
+    parameters_2["GeneralSettings"]["printevery"] = "1000"
+    assert normalize_parameters(parameters_1) != normalize_parameters(parameters_2)
+
+
+def test_normalize_settings():
+    """Settings that do not change the simulation are dropped."""
+    settings = {"cmdline": ["-a"], "additional_retrieve_list": ["Movies"], "replicas": 2}
+    assert normalize_settings(settings) == {"replicas": 2}
+
+
+def test_calculation_hash(aiida_profile_clean, aiida_localhost):  # pylint: disable=unused-argument
+    """Calculations with equivalent inputs get the same hash, also when they are loaded from the database."""
+    nodes = []
+    for parameters, settings in (
+        ({"GeneralSettings": {"NumberOfCycles": 1000, "PrintEvery": 100}}, {"cmdline": ["-a"]}),
+        ({"GeneralSettings": {"numberofcycles": "1000", "printevery": "100"}}, {}),
+    ):
+        node = RaspaCalcJobNode(computer=aiida_localhost, process_type="aiida.calculations:raspa")
+        node.set_option("resources", {"num_machines": 1, "num_mpiprocs_per_machine": 1})
+        node.base.links.add_incoming(Dict(parameters).store(), LinkType.INPUT_CALC, "parameters")
+        node.base.links.add_incoming(Dict(settings).store(), LinkType.INPUT_CALC, "settings")
+        nodes.append(node.store())
+
+    loaded = [load_node(node.pk) for node in nodes]
+    assert all(isinstance(node, RaspaCalcJobNode) for node in loaded)
+    assert loaded[0].base.caching.compute_hash() == loaded[1].base.caching.compute_hash()
+    assert CalcJobNodeCaching(loaded[0]).compute_hash() != CalcJobNodeCaching(loaded[1]).compute_hash()
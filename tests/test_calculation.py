@@ -0,0 +1,147 @@
+"""Test the preparation of RASPA calculations"""
+
+import os
+
+from aiida.common.folders import Folder
+from aiida.engine import run_get_node
+from aiida.engine.utils import instantiate_process
+from aiida.manage import get_manager
+from aiida.orm import Dict, FolderData, RemoteData
+from aiida.plugins import CalculationFactory, DataFactory
+
+from aiida_raspa.utils import (
+    GRID_CACHE_EXTRA,
+    RETRIEVAL_POLICY_LOG,
+    STAGE_SCRIPT,
+    get_grid_folder,
+    get_grid_key,
+)
+
+RaspaCalculation = CalculationFactory("raspa")  # pylint: disable=invalid-name
+CifData = DataFactory("core.cif")  # pylint: disable=invalid-name
+
+FILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "examples", "files")
+
+
+def get_builder(code, **inputs):
+    """Return the builder of a GCMC calculation of methane in TCC1RS and in a box, prepared with a dry run"""
+    builder = RaspaCalculation.get_builder()
+    builder.code = code
+    builder.parameters = Dict(
+        {
+            "GeneralSettings": {
+                "SimulationType": "MonteCarlo",
+                "NumberOfCycles": 2000,
+                "NumberOfInitializationCycles": 1000,
+                "CutOff": 12.0,
+                "Forcefield": "GenericMOFs",
+            },
+            "System": {
+                "tcc1rs": {"type": "Framework", "ExternalTemperature": 300.0, "ExternalPressure": 1e5},
+                "box_1": {"type": "Box", "BoxLengths": "30 30 30", "ExternalTemperature": 300.0},
+            },
+            "Component": {
+                "methane": {
+                    "MoleculeDefinition": "TraPPE",
+                    "TranslationProbability": 0.5,
+                    "SwapProbability": 1.0,
+                    "CreateNumberOfMolecules": {"tcc1rs": 0, "box_1": 10},
+                },
+            },
+        }
+    )
+    builder.framework = {"tcc1rs": CifData(file=os.path.join(FILES, "TCC1RS.cif")).store()}
+    builder.metadata.options.resources = {"num_machines": 1, "num_mpiprocs_per_machine": 1}
+    builder.metadata.dry_run = True
+    for key, value in inputs.items():
+        builder[key] = value
+    return builder
+
+
+def test_system_order(fake_raspa_code, tmp_path, monkeypatch):
+    """Test that the order of the systems in the input file is stored in the extras"""
+    monkeypatch.chdir(tmp_path)  # the dry run writes the `submit_test` folder in the working directory
+    _, node = run_get_node(get_builder(fake_raspa_code))
+
+    assert node.base.extras.get("system_order") == ["box_1", "tcc1rs"]
+    with open(os.path.join(node.dry_run_info["folder"], RaspaCalculation.INPUT_FILE), encoding="utf-8") as fobj:
+        lines = fobj.read().splitlines()
+    assert lines.index("Box 0") < lines.index("Framework 1")
+
+
+def test_stages_append_text(fake_raspa_code, tmp_path, monkeypatch, caplog):
+    """Test that a warning reports that the `append_text` option runs before the stages"""
+    monkeypatch.chdir(tmp_path)
+    stages = [{"name": "equilibration", "parameters": {"GeneralSettings": {"NumberOfCycles": 0}}}, {}]
+    builder = get_builder(fake_raspa_code, settings=Dict({"stages": stages}))
+    builder.metadata.options.append_text = "echo finished"
+    _, node = run_get_node(builder)
+
+    with open(os.path.join(node.dry_run_info["folder"], "_aiidasubmit.sh"), encoding="utf-8") as fobj:
+        submit_script = fobj.read()
+    assert submit_script.index("echo finished") < submit_script.index(f"bash {STAGE_SCRIPT}")
+    assert "`append_text` option runs before the simulations" in caplog.text
+
+
+def test_retrieval_policy(fake_raspa_code, tmp_path, monkeypatch):
+    """Test that the retrieval policy never withholds the output and the restart files"""
+    monkeypatch.chdir(tmp_path)
+    settings = Dict({"retrieval_policy": {"max_file_size": 100}})
+    _, node = run_get_node(get_builder(fake_raspa_code, settings=settings))
+
+    with open(os.path.join(node.dry_run_info["folder"], "_aiidasubmit.sh"), encoding="utf-8") as fobj:
+        submit_script = fobj.read()
+    assert "Output/System_*/*|Replica_*/Output/System_*/*" in submit_script
+    assert "Restart/System_*/*|Replica_*/Restart/System_*/*" in submit_script
+    assert RETRIEVAL_POLICY_LOG in node.get_retrieve_list()
+
+
+def test_make_grid_extra(fake_raspa_code, tmp_path, monkeypatch):
+    """Test that a MakeGrid calculation stores the cache keys of its grids in the extras"""
+    monkeypatch.chdir(tmp_path)
+    builder = get_builder(fake_raspa_code)
+    parameters = builder.parameters.get_dict()
+    parameters["GeneralSettings"].update({"SimulationType": "MakeGrid", "GridTypes": "CH4_sp3"})
+    builder.parameters = Dict(parameters)
+    _, node = run_get_node(builder)
+
+    key = get_grid_key(parameters, "tcc1rs", builder.framework["tcc1rs"])
+    assert node.base.extras.get(GRID_CACHE_EXTRA) == {"tcc1rs": key}
+
+
+def test_grids(fake_raspa_code, tmp_path):
+    """Test that the grids of a previous MakeGrid calculation are linked into the private RASPA directory"""
+    remote = RemoteData(computer=fake_raspa_code.computer, remote_path="/scratch/make_grid").store()
+    builder = get_builder(fake_raspa_code, grids={"tcc1rs": remote})
+    calculation = instantiate_process(get_manager().get_runner(), builder)
+    calcinfo = calculation.prepare_for_submission(Folder(str(tmp_path)))
+
+    grid_folder = get_grid_folder("GenericMOFs", "tcc1rs")
+    assert calcinfo.remote_symlink_list == [
+        (fake_raspa_code.computer.uuid, os.path.join("/scratch/make_grid", grid_folder), grid_folder)
+    ]
+    assert "export RASPA_DIR=" in calcinfo.prepend_text
+    with open(tmp_path / RaspaCalculation.INPUT_FILE, encoding="utf-8") as fobj:
+        assert "UseTabularGrid yes" in fobj.read()
+
+
+def test_restart_from_finished_stage(fake_raspa_code, tmp_path):
+    """Test that the restart of the last finished stage is used if the parent did not write its own restart"""
+    retrieved = FolderData()
+    for stage_dir in ("Stage_0", "Stage_1"):
+        retrieved.base.repository.put_object_from_bytes(b"", f"{stage_dir}/Restart/System_0/restart_box")
+        retrieved.base.repository.put_object_from_bytes(b"", f"{stage_dir}/Restart/System_1/restart_tcc1rs")
+    retrieved.store()
+    stages = [{"name": "production"}]
+    builder = get_builder(fake_raspa_code, settings=Dict({"stages": stages}), retrieved_parent_folder=retrieved)
+    calculation = instantiate_process(get_manager().get_runner(), builder)
+    calcinfo = calculation.prepare_for_submission(Folder(str(tmp_path)))
+
+    assert (
+        retrieved.uuid,
+        "Stage_1/Restart/System_0/restart_box",
+        "RestartInitial/System_0/restart_Box_1.1.1_300.000000_0",
+    ) in calcinfo.local_copy_list
+    assert ("Stage_*/Restart", ".", 2) in calcinfo.retrieve_list
+    with open(tmp_path / "Stage_0" / RaspaCalculation.INPUT_FILE, encoding="utf-8") as fobj:
+        assert "RestartFile yes" in fobj.read()
@@ -0,0 +1,106 @@
+"""Test the tools that detect uncharged systems"""
+
+import io
+import os
+
+import pytest
+from aiida.orm import SinglefileData
+from aiida.plugins import DataFactory
+
+from aiida_raspa.utils import check_charge_method, has_charges
+from aiida_raspa.utils.charge_tools import parse_molecule_atom_types, parse_pseudo_atoms
+
+CifData = DataFactory("core.cif")  # pylint: disable=invalid-name
+
+FILES_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir, "examples", "files")
+
+
+def read_file(filename):
+    """Read a file of the examples"""
+    with open(os.path.join(FILES_DIR, filename), encoding="utf-8") as fobj:
+        return fobj.read()
+
+
+def test_parse_pseudo_atoms():
+    """Read the charges of the pseudo atoms."""
+    pseudo_atoms = parse_pseudo_atoms(read_file("pseudo_atoms.def"))
+    assert len(pseudo_atoms) == 29
+    assert pseudo_atoms["CH4_sp3"] == 0.0
+    assert pseudo_atoms["O_co2"] == -0.35
+    assert pseudo_atoms["Xe"] == 0.0
+
+
+def test_parse_molecule_atom_types():
+    """Read the pseudo atoms of the molecules."""
+    assert parse_molecule_atom_types(read_file("CO2.def")) == ["O_co2", "C_co2", "O_co2"]
+    assert parse_molecule_atom_types(read_file("N2.def")) == ["N_n2", "N_com", "N_n2"]
+
+
+METHANE_DEF = """# critical constants: Temperature [T], Pressure [Pa], and Acentric factor [-]
+190.564
+4599200.0
+0.01142
+#Number Of Atoms
+ 1
+# Number of groups
+1
+# methane-group
+rigid
+# number of atoms
+1
+# atomic positions
+0 CH4_sp3     0.0           0.0           0.0
+"""
+
+
+def get_files(*molecules):
+    """Return the `file` inputs with the pseudo atoms and the definitions of the `molecules`"""
+    files = {"pseudo_atoms": SinglefileData(os.path.join(FILES_DIR, "pseudo_atoms.def"))}
+    for molecule in molecules:
+        if molecule == "methane":
+            files[molecule] = SinglefileData(io.BytesIO(METHANE_DEF.encode("utf-8")), filename="methane.def")
+        else:
+            files[molecule] = SinglefileData(os.path.join(FILES_DIR, f"{molecule}.def"))
+    return files
+
+
+def get_parameters(molecule, framework=None, **general):
+    """Return the parameters of `molecule` in a box, or in `framework`, with the local force field"""
+    system = {"type": "Framework"} if framework else {"type": "Box", "BoxLengths": "30 30 30"}
+    return {
+        "GeneralSettings": dict({"Forcefield": "Local", "ChargeMethod": "Ewald"}, **general),
+        "System": {framework or "box_0": system},
+        "Component": {molecule: {"MoleculeDefinition": "Local"}},
+    }
+
+
+@pytest.mark.parametrize(
+    "molecule, files, general, expected",
+    [
+        ("CO2", ("CO2",), {}, True),
+        ("methane", ("methane",), {}, False),
+        ("methane", ("methane",), {"Forcefield": "GenericMOFs"}, None),
+        ("methane", (), {}, None),
+        ("methane", ("methane",), {"ChargeFromChargeEquilibration": "yes"}, None),
+    ],
+)
+def test_check_charge_method(molecule, files, general, expected):
+    """Test that the charge method is switched off only if no atom is known to be charged"""
+    parameters = get_parameters(molecule, **general)
+    assert has_charges(parameters, {}, get_files(*files)) is expected
+
+    warnings = check_charge_method(parameters, {}, get_files(*files))
+    if expected is False:
+        assert parameters["GeneralSettings"]["ChargeMethod"] == "None"
+        assert warnings == ["None of the atoms is charged: the ChargeMethod is set to None."]
+    else:
+        assert parameters["GeneralSettings"]["ChargeMethod"] == "Ewald"
+        assert not warnings
+
+
+@pytest.mark.parametrize("cif_file, expected", [("IRMOF-1.cif", False), ("IRMOF-1_eqeq.cif", True)])
+def test_charges_from_cif_file(cif_file, expected):
+    """Test that the charges of the framework are read from the CIF file with `UseChargesFromCIFFile`"""
+    parameters = get_parameters("methane", framework="irmof_1", UseChargesFromCIFFile="yes")
+    frameworks = {"irmof_1": CifData(file=os.path.join(FILES_DIR, cif_file))}
+    assert has_charges(parameters, frameworks, get_files("methane")) is expected
@@ -0,0 +1,91 @@
+"""Test the expansion of the framework symmetry"""
+
+import io
+import os
+from collections import Counter
+
+import numpy as np
+from aiida.orm import CifData
+
+from aiida_raspa.utils.cif_tools import (
+    expand_site,
+    get_p1_cif,
+    parse_symmetry_operation,
+)
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+
+CIF_WITHOUT_CHARGES = """data_test
+_cell_length_a    10.0
+_cell_length_b    10.0
+_cell_length_c    10.0
+_cell_angle_alpha 90
+_cell_angle_beta  90
+_cell_angle_gamma 90
+_symmetry_space_group_name_H-M  'P -1'
+loop_
+_symmetry_equiv_pos_as_xyz
+ 'x,y,z'
+ '-x,-y,-z'
+loop_
+_atom_site_label
+_atom_site_type_symbol
+_atom_site_fract_x
+_atom_site_fract_y
+_atom_site_fract_z
+_atom_site_charge
+Si1 Si 0.1(2) 0.2 0.3 ?
+O1  O  0.0    0.0 0.0 .
+"""
+
+
+def get_atoms(content):
+    """Return the rows of the atom sites of a P1 CIF file written by `get_p1_cif`"""
+    lines = content.splitlines()
+    last_column = max(i for i, line in enumerate(lines) if line.startswith("_atom_site_"))
+    return [line.split() for line in lines[last_column + 1 :]]
+
+
+def test_parse_symmetry_operation():
+    """Symmetry operations in the xyz notation are converted into a rotation and a translation."""
+    rotation, translation = parse_symmetry_operation("-x+1/2, y-z, 0.25+z")
+    assert np.allclose(rotation, [[-1, 0, 0], [0, 1, -1], [0, 0, 1]])
+    assert np.allclose(translation, [0.5, 0, 0.25])
+
+
+def test_expand_site():
+    """The symmetry copies on special positions are removed."""
+    operations = [parse_symmetry_operation(op) for op in ("x,y,z", "-x,-y,-z", "x+1/2,y+1/2,z", "-x+1/2,-y+1/2,-z")]
+    cell = 10.0 * np.eye(3)
+
+    # a general position has four copies, an inversion center only two
+    assert len(expand_site(np.array([0.1, 0.2, 0.3]), operations, cell)) == 4
+    copies = expand_site(np.array([0.0, 0.0, 0.0]), operations, cell)
+    assert np.allclose(copies, [[0, 0, 0], [0.5, 0.5, 0]])
+
+
+def test_get_p1_cif():
+    """The symmetry of IRMOF-10 is expanded into the 8 formula units Zn4O(C14H8O4)3 of the unit cell.
+
+    The hydrogen atoms lie within 0.05 Angstrom of a mirror plane. Like RASPA, the copies closer than
+    `OVERLAP_TOLERANCE` are merged into one atom, while ASE keeps 96 extra hydrogen atoms (760 atoms in total).
+    """
+    cif = CifData(file=os.path.join(TESTS, os.pardir, "examples", "files", "IRMOF-10.cif"))
+    content, metadata = get_p1_cif(cif)
+
+    atoms = get_atoms(content)
+    assert metadata["number_of_atoms"] == len(atoms) == 664
+    assert Counter(atom[1] for atom in atoms) == {"Zn": 32, "O": 104, "C": 336, "H": 192}
+    assert metadata["number_of_symmetry_operations"] == 192
+    assert metadata["net_charge"] == 0.0
+
+    # the P1 file is read back without any symmetry to expand
+    assert len(CifData(file=io.BytesIO(content.encode("utf-8"))).get_ase()) == 664
+
+
+def test_get_p1_cif_unknown_charges():
+    """The placeholders of unknown values are accepted in the charges, and the charge column is dropped."""
+    content, metadata = get_p1_cif(CifData(file=io.BytesIO(CIF_WITHOUT_CHARGES.encode("utf-8"))))
+    assert "_atom_site_charge" not in content
+    assert metadata["net_charge"] is None
+    assert [atom[:2] for atom in get_atoms(content)] == [["Si1", "Si"], ["Si1", "Si"], ["O1", "O"]]
@@ -0,0 +1,27 @@
+"""Test the detection of the equilibration"""
+
+import numpy as np
+
+from aiida_raspa.utils import detect_equilibration, mser_truncation
+
+
+def test_mser_truncation():
+    """Test that the initial transient of a series is discarded"""
+    rng = np.random.default_rng(0)
+    values = np.concatenate([np.linspace(0.0, 10.0, 100), 10.0 + rng.normal(size=900)])
+
+    assert 80 <= mser_truncation(values) <= 110
+    assert mser_truncation(values, batch_size=5) % 5 == 0
+    assert mser_truncation(np.ones(10)) == 0
+
+    # the series is still drifting, or too short
+    assert mser_truncation(np.linspace(0.0, 10.0, 100)) is None
+    assert mser_truncation([1.0, 2.0]) is None
+
+
+def test_detect_equilibration(read_output):
+    """Test the detection on the values printed in an output file"""
+    output_contents = read_output("one_component.out")
+
+    # two printed values are too few to detect the equilibration
+    assert detect_equilibration(output_contents) is None
@@ -0,0 +1,86 @@
+"""Test the preparation and the parsing of a task-farm calculation"""
+
+import os
+
+from aiida.engine import run_get_node
+from aiida.orm import Dict
+from aiida.plugins import CalculationFactory, DataFactory, ParserFactory
+
+from aiida_raspa.utils import LAUNCHER_SCRIPT
+
+RaspaFarmCalculation = CalculationFactory("raspa.farm")  # pylint: disable=invalid-name
+RaspaFarmParser = ParserFactory("raspa.farm")  # pylint: disable=invalid-name
+CifData = DataFactory("core.cif")  # pylint: disable=invalid-name
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+
+
+def get_parameters(temperature):
+    """Return the parameters of a GCMC task in the TCC1RS framework"""
+    return Dict(
+        {
+            "GeneralSettings": {
+                "SimulationType": "MonteCarlo",
+                "NumberOfCycles": 2000,
+                "NumberOfInitializationCycles": 1000,
+                "CutOff": 12.0,
+                "Forcefield": "GenericMOFs",
+            },
+            "System": {
+                "tcc1rs": {"type": "Framework", "ExternalTemperature": temperature, "ExternalPressure": 1e5},
+            },
+            "Component": {
+                "methane": {"MoleculeDefinition": "TraPPE", "TranslationProbability": 0.5, "SwapProbability": 1.0},
+            },
+        }
+    )
+
+
+def test_prepare_for_submission(fake_raspa_code, tmp_path, monkeypatch):
+    """Test that every task gets its input and framework, and that the launcher starts them"""
+    monkeypatch.chdir(tmp_path)  # the dry run writes the `submit_test` folder in the working directory
+    builder = RaspaFarmCalculation.get_builder()
+    builder.code = fake_raspa_code
+    builder.parameters = {"t300": get_parameters(300.0), "t350": get_parameters(350.0)}
+    builder.framework = {
+        "tcc1rs": CifData(file=os.path.join(TESTS, os.pardir, "examples", "files", "TCC1RS.cif")).store()
+    }
+    builder.metadata.options.resources = {"num_machines": 1, "num_mpiprocs_per_machine": 2}
+    builder.metadata.options.append_text = "echo finished"
+    builder.metadata.dry_run = True
+
+    _, node = run_get_node(builder)
+    folder = node.dry_run_info["folder"]
+
+    for task, temperature in (("t300", "300.0"), ("t350", "350.0")):
+        task_dir = os.path.join(folder, RaspaFarmCalculation.get_task_folder(task))
+        with open(os.path.join(task_dir, RaspaFarmCalculation.INPUT_FILE), encoding="utf-8") as fobj:
+            assert f"ExternalTemperature {temperature}" in fobj.read()
+        assert os.path.isfile(os.path.join(task_dir, "tcc1rs.cif"))
+    assert ["task_t300/Output", ".", 2] in node.get_retrieve_list()
+    assert ["task_t350/Output", ".", 2] in node.get_retrieve_list()
+
+    # the `append_text` option is written before the launcher command
+    with open(os.path.join(folder, "_aiidasubmit.sh"), encoding="utf-8") as fobj:
+        submit_script = fobj.read()
+    assert f"bash {LAUNCHER_SCRIPT} /usr/bin/simulate 2" in submit_script
+    assert submit_script.index("echo finished") < submit_script.index(f"bash {LAUNCHER_SCRIPT}")
+    assert os.path.isfile(os.path.join(folder, LAUNCHER_SCRIPT))
+
+
+def test_parser(generate_calc_job_node, read_output):
+    """Test that the finished tasks are parsed even if another task failed"""
+    output_contents = read_output("one_component.out")
+    node = generate_calc_job_node(
+        "raspa.farm",
+        {"parameters": {"t300": get_parameters(300.0), "t350": get_parameters(350.0)}},
+        {"task_t300/Output/System_0/output_tcc1rs.data": output_contents},
+    )
+
+    results, calcfunction = RaspaFarmParser.parse_from_node(node, store_provenance=False)
+
+    assert calcfunction.exit_status == RaspaFarmCalculation.exit_codes.ERROR_TASKS_FAILED.status
+    assert "t350" in calcfunction.exit_message
+    assert set(results["output_parameters"]) == {"t300"}
+    components = results["output_parameters"]["t300"]["tcc1rs"]["components"]
+    assert components["methane"]["loading_absolute_average"] > 0
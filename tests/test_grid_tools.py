@@ -0,0 +1,138 @@
+"""Test the energy grid tools"""
+
+import copy
+import os
+import subprocess
+
+import pytest
+from aiida.common.links import LinkType
+from aiida.orm import CalcJobNode, Computer, RemoteData
+from aiida.plugins import DataFactory
+
+from aiida_raspa.utils import (
+    GRID_CACHE_EXTRA,
+    find_cached_grids,
+    get_grid_folder,
+    get_grid_key,
+    get_raspa_dir_script,
+    is_make_grid,
+)
+
+CifData = DataFactory("core.cif")  # pylint: disable=invalid-name
+
+FILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "examples", "files")
+
+PARAMETERS = {
+    "GeneralSettings": {
+        "SimulationType": "MakeGrid",
+        "Forcefield": "GenericMOFs",
+        "CutOff": 12,
+        "GridTypes": "C H",
+        "SpacingVDWGrid": 0.15,
+    },
+    "System": {"tcc1rs": {"type": "Framework", "UnitCells": "1 1 1"}},
+    "Component": {},
+}
+
+
+def get_parameters(general=None, system=None, component=None):
+    """Return a copy of `PARAMETERS` updated with the given settings"""
+    parameters = copy.deepcopy(PARAMETERS)
+    parameters["GeneralSettings"].update(general or {})
+    parameters["System"]["tcc1rs"].update(system or {})
+    parameters["Component"].update(component or {})
+    return parameters
+
+
+@pytest.fixture(name="framework")
+def fixture_framework(aiida_profile_clean):  # pylint: disable=unused-argument
+    """Return the stored TCC1RS framework"""
+    return CifData(file=os.path.join(FILES, "TCC1RS.cif")).store()
+
+
+def add_make_grid(computer, key, exit_status=0):
+    """Store a MakeGrid calculation that ran on `computer` with its remote folder, and return the remote folder"""
+    node = CalcJobNode(computer=computer, process_type="aiida.calculations:raspa")
+    node.set_exit_status(exit_status)
+    node.store()
+    node.base.extras.set(GRID_CACHE_EXTRA, {"tcc1rs": key})
+    remote = RemoteData(computer=computer, remote_path=f"/scratch/{node.uuid}")
+    remote.base.links.add_incoming(node, link_type=LinkType.CREATE, link_label="remote_folder")
+    return remote.store()
+
+
+def test_is_make_grid():
+    """Testing the detection of the grid generation mode"""
+    assert is_make_grid({"GeneralSettings": {"SimulationType": "MakeGrid"}})
+    assert not is_make_grid({"GeneralSettings": {"SimulationType": "MonteCarlo"}})
+
+
+def test_raspa_dir_script(tmp_path):
+    """Testing that the private RASPA directory links everything but the grids of the installation"""
+    share = tmp_path / "raspa" / "share" / "raspa"
+    for folder in ("forcefield", "molecules", "grids"):
+        (share / folder).mkdir(parents=True)
+    workdir = tmp_path / "workdir"
+    (workdir / get_grid_folder("GenericMOFs", "tcc1rs")).mkdir(parents=True)
+
+    script = get_raspa_dir_script() + 'echo "$RASPA_DIR"'
+    env = dict(os.environ, RASPA_DIR=str(tmp_path / "raspa"), RASPA2_DIR="")
+    result = subprocess.run(["bash", "-c", script], cwd=workdir, env=env, check=True, capture_output=True, text=True)
+
+    raspa_dir = workdir / "RaspaDir"
+    assert result.stdout.strip() == str(raspa_dir)
+    assert (raspa_dir / "share" / "raspa" / "forcefield").resolve() == share / "forcefield"
+    assert not (raspa_dir / "share" / "raspa" / "grids").is_symlink()
+    assert (raspa_dir / "share" / "raspa" / "grids" / "GenericMOFs" / "tcc1rs").is_dir()
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"general": {"CutOff": 12.0}},
+        {"general": {"cutoff": "12", "CutOffVDW": 12.0}},
+        {"general": {"ChargeMethod": "Ewald", "UseChargesFromCIFFile": "no"}},
+        {"general": {"GridTypes": ["H", "C"]}},
+        {"general": {"NumberOfCycles": 1000}, "component": {"methane": {"MoleculeDefinition": "TraPPE"}}},
+        {"system": {"UnitCells": "2 2 2", "ExternalTemperature": 300}},
+    ],
+)
+def test_grid_key_unchanged(framework, changes):
+    """Test that the grid key does not depend on how the settings are written, nor on the other settings"""
+    key = get_grid_key(PARAMETERS, "tcc1rs", framework)
+    assert get_grid_key(PARAMETERS, "tcc1rs", framework) == key
+    assert get_grid_key(get_parameters(**changes), "tcc1rs", framework) == key
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"general": {"CutOff": 14}},
+        {"general": {"CutOffVDW": 10}},
+        {"general": {"ChargeMethod": "None"}},
+        {"general": {"Forcefield": "UFF"}},
+        {"general": {"GridTypes": "C H O"}},
+        {"general": {"SpacingVDWGrid": 0.1}},
+        {"system": {"UseChargesFromCIFFile": "yes"}},
+    ],
+)
+def test_grid_key_changed(framework, changes):
+    """Test that the grid key changes with the settings that change the energy grids"""
+    assert get_grid_key(get_parameters(**changes), "tcc1rs", framework) != get_grid_key(PARAMETERS, "tcc1rs", framework)
+
+
+def test_find_cached_grids(framework, aiida_localhost):
+    """Test that the most recent successful MakeGrid calculation on the same computer is found"""
+    frameworks = {"tcc1rs": framework}
+    key = get_grid_key(PARAMETERS, "tcc1rs", framework)
+    other = Computer(label="other", hostname="other", transport_type="core.local", scheduler_type="core.direct").store()
+    assert not find_cached_grids(PARAMETERS, frameworks, aiida_localhost)
+
+    add_make_grid(aiida_localhost, key)
+    latest = add_make_grid(aiida_localhost, key)
+    add_make_grid(aiida_localhost, key, exit_status=1)
+    add_make_grid(aiida_localhost, get_grid_key(get_parameters({"CutOff": 14}), "tcc1rs", framework))
+    add_make_grid(other, key)
+
+    assert find_cached_grids(PARAMETERS, frameworks, aiida_localhost)["tcc1rs"].uuid == latest.uuid
+    assert not find_cached_grids(get_parameters({"CutOff": 10}), frameworks, aiida_localhost)
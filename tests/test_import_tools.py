@@ -0,0 +1,139 @@
+"""Test the import of RASPA simulations run outside of AiiDA"""
+
+import os
+import shutil
+from pathlib import Path
+
+from aiida.orm import Group
+from aiida.plugins import ParserFactory
+
+from aiida_raspa.utils import (
+    IMPORTED_RUN_EXTRA,
+    RaspaInput,
+    find_raspa_runs,
+    import_raspa_runs,
+    parse_input_file,
+    read_raspa_run,
+)
+
+RaspaParser = ParserFactory("raspa")  # pylint: disable=invalid-name
+
+CWD = os.path.dirname(os.path.realpath(__file__))
+
+LEGACY_INPUT = """# methane in IRMOF-1 and in a box
+SimulationType                MonteCarlo
+numberofcycles                2000
+CutOff                        12.0
+UseChargesFromCIFFile         yes
+
+Framework 0
+FrameworkName IRMOF-1
+UnitCells 2 2 2
+ExternalTemperature 298.0
+ExternalPressure 1e5
+
+Box 1
+BoxLengths 30 30 30
+ExternalTemperature 298.0
+
+Component 0 MoleculeName             methane
+            MoleculeDefinition       TraPPE
+            TranslationProbability   0.5
+            CreateNumberOfMolecules  0 20
+            BlockPockets             yes no
+            BlockPocketsFileName     IRMOF-1 none
+"""
+
+
+def test_parse_input_file():
+    """Test that a RASPA input file is converted into parameters"""
+    parameters, system_names = parse_input_file(LEGACY_INPUT)
+
+    assert system_names == ["IRMOF-1", "box_1"]
+    assert parameters["GeneralSettings"] == {
+        "SimulationType": "MonteCarlo",
+        "NumberOfCycles": 2000,
+        "CutOff": 12.0,
+        "UseChargesFromCIFFile": "yes",
+    }
+    assert parameters["System"]["IRMOF-1"] == {
+        "type": "Framework",
+        "UnitCells": "2 2 2",
+        "ExternalTemperature": 298.0,
+        "ExternalPressure": 1e5,
+    }
+    assert parameters["System"]["box_1"]["type"] == "Box"
+    assert parameters["Component"]["methane"]["CreateNumberOfMolecules"] == {"IRMOF-1": 0, "box_1": 20}
+    assert parameters["Component"]["methane"]["BlockPocketsFileName"] == {"IRMOF-1": "IRMOF-1", "box_1": None}
+    assert "BlockPockets" not in parameters["Component"]["methane"]
+
+
+def test_parse_rendered_input():
+    """Test that converting a rendered input file gives back the same input file"""
+    rendered = RaspaInput(parse_input_file(LEGACY_INPUT)[0]).render()
+    assert RaspaInput(parse_input_file(rendered)[0]).render() == rendered
+
+
+def test_read_raspa_run(tmp_path):
+    """Test that a finished simulation is found and read"""
+    run_dir = tmp_path / "runs" / "widom"
+    (run_dir / "Output" / "System_0").mkdir(parents=True)
+    (run_dir / "simulation.input").write_text(
+        "SimulationType MonteCarlo\nFramework 0\nFrameworkName tcc1rs\nComponent 0 MoleculeName H2\n"
+    )
+    shutil.copy(Path(CWD, "outputs", "widom_insertion.out"), run_dir / "Output" / "System_0" / "output.data")
+    (tmp_path / "runs" / "not_a_run").mkdir()
+
+    assert find_raspa_runs([tmp_path]) == [str(run_dir)]
+    result = read_raspa_run(run_dir)
+    assert result["exit_status"] == 0
+    assert result["output_parameters"]["tcc1rs"]["components"]["H2"]["henry_coefficient_average"] == 11.6428
+    assert result["frameworks"] == {}
+
+
+def write_run(run_dir, temperature):
+    """Write a finished simulation of methane in TCC1RS and in a box, the framework comes first in the input file"""
+    (run_dir / "Output" / "System_0").mkdir(parents=True)
+    (run_dir / "Output" / "System_1").mkdir(parents=True)
+    (run_dir / "Restart" / "System_0").mkdir(parents=True)
+    (run_dir / "simulation.input").write_text(
+        "SimulationType MonteCarlo\nNumberOfCycles 2000\n"
+        f"Framework 0\nFrameworkName tcc1rs\nExternalTemperature {temperature}\n"
+        f"Box 1\nBoxLengths 30 30 30\nExternalTemperature {temperature}\n"
+        "Component 0 MoleculeName methane\nCreateNumberOfMolecules 0 10\n"
+    )
+    shutil.copy(Path(CWD, os.pardir, "examples", "files", "TCC1RS.cif"), run_dir / "tcc1rs.cif")
+    for system_id, name in enumerate(["tcc1rs", "box"]):
+        shutil.copy(Path(CWD, "outputs", "one_component.out"), run_dir / "Output" / f"System_{system_id}" / name)
+    (run_dir / "Restart" / "System_0" / "restart_tcc1rs").write_text("restart")
+
+
+def test_import_raspa_runs(aiida_profile_clean, tmp_path):  # pylint: disable=unused-argument
+    """Test that the simulations are imported once, with the systems numbered in the order of `RaspaCalculation`"""
+    write_run(tmp_path / "t298", 298.0)
+    write_run(tmp_path / "t350", 350.0)
+    group = Group("imported").store()
+
+    nodes = import_raspa_runs([tmp_path], group=group, max_workers=1)
+
+    assert sorted(node.base.extras.get(IMPORTED_RUN_EXTRA) for node in nodes) == [
+        str(tmp_path / "t298"),
+        str(tmp_path / "t350"),
+    ]
+    assert len(group.nodes) == 2
+    # the identical CIF files are stored once
+    assert len({node.inputs.framework.tcc1rs.pk for node in nodes}) == 1
+
+    node = nodes[0]
+    assert node.exit_status == 0
+    assert node.base.extras.get("system_order") == ["box_1", "tcc1rs"]
+    repository = node.outputs.retrieved.base.repository
+    assert repository.list_object_names("Output/System_0") == ["box"]
+    assert repository.list_object_names("Output/System_1") == ["tcc1rs"]
+    assert repository.list_object_names("Restart/System_1") == ["restart_tcc1rs"]
+    results, calcfunction = RaspaParser.parse_from_node(node, store_provenance=False)
+    assert calcfunction.exit_status == 0
+    assert set(results["output_parameters"].get_dict()) == {"box_1", "tcc1rs"}
+
+    # the directories that were imported before are skipped
+    assert not import_raspa_runs([tmp_path], max_workers=1)
@@ -89,3 +89,75 @@ Component 0 MoleculeName methane
    TranslationProbability 0.5
 """
     )
+
+
+def test_render_does_not_modify_input():
+    """Test that rendering leaves the parameters unchanged and can be repeated"""
+    inp_dict = {
+        "GeneralSettings": {"SimulationType": "MonteCarlo", "NumberOfCycles": 400},
+        "System": {
+            "irmof_1": {"type": "Framework", "UnitCells": [1, 1, 1]},
+            "box": {"type": "Box", "BoxLengths": "25 25 25"},
+        },
+        "Component": {
+            "methane": {
+                "MoleculeDefinition": "TraPPE",
+                "CreateNumberOfMolecules": {"irmof_1": 0, "box": 10},
+                "BlockPocketsFileName": {"irmof_1": "irmof_1", "box": None},
+            }
+        },
+    }
+    inp = RaspaInput(inp_dict)
+    inp.params["GeneralSettings"]["NumberOfCycles"] = 800
+    assert inp_dict["GeneralSettings"]["NumberOfCycles"] == 400
+
+    rendered = inp.render()
+    assert inp.render() == rendered
+    assert inp.params["Component"]["methane"]["CreateNumberOfMolecules"] == {"irmof_1": 0, "box": 10}
+    assert inp.params["System"]["box"]["type"] == "Box"
+    assert "   CreateNumberOfMolecules 10 0\n" in rendered
+    assert "   BlockPockets no yes\n" in rendered
+    assert "   BlockPocketsFileName - irmof_1\n" in rendered
+
+
+def test_compiled_template():
+    """Test that a compiled template renders the same input files as the parameters"""
+    inp_dict = {
+        "GeneralSettings": {"SimulationType": "MonteCarlo", "NumberOfCycles": 400},
+        "System": {
+            "irmof_1": {"type": "Framework", "UnitCells": [1, 1, 1], "ExternalTemperature": 298.0},
+            "box": {"type": "Box", "BoxLengths": "25 25 25"},
+        },
+        "Component": {
+            "methane": {
+                "MoleculeDefinition": "TraPPE",
+                "CreateNumberOfMolecules": {"irmof_1": 0, "box": 10},
+                "BlockPocketsFileName": {"irmof_1": "irmof_1", "box": None},
+            }
+        },
+    }
+    paths = [
+        ("System", "irmof_1", "ExternalPressure"),
+        ("System", "irmof_1", "ExternalTemperature"),
+        ("GeneralSettings", "RestartFile"),
+        ("Component", "methane", "FugacityCoefficient"),
+    ]
+    template = RaspaInput(inp_dict).compile(paths)
+    for values in [(1e5, 298.0, False, 1), (5e-3, 350, True, [0.9])]:
+        inp = RaspaInput(inp_dict)
+        for (section, *path), value in zip(paths, values):
+            params = inp.params[section]
+            for key in path[:-1]:
+                params = params[key]
+            params[path[-1]] = value
+        assert template.render(*values) == inp.render()
+    assert "ExternalPressure" not in inp_dict["System"]["irmof_1"]
+
+    with pytest.raises(ValueError):
+        template.render(1e5)
+    with pytest.raises(ValueError):
+        RaspaInput(inp_dict).compile([("System", "irmof_1", "type")])
+    with pytest.raises(ValueError):
+        RaspaInput(inp_dict).compile([("Component", "methane", "CreateNumberOfMolecules")])
+    with pytest.raises(ValueError):
+        RaspaInput(inp_dict).compile([("System", "irmof_2", "ExternalPressure")])
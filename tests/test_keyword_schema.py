@@ -0,0 +1,52 @@
+"""Test the validation of the RASPA keywords"""
+
+from aiida_raspa.utils import validate_keywords
+
+
+def get_parameters():
+    return {
+        "GeneralSettings": {
+            "SimulationType": "MonteCarlo",
+            "NumberOfCycles": 2000,
+            "numberofinitializationcycles": "1000",
+            "CutOff": 12.0,
+            "Forcefield": "GenericMOFs",
+            "RemoveAtomNumberCodeFromLabel": True,
+        },
+        "System": {
+            "irmof_1": {
+                "type": "Framework",
+                "UnitCells": [1, 1, 1],
+                "ExternalTemperature": 298,
+                "UseChargesFromCIF": "no",
+            },
+            "box": {"type": "Box", "BoxLengths": "25 25 25"},
+        },
+        "Component": {
+            "methane": {
+                "MoleculeDefinition": "TraPPE",
+                "WidomProbability": 1,
+                "CreateNumberOfMolecules": {"irmof_1": 0, "box": 10},
+            }
+        },
+    }
+
+
+def test_valid_parameters():
+    """Case-insensitive keywords with values given as strings, numbers and lists are accepted."""
+    parameters = get_parameters()
+    del parameters["System"]["irmof_1"]["UseChargesFromCIF"]
+    assert validate_keywords(parameters) is None
+
+
+def test_invalid_parameters():
+    """Unknown keywords, keywords in the wrong section and values of the wrong type are reported."""
+    parameters = get_parameters()
+    parameters["GeneralSettings"]["NumberOfCycles"] = 2000.5
+    parameters["Component"]["methane"]["CutOff"] = 12.0
+    errors = validate_keywords(parameters).splitlines()
+    assert errors == [
+        "GeneralSettings: the value 2000.5 of 'NumberOfCycles' should be of type int.",
+        "System 'irmof_1': unknown keyword 'UseChargesFromCIF', did you mean 'UseChargesFromCIFFile'?",
+        "Component 'methane': 'CutOff' is not a keyword of the Component section.",
+    ]
@@ -0,0 +1,26 @@
+"""Test the task-farm launcher script"""
+
+import stat
+import subprocess
+
+from aiida_raspa.utils import LAUNCHER_SCRIPT, get_launcher_script
+
+
+def test_launcher_script(tmp_path):
+    """Test that the launcher runs the executable once in every task directory"""
+    executable = tmp_path / "fake_raspa"
+    executable.write_text('#!/bin/bash\ncat "$1" > result\n[ "$(cat "$1")" = ok ]\n')
+    executable.chmod(executable.stat().st_mode | stat.S_IEXEC)
+
+    tasks = ["task_a", "task_b", "task_c"]
+    for task in tasks:
+        (tmp_path / task).mkdir()
+        (tmp_path / task / "simulation.input").write_text("fail" if task == "task_b" else "ok")
+    (tmp_path / LAUNCHER_SCRIPT).write_text(get_launcher_script(tasks))
+
+    subprocess.run(["bash", LAUNCHER_SCRIPT, str(executable), "2"], cwd=tmp_path, check=True)
+
+    for task in tasks:
+        assert (tmp_path / task / "result").exists()
+    assert (tmp_path / "task_a" / "exit_status").read_text().strip() == "0"
+    assert (tmp_path / "task_b" / "exit_status").read_text().strip() == "1"
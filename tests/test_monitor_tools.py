@@ -0,0 +1,82 @@
+"""Test the tools that follow the averages of a running RASPA simulation"""
+
+import pytest
+from aiida.orm import Dict
+from aiida.plugins import WorkflowFactory
+
+from aiida_raspa.calculations.monitors import _get_max_relative_error
+from aiida_raspa.utils import (
+    block_average,
+    get_complete_output,
+    get_running_results,
+    parse_running_loadings,
+)
+
+RaspaBaseWorkChain = WorkflowFactory("raspa.base")  # pylint: disable=invalid-name
+
+
+def test_running_loadings(read_output):
+    """Test that only the production blocks are read"""
+    assert parse_running_loadings(read_output("one_component.out")) == (200, {"methane": [13.0, 12.0]})
+    assert parse_running_loadings(read_output("two_components.out")) == (
+        200,
+        {"butane": [0.0, 0.0], "propane": [0.0, 0.0]},
+    )
+
+
+def test_incomplete_output(read_output):
+    """Test that the last block of a running simulation is read only once it is complete"""
+    output_contents = read_output("one_component.out")
+    start = output_contents.index("\nCurrent cycle: 200")
+    partial = output_contents[: start + 500]
+
+    assert get_complete_output(partial) == output_contents[:start]
+    assert parse_running_loadings(partial) == (0, {"methane": [13.0]})
+    assert get_complete_output("[Init] Current cycle: 0 out of 200\n") == ""
+
+
+def test_output_offsets(read_output):
+    """Test that the output is read in parts, without reading the initialization blocks again"""
+    output_contents = read_output("one_component.out")
+    init = output_contents.index("[Init] Current cycle: 0")
+    assert get_complete_output(output_contents[: init + 500]) == output_contents[: init - 1]
+
+    # the offsets of the convergence monitor, polling the output file while it is written
+    offset, loadings = 0, []
+    for size in range(init + 500, len(output_contents) + 1000, 1000):
+        complete_output = get_complete_output(output_contents[offset:size])
+        offset += len(complete_output)
+        loadings += parse_running_loadings(complete_output)[1].get("methane", [])
+        if size < output_contents.index("\nCurrent cycle: 0"):
+            assert offset >= init - 1
+    assert loadings == [13.0]
+
+
+def test_block_average():
+    """Test the block average and its 95% confidence interval as computed by RASPA"""
+    average, dev = block_average([1.0, 1.0, 2.0, 2.0, 3.0, 3.0, 4.0, 4.0, 5.0, 5.0])
+    assert average == pytest.approx(3.0)
+    assert dev == pytest.approx(2.776 * (2.5 / 5) ** 0.5)
+    assert block_average([1.0] * 4) == (None, None)
+
+
+def test_running_results(read_output):
+    """Test the results of a simulation stopped before the end"""
+    results = get_running_results(read_output("one_component.out"))
+    assert results["general"] == {"stopped_early": True, "number_of_cycles_completed": 200}
+    assert results["components"]["methane"]["loading_absolute_average"] is None
+
+
+def test_max_relative_error():
+    """Test that the error is estimated once every component printed `min_samples` loadings"""
+    loadings = {"0_methane": [1.0, 1.0, 2.0, 2.0, 3.0, 3.0, 4.0, 4.0, 5.0, 5.0], "0_ethane": [2.0] * 10}
+    assert _get_max_relative_error(loadings, 10) == pytest.approx(2.776 * (2.5 / 5) ** 0.5 / 3.0)
+    assert _get_max_relative_error(loadings, 11) is None
+    assert _get_max_relative_error({}, 10) is None
+
+
+@pytest.mark.parametrize("min_samples", [0, 2.5])
+def test_invalid_min_samples(min_samples):
+    """Test that the `min_samples` of the convergence monitor is a positive integer"""
+    message = RaspaBaseWorkChain.validate_convergence_settings(Dict({"min_samples": min_samples}), None)
+    assert message == "The `min_samples` should be a positive integer."
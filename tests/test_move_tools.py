@@ -0,0 +1,68 @@
+"""Test the tools that tune the move probabilities"""
+
+import pytest
+
+from aiida_raspa.utils import (
+    get_collapsed_swaps,
+    get_tuned_probabilities,
+    parse_move_statistics,
+    tune_parameters,
+    use_cbcf_swap_moves,
+)
+
+
+def test_move_statistics(read_output):
+    """Test that the tried and accepted moves and their CPU time are read for every component"""
+    statistics = parse_move_statistics(read_output("two_components.out"))
+
+    assert set(statistics) == {"butane", "propane"}
+    assert statistics["butane"]["swap"]["tried"] == 1319 + 1237
+    assert statistics["butane"]["swap"]["accepted"] == 89 + 89
+    assert statistics["propane"]["reinsertion"]["acceptance"] == pytest.approx(1515 / 1571)
+    assert statistics["propane"]["translation"]["cpu_time"] > 0
+    assert not parse_move_statistics(read_output("widom_insertion.out"))
+
+
+def test_tuned_probabilities(read_output):
+    """Test that the moves that accept more moves per CPU second get a larger probability"""
+    statistics = parse_move_statistics(read_output("one_component.out"))["methane"]
+    component = {"TranslationProbability": 0.5, "ReinsertionProbability": 0.5, "SwapProbability": 1.0}
+
+    tuned = get_tuned_probabilities(component, statistics)
+    assert sum(tuned.values()) == pytest.approx(2.0, rel=1e-3)
+    assert tuned["TranslationProbability"] > tuned["SwapProbability"] > tuned["ReinsertionProbability"]
+
+    # the swap and the reinsertion get the minimum fraction
+    tuned = get_tuned_probabilities(component, statistics, min_fraction=0.4)
+    assert tuned["ReinsertionProbability"] == tuned["SwapProbability"]
+    assert tuned["TranslationProbability"] > tuned["SwapProbability"]
+
+    # the moves without statistics keep their probability
+    parameters = {"Component": {"methane": dict(component, WidomProbability=1.0)}}
+    output_parameters = {"system": {"components": {"methane": {"move_statistics": statistics}}}}
+    tuned = tune_parameters(parameters, output_parameters)["Component"]["methane"]
+    assert tuned["WidomProbability"] == 1.0
+    assert parameters["Component"]["methane"]["TranslationProbability"] == 0.5
+
+
+def test_collapsed_swaps(read_output):
+    """Test that the swap moves hardly ever accepted are replaced by CB/CFCMC swap moves"""
+    statistics = parse_move_statistics(read_output("two_components.out"))
+    output_parameters = {
+        "system": {"components": {name: {"move_statistics": values} for name, values in statistics.items()}}
+    }
+    parameters = {
+        "Component": {
+            "butane": {"SwapProbability": 1.0, "TranslationProbability": 0.5},
+            "propane": {"SwapProbability": 1.0, "TranslationProbability": 0.5},
+        }
+    }
+
+    assert not get_collapsed_swaps(parameters, output_parameters)
+    assert "butane" in get_collapsed_swaps(parameters, output_parameters, min_acceptance=0.1)
+    assert not get_collapsed_swaps(parameters, output_parameters, min_acceptance=0.1, min_tried=1e6)
+
+    modified = use_cbcf_swap_moves(parameters, ["butane"])
+    assert modified["Component"]["butane"] == {"CBCFSwapLambdaProbability": 1.0, "TranslationProbability": 0.5}
+    assert modified["Component"]["propane"] == parameters["Component"]["propane"]
+    assert "SwapProbability" in parameters["Component"]["butane"]
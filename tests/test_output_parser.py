@@ -18,6 +18,12 @@ def test_parse_output_one_cmpnt():
         "exceeded_walltime": False,
         "framework_density": "739.995779685958",
         "framework_density_unit": "kg/m^3",
+        "number_of_framework_atoms": 768,
+        "cpu_time_unit": "s",
+        "cpu_time_initialization": 1.092585,
+        "cpu_time_equilibration": 0.0,
+        "cpu_time_production": 2.186894,
+        "cpu_time_total": 3.279479,
         "energy_unit": "kJ/mol",
         "energy_host/ads_tot_initial": 0.0,
         "energy_host/ads_vdw_initial": 0.0,
@@ -0,0 +1,129 @@
+"""Test the parsing of the retrieved folder of a RASPA calculation"""
+
+import os
+
+from aiida.orm import Dict
+from aiida.plugins import CalculationFactory, ParserFactory
+
+from aiida_raspa.utils import RETRIEVAL_POLICY_LOG
+
+RaspaCalculation = CalculationFactory("raspa")  # pylint: disable=invalid-name
+RaspaParser = ParserFactory("raspa")  # pylint: disable=invalid-name
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+
+
+def get_parameters(systems):
+    """Return the parameters of a GCMC simulation of methane in `systems`"""
+    return Dict(
+        {
+            "GeneralSettings": {"SimulationType": "MonteCarlo", "NumberOfCycles": 2000, "CutOff": 12.0},
+            "System": {name: {"type": "Framework", "UnitCells": "1 1 1"} for name in systems},
+            "Component": {"methane": {"MoleculeDefinition": "TraPPE", "SwapProbability": 1.0}},
+        }
+    )
+
+
+def test_single_replica(generate_calc_job_node, read_output):
+    """Test that the systems of a single replica are read from the working directory"""
+    output_contents = read_output("one_component.out")
+    node = generate_calc_job_node(
+        "raspa",
+        {"parameters": get_parameters(["box_1", "tcc1rs"])},
+        {
+            "Output/System_0/output_box_1.data": output_contents,
+            "Output/System_1/output_tcc1rs.data": output_contents,
+        },
+    )
+
+    results, calcfunction = RaspaParser.parse_from_node(node, store_provenance=False)
+
+    assert calcfunction.exit_status == 0
+    assert set(results["output_parameters"].get_dict()) == {"box_1", "tcc1rs"}
+    assert "number_of_replicas" not in results["output_parameters"]["tcc1rs"]["general"]
+    assert results["warnings"].get_list() == []
+
+
+def test_replicas(generate_calc_job_node, read_output):
+    """Test that the replicas are merged into one estimate of the averages"""
+    output_contents = read_output("one_component.out")
+    replica_dirs = RaspaCalculation.get_replica_folders(2)
+    node = generate_calc_job_node(
+        "raspa",
+        {"parameters": get_parameters(["tcc1rs"]), "settings": Dict({"replicas": 2})},
+        {f"{replica_dir}/Output/System_0/output_tcc1rs.data": output_contents for replica_dir in replica_dirs},
+    )
+
+    results, calcfunction = RaspaParser.parse_from_node(node, store_provenance=False)
+
+    assert calcfunction.exit_status == 0
+    assert results["output_parameters"]["tcc1rs"]["general"]["number_of_replicas"] == 2
+    single = RaspaParser.parse_from_node(
+        generate_calc_job_node(
+            "raspa",
+            {"parameters": get_parameters(["tcc1rs"])},
+            {"Output/System_0/output_tcc1rs.data": output_contents},
+        ),
+        store_provenance=False,
+    )[0]["output_parameters"]["tcc1rs"]
+    merged = results["output_parameters"]["tcc1rs"]["components"]["methane"]
+    assert merged["loading_absolute_average"] == single["components"]["methane"]["loading_absolute_average"]
+
+
+def test_stages(generate_calc_job_node, read_output):
+    """Test that the results of every stage are reported, the last one is also the main output"""
+    output_contents = read_output("one_component.out")
+    stages = [{"name": "equilibration"}, {"name": "production"}]
+    node = generate_calc_job_node(
+        "raspa",
+        {"parameters": get_parameters(["tcc1rs"]), "settings": Dict({"stages": stages})},
+        {
+            f"{RaspaCalculation.get_stage_folders(2)[0]}/Output/System_0/output_tcc1rs.data": output_contents,
+            "Output/System_0/output_tcc1rs.data": output_contents,
+        },
+    )
+
+    results, calcfunction = RaspaParser.parse_from_node(node, store_provenance=False)
+
+    assert calcfunction.exit_status == 0
+    assert set(results["stage_output_parameters"]) == {"equilibration", "production"}
+    stage_results = results["stage_output_parameters"]["equilibration"]["tcc1rs"]
+    assert stage_results["components"] == results["output_parameters"]["tcc1rs"]["components"]
+
+
+def test_stage_not_finished(generate_calc_job_node, read_output):
+    """Test that a stage that did not finish is reported as a timeout"""
+    output_contents = read_output("one_component.out")
+    unfinished = output_contents[: output_contents.index("Simulation finished")]
+    node = generate_calc_job_node(
+        "raspa",
+        {"parameters": get_parameters(["tcc1rs"]), "settings": Dict({"stages": [{"name": "equilibration"}, {}]})},
+        {
+            f"{RaspaCalculation.get_stage_folders(2)[0]}/Output/System_0/output_tcc1rs.data": unfinished,
+            "Output/System_0/output_tcc1rs.data": output_contents,
+        },
+    )
+
+    _, calcfunction = RaspaParser.parse_from_node(node, store_provenance=False)
+
+    assert calcfunction.exit_status == RaspaCalculation.exit_codes.TIMEOUT.status
+
+
+def test_retrieval_policy_warnings(generate_calc_job_node, read_output):
+    """Test that the files held back by the retrieval policy are reported in the warnings"""
+    node = generate_calc_job_node(
+        "raspa",
+        {"parameters": get_parameters(["tcc1rs"]), "settings": Dict({"retrieval_policy": {"max_file_size": 100}})},
+        {
+            "Output/System_0/output_tcc1rs.data": read_output("one_component.out"),
+            RETRIEVAL_POLICY_LOG: "excluded Movies/System_0/frame.pdb\nskipped VTK/grid.vtk\n",
+        },
+    )
+
+    results, calcfunction = RaspaParser.parse_from_node(node, store_provenance=False)
+
+    assert calcfunction.exit_status == 0
+    assert results["warnings"].get_list() == [
+        ("retrieval_policy", "Movies/System_0/frame.pdb was excluded by the retrieval policy"),
+        ("retrieval_policy", "VTK/grid.vtk was skipped by the retrieval policy"),
+    ]
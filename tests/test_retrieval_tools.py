@@ -0,0 +1,48 @@
+"""Test the retrieval policy tools"""
+
+import subprocess
+
+import pytest
+
+from aiida_raspa.utils import (
+    get_retrieval_policy,
+    get_retrieval_policy_script,
+    parse_retrieval_policy_log,
+)
+
+
+def test_retrieval_policy_validation():
+    """Test that a wrong retrieval policy is rejected"""
+    with pytest.raises(ValueError) as excinfo:
+        get_retrieval_policy({"max_size": 10})
+    assert "Unknown key(s)" in str(excinfo)
+
+    with pytest.raises(ValueError) as excinfo:
+        get_retrieval_policy({"oversize_action": "compress"})
+    assert "either 'skip' or 'truncate'" in str(excinfo)
+
+    assert get_retrieval_policy({"exclude": ["VTK*"]})["oversize_action"] == "skip"
+
+
+def test_retrieval_policy_script(tmp_path):
+    """Test that the script withholds the excluded and oversized files"""
+    (tmp_path / "Output" / "System_0").mkdir(parents=True)
+    (tmp_path / "Output" / "System_0" / "output.data").write_text("x" * 1000 + "Simulation finished\n")
+    (tmp_path / "Restart" / "System_0").mkdir(parents=True)
+    (tmp_path / "Restart" / "System_0" / "restart").write_text("x" * 1000)
+    (tmp_path / "Movies").mkdir()
+    (tmp_path / "Movies" / "frame.pdb").write_text("x")
+    (tmp_path / "Movies" / "frames.xyz").write_text("x" * 1000)
+
+    policy = get_retrieval_policy({"exclude": ["Movies/*.pdb"], "max_file_size": 100})
+    script = get_retrieval_policy_script(
+        policy, ["Output", "Restart", "Movies"], ["Output/System_*/*", "Restart/System_*/*"]
+    )
+    subprocess.run(["bash", "-c", script], cwd=tmp_path, check=True)
+
+    log = parse_retrieval_policy_log((tmp_path / "retrieval_policy.log").read_text())
+    assert log == {"excluded": ["Movies/frame.pdb"], "skipped": ["Movies/frames.xyz"], "truncated": []}
+    assert (tmp_path / "Output" / "System_0" / "output.data").exists()
+    assert (tmp_path / "Restart" / "System_0" / "restart").exists()
+    assert (tmp_path / "Withheld" / "Movies" / "frame.pdb").exists()
+    assert (tmp_path / "Withheld" / "Movies" / "frames.xyz").exists()
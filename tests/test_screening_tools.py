@@ -0,0 +1,87 @@
+"""Test the tools to build screenings over frameworks and conditions"""
+
+import os
+
+from aiida.orm import Dict
+from aiida.plugins import DataFactory
+
+from aiida_raspa.utils import get_screening_builders, get_screening_parameters
+from aiida_raspa.utils.screening_tools import _get_parameters_nodes
+
+CifData = DataFactory("core.cif")  # pylint: disable=invalid-name
+
+FILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "examples", "files")
+
+
+def test_screening_parameters():
+    """Test the parameters of one framework at one condition"""
+    general_settings = {"SimulationType": "MonteCarlo", "NumberOfCycles": 1000}
+    components = {"methane": {"MoleculeDefinition": "TraPPE", "SwapProbability": 1.0}}
+    system_settings = {"UseChargesFromCIFFile": "yes", "ExternalPressure": 0}
+
+    parameters = get_screening_parameters(general_settings, components, "irmof_1", (298, "1e5"), system_settings)
+
+    assert parameters == {
+        "GeneralSettings": general_settings,
+        "System": {
+            "irmof_1": {
+                "type": "Framework",
+                "UseChargesFromCIFFile": "yes",
+                "ExternalTemperature": 298.0,
+                "ExternalPressure": 100000.0,
+            }
+        },
+        "Component": components,
+    }
+    assert system_settings["ExternalPressure"] == 0
+
+
+def test_parameters_nodes(aiida_profile_clean):  # pylint: disable=unused-argument
+    """Test that identical parameters share one node, also with a node stored before"""
+    stored = Dict({"GeneralSettings": {"NumberOfCycles": 1000}}).store()
+
+    nodes = _get_parameters_nodes(
+        [
+            {"GeneralSettings": {"NumberOfCycles": 1000}},
+            {"GeneralSettings": {"NumberOfCycles": 2000}},
+            {"GeneralSettings": {"NumberOfCycles": 2000}},
+        ]
+    )
+
+    assert nodes[0].pk == stored.pk
+    assert nodes[1].is_stored
+    assert nodes[1].pk == nodes[2].pk != stored.pk
+
+
+def test_screening_builders(aiida_profile_clean, fake_raspa_code):  # pylint: disable=unused-argument
+    """Test that the builders share the frameworks, the files and the identical parameters"""
+    frameworks = {
+        "tcc1rs": CifData(file=os.path.join(FILES, "TCC1RS.cif")),
+        "irmof_1": CifData(file=os.path.join(FILES, "IRMOF-1.cif")),
+    }
+    files = {"methane_def": os.path.join(FILES, "CO2.def")}
+    conditions = [(298, 1e5), (298, "100000")]
+
+    builders = list(
+        get_screening_builders(
+            fake_raspa_code,
+            frameworks,
+            {"methane": {"MoleculeDefinition": "TraPPE"}},
+            conditions,
+            {"SimulationType": "MonteCarlo"},
+            files=files,
+            chunk_size=3,
+        )
+    )
+
+    assert [builder.metadata.label for builder in builders] == [
+        "tcc1rs_298K_100000Pa",
+        "tcc1rs_298K_100000Pa",
+        "irmof_1_298K_100000Pa",
+        "irmof_1_298K_100000Pa",
+    ]
+    assert all(framework.is_stored for framework in frameworks.values())
+    assert len({builder.raspa.file["methane_def"].pk for builder in builders}) == 1
+    # the equivalent conditions give identical parameters, within a chunk and across the chunks
+    parameters_pks = [builder.raspa.parameters.pk for builder in builders]
+    assert parameters_pks[0] == parameters_pks[1] != parameters_pks[2] == parameters_pks[3]
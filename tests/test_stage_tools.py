@@ -0,0 +1,111 @@
+"""Test the tools that run several RASPA stages within one job"""
+
+import stat
+import subprocess
+
+import pytest
+
+from aiida_raspa.utils import (
+    STAGE_LOG,
+    STAGE_SCRIPT,
+    get_remaining_stages,
+    get_restart_filename,
+    get_stage_parameters,
+    get_stage_script,
+    parse_stage_log,
+)
+
+PARAMETERS = {
+    "GeneralSettings": {"SimulationType": "MonteCarlo", "NumberOfCycles": 1000},
+    "System": {"irmof_1": {"type": "Framework", "UnitCells": "1 1 1", "ExternalTemperature": 298.0}},
+    "Component": {"methane": {"TranslationProbability": 1.0, "CreateNumberOfMolecules": 10}},
+}
+
+
+def test_stage_parameters():
+    """Test that the stages override the parameters and continue from the previous stage"""
+    stages = [
+        {"name": "equilibration", "parameters": {"GeneralSettings": {"NumberOfCycles": 0}}},
+        {"parameters": {"System": {"irmof_1": {"ExternalTemperature": 350.0}}}},
+    ]
+    stage_parameters = get_stage_parameters(PARAMETERS, stages)
+    assert len(stage_parameters) == 2
+    equilibration, production = stage_parameters[0], stage_parameters[1]
+
+    assert equilibration["GeneralSettings"] == {"SimulationType": "MonteCarlo", "NumberOfCycles": 0}
+    assert equilibration["Component"]["methane"]["CreateNumberOfMolecules"] == 10
+    assert production["GeneralSettings"]["RestartFile"] is True
+    assert production["System"]["irmof_1"]["ExternalTemperature"] == 350.0
+    assert production["Component"]["methane"]["CreateNumberOfMolecules"] == 0
+    assert PARAMETERS["System"]["irmof_1"]["ExternalTemperature"] == 298.0
+
+
+def test_remaining_stages():
+    """Test that the interrupted stage keeps starting from the restart of the last finished stage"""
+    stages = [
+        {"name": "equilibration", "parameters": {"GeneralSettings": {"NumberOfCycles": 0}}},
+        {"name": "production"},
+        {"parameters": {"System": {"irmof_1": {"ExternalTemperature": 350.0}}}},
+    ]
+    assert get_remaining_stages(PARAMETERS, stages, []) == [
+        stages[0],
+        stages[1],
+        {"name": "stage_2", "parameters": {"System": {"irmof_1": {"ExternalTemperature": 350.0}}}},
+    ]
+
+    remaining = get_remaining_stages(PARAMETERS, stages, ["equilibration"])
+    assert [stage["name"] for stage in remaining] == ["production", "stage_2"]
+    production = get_stage_parameters(PARAMETERS, remaining)[0]
+    assert production["GeneralSettings"]["RestartFile"] is True
+    assert production["Component"]["methane"]["CreateNumberOfMolecules"] == 0
+    assert "parameters" not in stages[1]
+
+
+@pytest.mark.parametrize(
+    "stages",
+    [
+        [],
+        [{"name": "equilibration", "cycles": 100}],
+        [{"name": "production"}, {"name": "production"}],
+        [{"name": "2nd"}],
+        [{"parameters": {"Component": {"ethane": {"TranslationProbability": 1.0}}}}],
+    ],
+)
+def test_invalid_stages(stages):
+    """Test that badly defined stages are rejected"""
+    with pytest.raises(ValueError):
+        get_stage_parameters(PARAMETERS, stages)
+
+
+def test_restart_filename():
+    """Test the name of the restart file that RASPA reads"""
+    assert get_restart_filename("irmof_1", PARAMETERS["System"]["irmof_1"]) == "restart_irmof_1_1.1.1_298.000000_0"
+    box = {"type": "Box", "ExternalTemperature": 300, "ExternalPressure": "1e5"}
+    assert get_restart_filename("box_25", box) == "restart_Box_1.1.1_300.000000_100000"
+
+
+def test_stage_script(tmp_path):
+    """Test that the stage script runs the stages one after another and passes on the restart files"""
+    executable = tmp_path / "fake_raspa"
+    executable.write_text(
+        "#!/bin/bash\n"
+        "mkdir -p Output/System_0 Restart/System_0\n"
+        'cat "$2" RestartInitial/System_0/* > Output/System_0/output 2> /dev/null || true\n'
+        'cp "$2" Restart/System_0/restart_stage\n'
+    )
+    executable.chmod(executable.stat().st_mode | stat.S_IEXEC)
+
+    for stage_dir in ["Stage_0", "Stage_1"]:
+        (tmp_path / stage_dir).mkdir()
+        (tmp_path / stage_dir / "simulation.input").write_text(f"{stage_dir}\n")
+    (tmp_path / STAGE_SCRIPT).write_text(
+        get_stage_script(["Stage_0", "Stage_1"], ["equilibration", "production"], [["initial"], ["restart_next"]])
+    )
+
+    subprocess.run(["bash", STAGE_SCRIPT, str(executable)], cwd=tmp_path, check=True)
+
+    assert (tmp_path / "Stage_0" / "Output" / "System_0" / "output").read_text() == "Stage_0\n"
+    assert (tmp_path / "Stage_0" / "Restart" / "System_0" / "restart_stage").exists()
+    assert (tmp_path / "RestartInitial" / "System_0" / "restart_next").read_text() == "Stage_0\n"
+    assert (tmp_path / "Output" / "System_0" / "output").read_text() == "Stage_1\nStage_0\n"
+    assert parse_stage_log((tmp_path / STAGE_LOG).read_text()) == ["equilibration", "production"]
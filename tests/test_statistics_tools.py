@@ -0,0 +1,92 @@
+"""Test the tools that combine the results of independent simulations"""
+
+import os
+from math import sqrt
+from pathlib import Path
+
+import pytest
+
+from aiida_raspa.utils import (
+    combine_averages,
+    estimate_required_cycles,
+    get_running_results,
+    merge_output_parameters,
+    merge_production_segments,
+    parse_base_output,
+)
+
+CWD = os.path.dirname(os.path.realpath(__file__))
+
+
+def test_combine_averages():
+    """Testing the combination of independent averages and their errors"""
+    average, dev = combine_averages([1.0, 3.0], [0.4, 0.4])
+    assert average == pytest.approx(2.0)
+    assert dev == pytest.approx(0.4 / sqrt(2))
+
+    average, dev = combine_averages([1.0, 4.0], [0.3, 0.6], weights=[2, 1])
+    assert average == pytest.approx(2.0)
+    assert dev == pytest.approx(sqrt(0.6**2 + 0.6**2) / 3)
+
+    assert combine_averages([1.0, None], [0.1, None]) == (None, None)
+
+
+def test_merge_output_parameters():
+    """Testing the merge of the results of two replicas of the same system"""
+
+    with Path(CWD, "outputs/one_component.out").open("r", encoding="utf-8") as handle:
+        parsed_parameters = parse_base_output(handle.read(), system_name="system1", ncomponents=1)[0]
+
+    merged = merge_output_parameters([parsed_parameters, parsed_parameters])
+    component = merged["components"]["methane"]
+    reference = parsed_parameters["components"]["methane"]
+
+    assert component["loading_absolute_average"] == pytest.approx(reference["loading_absolute_average"])
+    assert component["loading_absolute_dev"] == pytest.approx(reference["loading_absolute_dev"] / sqrt(2))
+    assert component["henry_coefficient_average"] is None
+    assert merged["general"]["framework_density"] == parsed_parameters["general"]["framework_density"]
+
+
+def test_merge_production_segments():
+    """Testing the merge of two production segments of different length"""
+    first = {"system1": {"general": {"temperature": 300}, "components": {"methane": {"loading_absolute_average": 1.0}}}}
+    second = {
+        "system1": {"general": {"temperature": 350}, "components": {"methane": {"loading_absolute_average": 4.0}}}
+    }
+    first["system1"]["components"]["methane"]["loading_absolute_dev"] = 0.3
+    second["system1"]["components"]["methane"]["loading_absolute_dev"] = 0.6
+
+    merged = merge_production_segments([first, second], [2000, 1000])["system1"]
+    assert merged["components"]["methane"]["loading_absolute_average"] == pytest.approx(2.0)
+    assert merged["components"]["methane"]["loading_absolute_dev"] == pytest.approx(sqrt(0.6**2 + 0.6**2) / 3)
+    assert merged["general"] == {
+        "temperature": 350,
+        "number_of_production_segments": 2,
+        "number_of_production_cycles": 3000,
+    }
+
+
+def test_merge_stopped_segment():
+    """Testing the merge of a segment stopped by the convergence monitor, which only reports the loadings"""
+    with Path(CWD, "outputs/one_component.out").open("r", encoding="utf-8") as handle:
+        output_contents = handle.read()
+    full = parse_base_output(output_contents, system_name="system1", ncomponents=1)[0]
+    stopped = get_running_results(output_contents)
+    stopped["components"]["methane"].update(loading_absolute_average=12.0, loading_absolute_dev=1.0)
+
+    merged = merge_production_segments([{"system1": stopped}, {"system1": full}], [1000, 1000])["system1"]
+    component = merged["components"]["methane"]
+    reference = full["components"]["methane"]
+
+    assert component["loading_absolute_average"] == pytest.approx((12.0 + reference["loading_absolute_average"]) / 2)
+    assert component["loading_excess_average"] == reference["loading_excess_average"]
+    assert merged["general"]["number_of_production_segments"] == 2
+
+
+def test_estimate_required_cycles():
+    """Testing the estimate of the cycles needed to reach a target error"""
+    assert estimate_required_cycles(1000, 0.2, 0.1, safety_factor=1.0) == 4000
+    assert estimate_required_cycles(1000, 0.11, 0.1) == 1452
+    assert estimate_required_cycles(1000, 0.05, 0.1, safety_factor=1.0) == 250
+    with pytest.raises(ValueError):
+        estimate_required_cycles(0, 0.2, 0.1)
@@ -0,0 +1,61 @@
+"""Test the tools that choose the simulation cell"""
+
+import os
+
+import numpy as np
+from aiida.plugins import DataFactory
+
+from aiida_raspa.utils import (
+    check_unit_cells,
+    compute_unit_cells,
+    get_perpendicular_widths,
+)
+from aiida_raspa.utils.structure_tools import cell_from_parameters, get_cutoff
+
+
+def test_perpendicular_widths():
+    """Testing the perpendicular widths of a monoclinic cell against the values reported by RASPA"""
+    cell = cell_from_parameters([34.1995, 22.6557, 19.4692, 90.0, 52.8626, 90.0])
+    widths = get_perpendicular_widths(cell)
+    assert np.allclose(widths, [27.26350, 22.6557, 15.52065], atol=1e-4)
+
+
+def test_compute_unit_cells():
+    """Testing the minimal number of unit cells of several frameworks at once"""
+    cells = cell_from_parameters(
+        [
+            [34.1995, 22.6557, 19.4692, 90.0, 52.8626, 90.0],
+            [25.832, 25.832, 25.832, 90.0, 90.0, 90.0],
+            [12.0, 12.0, 12.0, 90.0, 90.0, 90.0],
+        ]
+    )
+    unit_cells = compute_unit_cells(cells, 12.0)
+    assert unit_cells.tolist() == [[1, 2, 2], [1, 1, 1], [2, 2, 2]]
+    assert compute_unit_cells(cells, [12.0, 14.0, 6.0]).tolist() == [[1, 2, 2], [2, 2, 2], [1, 1, 1]]
+
+
+def test_get_cutoff():
+    """Testing that the largest cutoff is used"""
+    assert get_cutoff({"GeneralSettings": {}}) == 12.0
+    assert get_cutoff({"GeneralSettings": {"CutOff": 10.0, "CutOffChargeCharge": 14.0}}) == 14.0
+
+
+def test_check_unit_cells():
+    """Testing that the missing unit cells are filled in and that the given ones are only checked"""
+    cif = DataFactory("core.cif")(
+        file=os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "examples", "files", "TCC1RS.cif")
+    )
+    parameters = {
+        "GeneralSettings": {"CutOff": 12.0},
+        "System": {
+            "tcc1rs": {"type": "Framework"},
+            "given": {"type": "Framework", "UnitCells": "1 1 1"},
+            "box": {"type": "Box", "BoxLengths": "30 30 30"},
+        },
+    }
+
+    warnings = check_unit_cells(parameters, {"tcc1rs": cif, "given": cif})
+    assert parameters["System"]["tcc1rs"]["UnitCells"] == "1 2 2"
+    assert parameters["System"]["given"]["UnitCells"] == "1 1 1"
+    assert "UnitCells" not in parameters["System"]["box"]
+    assert len(warnings) == 1 and "'given' uses 1 1 1 unit cells, but at least 1 2 2" in warnings[0]
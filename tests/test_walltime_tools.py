@@ -0,0 +1,95 @@
+"""Test the walltime estimator"""
+
+import numpy as np
+import pytest
+from aiida.common import LinkType
+from aiida.orm import CalcJobNode, Dict, RemoteData
+
+from aiida_raspa.utils import (
+    WalltimeEstimator,
+    estimate_remaining_walltime,
+    parse_cycle_progress,
+)
+from aiida_raspa.utils.import_tools import IMPORTED_RUN_EXTRA
+from aiida_raspa.utils.walltime_tools import get_number_of_cycles, get_walltime_features
+
+
+def test_walltime_features():
+    """Testing the features extracted from the input parameters"""
+    parameters = {
+        "GeneralSettings": {"NumberOfCycles": 400, "NumberOfInitializationCycles": 200, "ChargeMethod": "None"},
+        "Component": {"methane": {}, "ethane": {}},
+    }
+    assert get_number_of_cycles(parameters) == 600
+    features = get_walltime_features(parameters, 768)
+    assert features == pytest.approx([1.0, np.log(769), np.log(12.0), 0.0, np.log(2)])
+
+
+def test_walltime_fit():
+    """Testing that the fit recovers the cost model of the previous calculations"""
+    rng = np.random.default_rng(0)
+    natoms = rng.integers(100, 5000, size=20)
+    charges = rng.integers(0, 2, size=20)
+    features = [[1.0, np.log1p(n), np.log(12.0), float(c), 0.0] for n, c in zip(natoms, charges)]
+    seconds_per_cycle = 1e-3 * (natoms + 1) * np.exp(0.5 * charges)
+
+    estimator = WalltimeEstimator().fit(features, seconds_per_cycle)
+    predicted = np.exp(np.asarray(features) @ estimator.coefficients)
+    assert predicted == pytest.approx(seconds_per_cycle)
+    assert estimator.residual_std == pytest.approx(0.0, abs=1e-8)
+
+    with pytest.raises(ValueError):
+        WalltimeEstimator().fit(features[:5], seconds_per_cycle[:5])
+
+
+def store_calculation(computer, natoms, charges, cpu_time, inputs=None, **general):
+    """Store a finished `RaspaCalculation` of 1000 cycles that took `cpu_time` seconds"""
+    parameters = {
+        "GeneralSettings": {"NumberOfCycles": 1000, "ChargeMethod": "Ewald" if charges else "None"},
+        "Component": {"methane": {}},
+    }
+    node = CalcJobNode(computer=computer, process_type="aiida.calculations:raspa")
+    for label, value in dict(inputs or {}, parameters=Dict(parameters)).items():
+        node.base.links.add_incoming(value.store(), LinkType.INPUT_CALC, label)
+    node.set_exit_status(0)
+    node.store()
+    general = dict(general, cpu_time_total=cpu_time, number_of_framework_atoms=natoms)
+    output_parameters = Dict({"framework": {"general": general, "components": {}}})
+    output_parameters.base.links.add_incoming(node, LinkType.CREATE, "output_parameters")
+    output_parameters.store()
+    return node
+
+
+def test_walltime_fit_calculations(aiida_profile_clean, aiida_localhost):  # pylint: disable=unused-argument
+    """Testing that only the calculations that ran all their cycles are fitted"""
+    for natoms, charges in zip([100, 200, 400, 800, 1600, 3200, 6400, 12800], [0, 1, 0, 1, 1, 0, 1, 0]):
+        store_calculation(aiida_localhost, natoms, charges, 1000 * 1e-3 * (natoms + 1) * np.exp(0.5 * charges))
+
+    # these calculations only ran part of their cycles
+    remote = RemoteData(computer=aiida_localhost, remote_path="/tmp")
+    store_calculation(aiida_localhost, 800, 1, 1.0, inputs={"parent_folder": remote})
+    store_calculation(aiida_localhost, 800, 1, 1.0, stopped_early=True, number_of_cycles_completed=10)
+    store_calculation(aiida_localhost, 800, 1, 1.0).base.extras.set(IMPORTED_RUN_EXTRA, "/data/run")
+
+    estimator = WalltimeEstimator().fit_calculations()
+    assert estimator.residual_std == pytest.approx(0.0, abs=1e-8)
+    features = get_walltime_features({"GeneralSettings": {}, "Component": {"methane": {}}}, 1000)
+    assert np.exp(np.dot(features, estimator.coefficients)) == pytest.approx(1e-3 * 1001 * np.exp(0.5))
+
+
+def test_remaining_walltime(read_output):
+    """Testing the walltime estimated from the cycles printed by a run that timed out"""
+    output_contents = read_output("one_component.out")
+    output_contents = output_contents[: output_contents.index("Current cycle: 200 out of")]
+    parameters = {
+        "GeneralSettings": {
+            "NumberOfCycles": 400,
+            "NumberOfInitializationCycles": 200,
+            "WriteBinaryRestartFileEvery": 150,
+        }
+    }
+
+    # the last restart file was written at the first production cycle, after the 200 initialization cycles
+    assert parse_cycle_progress(output_contents, parameters) == (0, 200, 200)
+    assert estimate_remaining_walltime(output_contents, parameters, 100, safety_factor=1.0) == 200
+    assert estimate_remaining_walltime("Starting simulation", parameters, 100) is None